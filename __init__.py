@@ -8,12 +8,21 @@ __version__ = "1.0.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
-# 导入主要模块
-from core import create_upload_config, ProductInfo, UploadConfig, logger
-from browser import start_browser, check_browser_api_health
-from data import ExcelProductParser, SuccessRecordManager
-from uploader import CarousellUploader, MultiAccountUploader
-from cli import run, cli_main
+# 导入主要模块（如果依赖包可用）
+try:
+    from core.config import create_upload_config
+    from core import ProductInfo, UploadConfig, logger
+    from browser import start_browser, check_browser_api_health
+    from data import ExcelProductParser, SuccessRecordManager
+    from uploader import CarousellUploader, MultiAccountUploader
+    from cli import run, cli_main
+except ImportError:
+    # 如果依赖包未安装，提供占位符
+    create_upload_config = ProductInfo = UploadConfig = logger = None
+    start_browser = check_browser_api_health = None
+    ExcelProductParser = SuccessRecordManager = None
+    CarousellUploader = MultiAccountUploader = None
+    run = cli_main = None
 
 __all__ = [
     'create_upload_config',
@@ -52,9 +52,12 @@ try:
         initialize_browser_interface,
         check_browser_health,
         start_browser_unified,
+        open_profile_unified,
+        connect_browser_unified,
         close_browser_unified,
         get_browser_windows_unified,
-        get_profile_id_by_browser_id_unified
+        get_profile_id_by_browser_id_unified,
+        log_browser_api_latency
     )
     from .browser_selector import (
         select_browser_type,
@@ -109,9 +112,12 @@ __all__ = [
         'initialize_browser_interface',
         'check_browser_health',
         'start_browser_unified',
+        'open_profile_unified',
+        'connect_browser_unified',
         'close_browser_unified',
         'get_browser_windows_unified',
         'get_profile_id_by_browser_id_unified',
+        'log_browser_api_latency',
         # 浏览器管理
         'get_current_browser_type',
     # 浏览器选择器
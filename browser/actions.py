@@ -1,11 +1,13 @@
 import os
 import time
 import random
-import pyautogui
-import pyperclip
+import threading
+from typing import Callable, List
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeout  # pyright: ignore[reportMissingImports]
 from core.logger import logger
 from core.config import load_config
+from .waits import settle
+from . import pacing
 
 # ========= 从配置文件加载参数 =========
 def _load_actions_config():
@@ -32,13 +34,44 @@ DEFAULT_TIMEOUT = _actions_config["default_timeout"]
 RETRY_TIMES = _actions_config["retry_times"]
 RETRY_DELAY = _actions_config["retry_delay"]
 
+class DesktopInputLock:
+    """
+    桌面输入锁：系统文件对话框和屏幕坐标点击依赖全局键盘/鼠标焦点，
+    多浏览器并发时必须串行执行，否则会把路径粘贴到其他窗口
+
+    默认只在进程内有效；多进程模式下工作进程初始化时通过 use() 换成协调进程创建的跨进程锁
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def use(self, lock) -> None:
+        """替换底层锁（须为可重入锁，如 multiprocessing 上下文的 RLock）"""
+        self._lock = lock
+
+    def acquire(self, *args, **kwargs) -> bool:
+        return self._lock.acquire(*args, **kwargs)
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def __enter__(self) -> "DesktopInputLock":
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._lock.release()
+
+
+desktop_input_lock = DesktopInputLock()
+
 # 输出配置到日志
 logger.info(f"Actions配置已加载: 超时时间={DEFAULT_TIMEOUT}ms, 重试次数={RETRY_TIMES}, 重试间隔={RETRY_DELAY}s")
 
 # ========= 工具函数 =========
 def human_delay(a: float = 1.0, b: float = 2.0):
-    """模拟真人随机延迟"""
-    time.sleep(random.uniform(a, b))
+    """模拟真人随机延迟（计入当前商品的刻意延迟统计）"""
+    pacing.sleep(random.uniform(a, b))
 
 def smart_wait_for_element(page, selector: str, timeout: int = 30000, state: str = "visible"):
     """
@@ -282,7 +315,7 @@ def click_with_wait(
                 logger.info(f"复选框已选中: {selector}")
                 return True
 
-            human_delay()
+            pacing.pause("before_action")
             element.check()   # Playwright 会自动等待并保证 checked
             logger.info(f"复选框勾选成功: {selector}")
             return True
@@ -303,15 +336,13 @@ def click_with_wait(
         )
 
         element.scroll_into_view_if_needed()
-        human_delay()
+        pacing.pause("before_action")
         page.wait_for_timeout(150)   # 轻微延迟，防止动画干扰
         element.click()
         logger.info(f"点击成功: {selector}")
         
-        # 点击成功后添加2-3秒随机等待时间
-        success_delay = random.uniform(2.0, 3.0)
-        logger.info(f"点击操作完成，等待 {success_delay:.1f}s 后继续...")
-        time.sleep(success_delay)
+        # 等待点击引起的页面变化稳定
+        settle(page)
         
         return True
 
@@ -349,17 +380,15 @@ def input_with_wait(page: Page, selector: str, text: str,
             arg=element,
             timeout=timeout
         )
-        human_delay()
+        pacing.pause("before_action")
         element.scroll_into_view_if_needed()
         page.wait_for_timeout(200)
         element.fill("")                        # 清空
-        element.type(text, delay=50)             # 模拟人工输入，每字 50ms
+        element.type(text, delay=pacing.typing_delay(text))  # 模拟人工输入，逐字间隔由节奏档位决定
         logger.info(f"输入成功: {selector} -> {text}")
         
-        # 输入成功后添加2-3秒随机等待时间
-        success_delay = random.uniform(2.0, 3.0)
-        logger.info(f"输入操作完成，等待 {success_delay:.1f}s 后继续...")
-        time.sleep(success_delay)
+        # 等待输入引起的页面变化（如搜索结果）稳定
+        settle(page, "after_input")
         
         return True
     except Exception as e:
@@ -408,6 +437,66 @@ def validate_and_normalize_path(path: str) -> str:
         raise
 
 # ========= 文件上传 =========
+def list_image_files(folder_path: str, image_exts) -> List[str]:
+    """
+    获取文件夹下所有指定后缀的图片文件
+    
+    Args:
+        folder_path: 图片文件夹路径
+        image_exts: 允许的图片后缀（如 {".jpg", ".png"}）
+        
+    Returns:
+        List[str]: 图片文件的完整路径列表
+        
+    Raises:
+        RuntimeError: 文件夹中没有可上传的图片
+    """
+    normalized_path = validate_and_normalize_path(folder_path)
+    exts = {ext.lower() for ext in image_exts}
+    files = [
+        os.path.join(normalized_path, f) for f in os.listdir(normalized_path)
+        if os.path.isfile(os.path.join(normalized_path, f))
+        and os.path.splitext(f)[1].lower() in exts
+    ]
+    if not files:
+        raise RuntimeError(f"文件夹中没有可上传的图片: {normalized_path}")
+    return files
+
+def upload_folder_with_file_input(page: Page, trigger: Callable[[], None], folder_path: str, image_exts,
+                                  timeout: int = DEFAULT_TIMEOUT, file_input_selector: str = "input[type=file]") -> int:
+    """
+    不经过操作系统文件对话框，直接把文件夹中的图片注入页面的文件输入框
+    
+    - 优先拦截 trigger 触发的 filechooser 事件并直接设置文件（系统对话框不会弹出）
+    - 未触发 filechooser 时，回退为对页面中的 file input 调用 set_input_files
+    - 不占用全局键盘鼠标，可在同一桌面上并发执行
+    
+    Args:
+        page: Playwright页面对象
+        trigger: 触发文件选择的操作（通常是点击上传图片按钮）
+        folder_path: 图片文件夹路径
+        image_exts: 允许的图片后缀
+        timeout: 等待 filechooser 事件的超时时间（毫秒）
+        file_input_selector: 回退时使用的文件输入框选择器
+        
+    Returns:
+        int: 上传的图片数量
+    """
+    files = list_image_files(folder_path, image_exts)
+    logger.info(f"找到 {len(files)} 个图片文件: {', '.join(os.path.basename(f) for f in files[:5])}{'...' if len(files) > 5 else ''}")
+    
+    try:
+        with page.expect_file_chooser(timeout=timeout) as chooser_info:
+            trigger()
+        chooser_info.value.set_files(files)
+        logger.info(f"已通过filechooser注入 {len(files)} 个图片文件")
+    except PlaywrightTimeout:
+        logger.warning(f"未捕获到filechooser事件，改为直接设置文件输入框: {file_input_selector}")
+        page.locator(file_input_selector).first.set_input_files(files, timeout=timeout)
+        logger.info(f"已通过文件输入框注入 {len(files)} 个图片文件")
+    
+    return len(files)
+
 def upload_folder_with_keyboard(folder_path: str, image_exts: set):
     """
     打开系统文件对话框后：
@@ -420,6 +509,10 @@ def upload_folder_with_keyboard(folder_path: str, image_exts: set):
     - 进入文件夹后，明确聚焦到文件名输入框（Alt+N）后再粘贴文件名
     - 避免剪贴板内容和焦点位置混乱
     """
+    # 仅在使用系统文件对话框时才需要键鼠自动化依赖
+    import pyautogui
+    import pyperclip
+    
     # 验证和标准化路径
     normalized_path = validate_and_normalize_path(folder_path)
     logger.info(f"准备上传文件夹: {normalized_path}")
@@ -496,13 +589,7 @@ def upload_folder_with_keyboard(folder_path: str, image_exts: set):
         raise RuntimeError(f"地址栏输入路径或进入文件夹失败: {e}")
 
     # ========= 第二步：过滤图片文件 =========
-    files = [
-        f for f in os.listdir(normalized_path)
-        if os.path.isfile(os.path.join(normalized_path, f))
-        and os.path.splitext(f)[1].lower() in image_exts
-    ]
-    if not files:
-        raise RuntimeError(f"文件夹中没有可上传的图片: {normalized_path}")
+    files = [os.path.basename(f) for f in list_image_files(normalized_path, image_exts)]
     
     logger.info(f"找到 {len(files)} 个图片文件: {', '.join(files[:5])}{'...' if len(files) > 5 else ''}")
 
@@ -0,0 +1,202 @@
+"""
+指纹浏览器本地API客户端
+每个浏览器接口实例共用一个保持连接的 requests.Session，统一超时与重试策略，并按接口记录耗时分布
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, Optional
+import requests  # pyright: ignore[reportMissingModuleSource]
+from requests.adapters import HTTPAdapter  # pyright: ignore[reportMissingModuleSource]
+from urllib3.util.retry import Retry  # pyright: ignore[reportMissingModuleSource]
+from core.logger import logger
+from core.config import load_config
+
+# ========= 从配置文件加载参数 =========
+def _load_api_client_config():
+    """从配置文件加载本地API客户端参数"""
+    defaults = {
+        "connect_timeout": 5,
+        "timeouts": {"health": 20, "list": 60, "open": 120, "close": 30},
+        "retries": 2,
+        "backoff": 0.5,
+        "pool_size": 8,
+    }
+    try:
+        config = load_config()
+        browser_config = config.get("browser", {}) or {}
+        api_config = dict(browser_config.get("api", {}) or {})
+        defaults["timeouts"].update(api_config.pop("timeouts", {}) or {})
+        defaults.update(api_config)
+    except Exception as e:
+        logger.warning(f"加载browser.api配置失败，使用默认值: {e}")
+    return defaults
+
+_api_client_config = _load_api_client_config()
+API_CONNECT_TIMEOUT = float(_api_client_config["connect_timeout"])
+API_TIMEOUTS = {name: float(value) for name, value in _api_client_config["timeouts"].items()}
+API_RETRIES = int(_api_client_config["retries"])
+API_BACKOFF = float(_api_client_config["backoff"])
+API_POOL_SIZE = int(_api_client_config["pool_size"])
+
+# 耗时分布的桶上限（毫秒），最后一个桶收集超过最大上限的请求
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """单个接口的耗时分布"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.total = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, ok: bool = True) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, ratio: float) -> Optional[float]:
+        """按桶估算分位数，返回该分位所在桶的上限（超出最大桶时返回最大耗时）"""
+        if not self.total:
+            return None
+        target = ratio * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return float(self.buckets_ms[index]) if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "avg_ms": round(self.sum_ms / self.total, 1) if self.total else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {
+                (f"<={limit}" if index < len(self.buckets_ms) else f">{self.buckets_ms[-1]}"): count
+                for index, (limit, count) in enumerate(zip(self.buckets_ms + (None,), self.counts))
+                if count
+            },
+        }
+
+
+class LocalAPIClient:
+    """
+    指纹浏览器本地API客户端
+
+    - 连接池复用TCP连接，多线程并发请求时共用同一个Session
+    - 每类接口（health / list / open / close）有各自的读取超时，不再出现无超时的请求
+    - 只对连接失败重试（请求未送达），避免重复执行打开/关闭窗口等非幂等操作
+    """
+
+    def __init__(self, api_port: int, api_key: str, name: str = "浏览器"):
+        self.base_url = f"http://127.0.0.1:{api_port}"
+        self.name = name
+        self.headers = {
+            "x-api-key": api_key,
+            "Content-Type": "application/json"
+        }
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._histograms_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        retry = Retry(
+            total=API_RETRIES,
+            connect=API_RETRIES,
+            read=0,
+            status=0,
+            backoff_factor=API_BACKOFF,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        return session
+
+    def timeout_for(self, endpoint: str):
+        """返回 (连接超时, 读取超时)"""
+        return API_CONNECT_TIMEOUT, API_TIMEOUTS.get(endpoint, API_TIMEOUTS.get("list", 60.0))
+
+    def post(self, endpoint: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        发送POST请求并返回JSON响应
+
+        Args:
+            endpoint: 接口类别（health / list / open / close），用于选择超时和统计耗时
+            path: 接口路径，如 /browser/list
+            payload: 请求体
+
+        Returns:
+            Dict[str, Any]: 解析后的JSON响应
+
+        Raises:
+            requests.RequestException: 连接失败、超时或HTTP状态码异常
+        """
+        ok = False
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.base_url + path,
+                headers=self.headers,
+                json=payload,
+                timeout=self.timeout_for(endpoint)
+            )
+            response.raise_for_status()
+            data = response.json()
+            ok = True
+            return data
+        finally:
+            self._record(endpoint, (time.perf_counter() - start) * 1000, ok)
+
+    def _record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        with self._histograms_lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            histogram.record(elapsed_ms, ok)
+
+    def latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """按接口返回耗时分布统计"""
+        with self._histograms_lock:
+            return {endpoint: histogram.summary() for endpoint, histogram in self._histograms.items()}
+
+    def log_latency_summary(self) -> None:
+        """把各接口的耗时分布写入日志"""
+        summary = self.latency_summary()
+        if not summary:
+            return
+        logger.info(f"📊 {self.name} 本地API耗时统计:")
+        for endpoint, stats in sorted(summary.items()):
+            logger.info(
+                f"   {endpoint}: 次数={stats['count']}, 失败={stats['errors']}, 平均={stats['avg_ms']}ms, "
+                f"P50<={stats['p50_ms']}ms, P95<={stats['p95_ms']}ms, 最大={stats['max_ms']}ms, 分布={stats['buckets']}"
+            )
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
@@ -0,0 +1,76 @@
+"""
+页面操作工具（异步版本）
+只包含异步执行核心需要的操作；依赖系统文件对话框和全局键鼠的操作（pyautogui）只在同步核心中提供
+"""
+import asyncio
+import os
+import random
+from typing import Awaitable, Callable
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout  # pyright: ignore[reportMissingImports]
+from core.logger import logger
+from .actions import DEFAULT_TIMEOUT, list_image_files
+from . import pacing
+
+
+async def human_delay(a: float = 1.0, b: float = 2.0):
+    """模拟真人随机延迟（计入当前商品的刻意延迟统计）"""
+    await pacing.async_sleep(random.uniform(a, b))
+
+
+async def upload_folder_with_file_input(page: Page, trigger: Callable[[], Awaitable], folder_path: str, image_exts,
+                                        timeout: int = DEFAULT_TIMEOUT, file_input_selector: str = "input[type=file]") -> int:
+    """
+    不经过操作系统文件对话框，直接把文件夹中的图片注入页面的文件输入框
+
+    Args:
+        trigger: 触发文件选择的协程函数（通常是点击上传图片按钮）
+
+    Returns:
+        int: 上传的图片数量
+    """
+    files = list_image_files(folder_path, image_exts)
+    logger.info(f"找到 {len(files)} 个图片文件: {', '.join(os.path.basename(f) for f in files[:5])}{'...' if len(files) > 5 else ''}")
+
+    try:
+        async with page.expect_file_chooser(timeout=timeout) as chooser_info:
+            await trigger()
+        chooser = await chooser_info.value
+        await chooser.set_files(files)
+        logger.info(f"已通过filechooser注入 {len(files)} 个图片文件")
+    except PlaywrightTimeout:
+        logger.warning(f"未捕获到filechooser事件，改为直接设置文件输入框: {file_input_selector}")
+        await page.locator(file_input_selector).first.set_input_files(files, timeout=timeout)
+        logger.info(f"已通过文件输入框注入 {len(files)} 个图片文件")
+
+    return len(files)
+
+
+async def smart_goto(page: Page, url: str, wait_until: str = "domcontentloaded", timeout: int = 15000, retry_times: int = 2):
+    """
+    智能页面导航，支持重试（退避期间不阻塞其他浏览器）
+    """
+    for attempt in range(retry_times):
+        try:
+            logger.info(f"正在导航到: {url} (尝试 {attempt + 1}/{retry_times})")
+
+            response = await page.goto(url, wait_until=wait_until, timeout=timeout)
+
+            if response and response.status >= 400:
+                logger.warning(f"页面响应状态码: {response.status}")
+                if attempt < retry_times - 1:
+                    logger.info(f"等待 {2 ** attempt} 秒后重试...")
+                    await asyncio.sleep(2 ** attempt)  # 指数退避
+                    continue
+
+            logger.info(f"✅ 页面导航成功: {url}")
+            return response
+
+        except Exception as e:
+            logger.error(f"页面导航失败 (尝试 {attempt + 1}/{retry_times}): {e}")
+            if attempt < retry_times - 1:
+                wait_time = 2 ** attempt
+                logger.info(f"等待 {wait_time} 秒后重试...")
+                await asyncio.sleep(wait_time)
+            else:
+                logger.error(f"页面导航最终失败: {url}")
+                raise
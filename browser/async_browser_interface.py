@@ -0,0 +1,97 @@
+"""
+浏览器接口（异步版本）
+包装同步的 BrowserInterface：本地API请求放到线程池执行（共用同一个连接池客户端），
+CDP连接使用 playwright.async_api，所有浏览器共用一个 Playwright 实例和事件循环
+"""
+
+import asyncio
+import functools
+from typing import Any, Dict, Optional, Tuple
+from playwright.async_api import async_playwright  # pyright: ignore[reportMissingImports]
+from core.logger import logger
+from .browser_interface import BrowserInterface
+
+
+class AsyncBrowserInterface:
+    """异步浏览器接口，需在事件循环中先调用 start()，结束时调用 stop()"""
+
+    def __init__(self, interface: BrowserInterface):
+        """
+        Args:
+            interface: 已初始化的同步浏览器接口（BitBrowser / IxBrowser）
+        """
+        self.interface = interface
+        self.name = interface.name
+        self._playwright = None
+
+    async def _call(self, func, *args, **kwargs):
+        """在默认线程池中执行同步的本地API调用"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def start(self) -> "AsyncBrowserInterface":
+        """启动共享的 Playwright 实例"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self
+
+    async def stop(self) -> None:
+        """停止共享的 Playwright 实例（会断开所有CDP连接）"""
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"停止Playwright时出错: {e}")
+            self._playwright = None
+
+    async def check_health(self) -> bool:
+        return await self._call(self.interface.check_health)
+
+    async def open_profile(self, profile_id: str) -> str:
+        """通过本地API打开浏览器窗口，返回CDP WebSocket地址"""
+        return await self._call(self.interface.open_profile, profile_id)
+
+    async def close_browser(self, profile_id: str) -> bool:
+        return await self._call(self.interface.close_browser, profile_id)
+
+    async def get_browser_windows(self) -> Optional[Dict[int, Dict[str, str]]]:
+        return await self._call(self.interface.get_browser_windows)
+
+    async def get_profile_id_by_browser_id(self, browser_id: str,
+                                           browser_windows: Optional[Dict[int, Dict[str, str]]] = None) -> str:
+        return await self._call(self.interface.get_profile_id_by_browser_id, browser_id, browser_windows)
+
+    async def connect_over_cdp(self, ws_endpoint: str) -> Tuple[Any, Any]:
+        """
+        通过CDP连接已打开的浏览器窗口
+
+        Returns:
+            Tuple[Any, Any]: (browser, page)，断开连接只需 browser.close()，Playwright 实例继续共用
+        """
+        if self._playwright is None:
+            raise RuntimeError("异步浏览器接口未启动，请先调用 start()")
+
+        browser = await self._playwright.chromium.connect_over_cdp(ws_endpoint)
+        try:
+            context = browser.contexts[0] if browser.contexts else await browser.new_context()
+            page = await context.new_page()
+        except Exception:
+            await browser.close()
+            raise
+
+        logger.info(f"{self.name}连接成功")
+        return browser, page
+
+    async def start_browser(self, profile_id: str) -> Tuple[Any, Any]:
+        """
+        打开浏览器窗口并建立CDP连接
+
+        Returns:
+            Tuple[Any, Any]: (browser, page)
+        """
+        try:
+            ws_endpoint = await self.open_profile(profile_id)
+            return await self.connect_over_cdp(ws_endpoint)
+        except Exception as e:
+            logger.error(f"启动{self.name}失败: {e}")
+            raise
@@ -0,0 +1,73 @@
+"""
+事件驱动的等待策略（异步版本）
+与 browser.waits 使用相同的页面脚本，供基于 playwright.async_api 的执行核心使用
+"""
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout  # pyright: ignore[reportMissingImports]
+from core.logger import logger
+from .waits import DOM_QUIET_MS, SETTLE_TIMEOUT, _DOM_SETTLED_JS, _DOM_CHANGED_JS
+from .pacing import async_pause
+
+
+async def wait_for_dom_settled(page: Page, quiet_ms: int = None, timeout: int = None) -> bool:
+    """
+    等待页面DOM稳定（连续 quiet_ms 毫秒无变化）
+
+    Returns:
+        bool: True表示已稳定，False表示超时（页面持续变化）
+    """
+    quiet_ms = DOM_QUIET_MS if quiet_ms is None else quiet_ms
+    timeout = SETTLE_TIMEOUT if timeout is None else timeout
+    try:
+        return bool(await page.evaluate(_DOM_SETTLED_JS, [quiet_ms, timeout]))
+    except Exception as e:
+        # 等待期间发生页面跳转会销毁执行上下文，改为等待新页面的DOM加载
+        logger.debug(f"DOM稳定等待被中断: {e}")
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=timeout)
+        except Exception:
+            pass
+        return False
+
+
+async def wait_for_dom_change(page: Page, timeout: int = 1000) -> bool:
+    """
+    等待下一次DOM变化
+
+    Returns:
+        bool: True表示发生了变化，False表示超时无变化或等待被中断
+    """
+    try:
+        return bool(await page.evaluate(_DOM_CHANGED_JS, timeout))
+    except Exception as e:
+        logger.debug(f"DOM变化等待被中断: {e}")
+        return False
+
+
+async def settle(page: Page, action: str = "after_click", timeout: int = None) -> bool:
+    """操作后的标准等待：等待DOM稳定，再按当前节奏档位停顿"""
+    settled = await wait_for_dom_settled(page, timeout=timeout)
+    await async_pause(action)
+    return settled
+
+
+async def wait_for_element_count(page: Page, selector: str, count: int, timeout: int = 30000,
+                                 absent_selector: str = None) -> bool:
+    """
+    等待页面中匹配 selector 的元素数量达到 count（且 absent_selector 匹配的元素不存在）
+
+    Returns:
+        bool: 是否在超时前达到数量
+    """
+    try:
+        await page.wait_for_function(
+            "([sel, n, absent]) => document.querySelectorAll(sel).length >= n"
+            " && !(absent && document.querySelector(absent))",
+            arg=[selector, count, absent_selector],
+            timeout=timeout
+        )
+        return True
+    except PlaywrightTimeout:
+        return False
+    except Exception as e:
+        logger.debug(f"等待元素数量失败: {selector}, 错误: {e}")
+        return False
@@ -7,6 +7,7 @@ from .browser_interface import BrowserInterface
 
 # 全局浏览器接口实例
 _browser_interface: BrowserInterface = None
+_browser_config: Dict[str, Any] = None
 
 
 def initialize_browser_interface(config: Dict[str, Any]) -> BrowserInterface:
@@ -19,8 +20,9 @@ def initialize_browser_interface(config: Dict[str, Any]) -> BrowserInterface:
     Returns:
         BrowserInterface: 浏览器接口实例
     """
-    global _browser_interface
+    global _browser_interface, _browser_config
     _browser_interface = get_browser_interface(config)
+    _browser_config = dict(config)
     browser_type = config.get("type", "bitBrowser")
     logger.info(f"浏览器接口已初始化: {browser_type}")
     return _browser_interface
@@ -41,6 +43,21 @@ def get_browser_interface_instance() -> BrowserInterface:
     return _browser_interface
 
 
+def get_browser_interface_config() -> Dict[str, Any]:
+    """
+    获取初始化浏览器接口时使用的配置（供子进程重新初始化浏览器接口）
+    
+    Returns:
+        Dict[str, Any]: 浏览器配置（type / api_port / api_key）
+        
+    Raises:
+        RuntimeError: 当浏览器接口未初始化时
+    """
+    if _browser_config is None:
+        raise RuntimeError("浏览器接口未初始化，请先调用initialize_browser_interface")
+    return dict(_browser_config)
+
+
 # 新的统一接口函数
 def check_browser_health() -> bool:
     """
@@ -57,6 +74,8 @@ def start_browser_unified(profile_id: str):
     """
     启动浏览器（统一接口）
     
+    BitBrowser 的窗口ID来自本地缓存且已失效时，清除缓存、重新拉取窗口列表后重试一次
+    
     Args:
         profile_id (str): 浏览器配置文件ID
         
@@ -67,6 +86,34 @@ def start_browser_unified(profile_id: str):
     return browser_interface.start_browser(profile_id)
 
 
+def open_profile_unified(profile_id: str) -> str:
+    """
+    打开浏览器窗口但不建立Playwright连接（统一接口）
+    
+    Args:
+        profile_id (str): 浏览器配置文件ID
+        
+    Returns:
+        str: CDP WebSocket 地址
+    """
+    browser_interface = get_browser_interface_instance()
+    return browser_interface.open_profile(profile_id)
+
+
+def connect_browser_unified(ws_endpoint: str):
+    """
+    在当前线程中通过CDP连接已打开的浏览器窗口（统一接口）
+    
+    Args:
+        ws_endpoint (str): CDP WebSocket 地址
+        
+    Returns:
+        Tuple[Any, Any, Any]: (playwright, browser, page)
+    """
+    browser_interface = get_browser_interface_instance()
+    return browser_interface.connect_over_cdp(ws_endpoint)
+
+
 def close_browser_unified(profile_id: str) -> bool:
     """
     关闭浏览器（统一接口）
@@ -107,6 +154,14 @@ def get_profile_id_by_browser_id_unified(browser_id: str, browser_windows: Dict[
     return browser_interface.get_profile_id_by_browser_id(browser_id, browser_windows)
 
 
+def log_browser_api_latency() -> None:
+    """
+    把本地API各接口（health / list / open / close）的耗时分布写入日志（统一接口）
+    """
+    if _browser_interface is not None:
+        _browser_interface.client.log_latency_summary()
+
+
 # 浏览器管理函数
 def get_current_browser_type(config: Dict[str, Any]) -> str:
     """
@@ -4,18 +4,25 @@
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple, Optional
 from playwright.sync_api import sync_playwright
 from core.logger import logger
+from .api_client import LocalAPIClient
+from .window_cache import get_window_cache, WINDOW_LIST_WORKERS
 import time
 
 
 class BrowserInterface(ABC):
     """浏览器接口抽象类"""
     
+    name = "浏览器"
+    
     def __init__(self, api_port: int, api_key: str):
         self.api_port = api_port
         self.api_key = api_key
+        # 本地API共用的连接池客户端
+        self.client = LocalAPIClient(api_port, api_key, self.name)
     
     @abstractmethod
     def check_health(self) -> bool:
@@ -28,6 +35,42 @@ class BrowserInterface(ABC):
         pass
     
     @abstractmethod
+    def open_profile(self, profile_id: str) -> str:
+        """
+        通过本地API打开浏览器窗口（不建立Playwright连接）
+        
+        Args:
+            profile_id (str): 浏览器配置文件ID
+            
+        Returns:
+            str: CDP WebSocket 地址
+        """
+        pass
+    
+    def connect_over_cdp(self, ws_endpoint: str) -> Tuple[Any, Any, Any]:
+        """
+        在当前线程中通过CDP连接已打开的浏览器窗口
+        
+        Playwright 同步对象只能在创建它的线程中使用，因此连接必须在使用页面的线程中建立
+        
+        Args:
+            ws_endpoint (str): CDP WebSocket 地址
+            
+        Returns:
+            Tuple[Any, Any, Any]: (playwright, browser, page)
+        """
+        playwright = sync_playwright().start()
+        try:
+            browser = playwright.chromium.connect_over_cdp(ws_endpoint)
+            context = browser.contexts[0] if browser.contexts else browser.new_context()
+            page = context.new_page()
+        except Exception:
+            playwright.stop()
+            raise
+        
+        logger.info(f"{self.name}连接成功")
+        return playwright, browser, page
+    
     def start_browser(self, profile_id: str) -> Tuple[Any, Any, Any]:
         """
         启动浏览器并返回 Playwright 对象
@@ -38,7 +81,12 @@ class BrowserInterface(ABC):
         Returns:
             Tuple[Any, Any, Any]: (playwright, browser, page)
         """
-        pass
+        try:
+            ws_endpoint = self.open_profile(profile_id)
+            return self.connect_over_cdp(ws_endpoint)
+        except Exception as e:
+            logger.error(f"启动{self.name}失败: {e}")
+            raise
     
     @abstractmethod
     def close_browser(self, profile_id: str) -> bool:
@@ -81,84 +129,82 @@ class BrowserInterface(ABC):
 class BitBrowserInterface(BrowserInterface):
     """BitBrowser接口实现"""
     
+    name = "BitBrowser"
+    
+    def __init__(self, api_port: int, api_key: str):
+        super().__init__(api_port, api_key)
+        # 窗口映射缓存过期后失效的窗口ID -> 重新拉取得到的窗口ID（调用方手中的映射表仍是旧ID）
+        self._replaced_ids: Dict[str, str] = {}
+    
     def check_health(self) -> bool:
         """检查BitBrowser API健康状态"""
         try:
-            import requests
-            
             # 使用列表接口代替健康检查
-            url = f"http://127.0.0.1:{self.api_port}/browser/list"
-            headers = {
-                "x-api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
+            path = "/browser/list"
             payload = {"page": 1, "pageSize": 1}
             
-            logger.info(f"正在检查BitBrowser API健康状态: {url}")
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=20)
+            logger.info(f"正在检查BitBrowser API健康状态: {self.client.base_url}{path}")
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("success"):
-                    logger.info("✅ BitBrowser API健康检查通过")
-                    return True
-                else:
-                    logger.error("❌ BitBrowser API健康检查失败，success=False")
-                    return False
+            data = self.client.post("health", path, payload)
+            if data.get("success"):
+                logger.info("✅ BitBrowser API健康检查通过")
+                return True
             else:
-                logger.error(f"❌ BitBrowser API健康检查失败，HTTP状态码: {response.status_code}")
+                logger.error("❌ BitBrowser API健康检查失败，success=False")
                 return False
                 
         except Exception as e:
             logger.error(f"❌ BitBrowser API健康检查发生错误: {e}")
             return False
     
-    def start_browser(self, profile_id: str) -> Tuple[Any, Any, Any]:
-        """启动BitBrowser"""
+    def open_profile(self, profile_id: str) -> str:
+        """
+        打开BitBrowser窗口
+        
+        窗口ID来自本地缓存且打开失败时（窗口已删除重建等），清除缓存并重新拉取窗口列表，
+        用同一序号的新窗口ID重试一次
+        """
+        profile_id = self._replaced_ids.get(profile_id, profile_id)
         try:
-            import requests
-            
-            # 构建API URL
-            api_url = f"http://127.0.0.1:{self.api_port}/browser/open"
-            headers = {"x-api-key": self.api_key}
-            resp = requests.post(api_url, headers=headers, json={"id": profile_id, "args": []})
-            resp.raise_for_status()
-            
-            data = resp.json()
-            if not data.get("success"):
-                raise RuntimeError(f"启动BitBrowser失败: {data}")
-            
-            ws_endpoint = data["data"]["ws"]
-            logger.info(f"BitBrowser已启动，WebSocket: {ws_endpoint}")
-
-            playwright = sync_playwright().start()
-            browser = playwright.chromium.connect_over_cdp(ws_endpoint)
-            context = browser.contexts[0] if browser.contexts else browser.new_context()
-            page = context.new_page()
-            
-            logger.info("BitBrowser连接成功")
-            return playwright, browser, page
-            
+            return self._open_window(profile_id)
         except Exception as e:
-            logger.error(f"启动BitBrowser失败: {e}")
-            raise
+            fresh_id = self._refetch_profile_id(profile_id)
+            if fresh_id is None:
+                raise
+            logger.warning(f"🔄 缓存中的窗口ID {profile_id} 已失效（{e}），使用重新获取的窗口ID {fresh_id} 重试")
+            self._replaced_ids[profile_id] = fresh_id
+            return self._open_window(fresh_id)
+    
+    def _refetch_profile_id(self, profile_id: str) -> Optional[str]:
+        """窗口ID来自缓存时清除缓存并重新拉取，返回同一序号的新窗口ID（不是来自缓存或ID未变化时返回None）"""
+        cache = get_window_cache()
+        seq = cache.find_seq(self.api_port, profile_id)
+        if seq is None:
+            return None
+        
+        cache.invalidate(self.api_port)
+        try:
+            windows = self.get_browser_windows(force_refresh=True)
+        except Exception as e:
+            logger.warning(f"重新拉取窗口列表失败: {e}")
+            return None
+        fresh_id = (windows.get(seq) or {}).get("id")
+        return fresh_id if fresh_id and fresh_id != profile_id else None
+    
+    def _open_window(self, profile_id: str) -> str:
+        data = self.client.post("open", "/browser/open", {"id": profile_id, "args": []})
+        if not data.get("success"):
+            raise RuntimeError(f"启动BitBrowser失败: {data}")
+        
+        ws_endpoint = data["data"]["ws"]
+        logger.info(f"BitBrowser已启动，WebSocket: {ws_endpoint}")
+        return ws_endpoint
     
     def close_browser(self, profile_id: str) -> bool:
         """关闭BitBrowser"""
+        profile_id = self._replaced_ids.get(profile_id, profile_id)
         try:
-            import requests
-            
-            close_url = f"http://127.0.0.1:{self.api_port}/browser/close"
-            headers = {
-                "x-api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
-            
-            resp = requests.post(close_url, headers=headers, json={"id": profile_id})
-            resp.raise_for_status()
-            
-            data = resp.json()
+            data = self.client.post("close", "/browser/close", {"id": profile_id})
             if data.get("success"):
                 logger.info(f"BitBrowser窗口关闭成功: id={profile_id}")
                 return True
@@ -170,81 +216,108 @@ class BitBrowserInterface(BrowserInterface):
             logger.error(f"关闭BitBrowser失败: profile_id={profile_id}, 错误: {e}")
             return False
     
-    def get_browser_windows(self) -> Dict[int, Dict[str, str]]:
-        """获取BitBrowser窗口列表"""
+    def _fetch_window_page(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """请求一页窗口列表，返回接口的 data 字段"""
+        json_data = self.client.post("list", "/browser/list", payload)
+        if not json_data.get("success"):
+            raise Exception(f"接口返回失败，success=False, 请求参数: {payload}")
+        return json_data.get("data", {}) or {}
+    
+    def _collect_windows(self, items, browser_window_map: Dict[int, Dict[str, str]]) -> None:
+        for item in items or []:
+            seq = item.get("seq")
+            _id = item.get("id")
+            if seq is not None and _id:
+                browser_window_map[int(seq)] = {"id": _id, "proxy": self._proxy_fingerprint(item)}
+    
+    def get_browser_windows(self, force_refresh: bool = False) -> Dict[int, Dict[str, str]]:
+        """
+        获取BitBrowser窗口列表
+        
+        缓存有效期内直接使用本地缓存；否则先请求第一页拿到总数，再并发请求其余分页
+        
+        Args:
+            force_refresh: 忽略本地缓存，重新拉取完整列表
+        """
+        cache = get_window_cache()
+        if not force_refresh:
+            cached = cache.get(self.api_port)
+            if cached is not None:
+                return cached
+        
         try:
-            import requests
-            
-            url = f"http://127.0.0.1:{self.api_port}/browser/list"
-            headers = {
-                "x-api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
-
             browser_window_map = {}
-            page = 0
             page_size = 100
-            payload = {"page": page, "pageSize": page_size}
 
             logger.info("1. 发送第一页请求，获取总数量信息")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            response.raise_for_status()
-            json_data = response.json()
-
-            if not json_data.get("success"):
-                raise Exception("接口返回失败，success=False")
-
-            data = json_data.get("data", {})
+            data = self._fetch_window_page({"page": 0, "pageSize": page_size})
             total_num = data.get("totalNum", 0)
-            logger.info(f"   a. 当前页码: {page}, 总数: {total_num}")
+            logger.info(f"   a. 当前页码: 0, 总数: {total_num}")
 
             # 处理第一页数据
-            for item in data.get("list", []):
-                seq = item.get("seq")
-                _id = item.get("id")
-                if seq is not None and _id:
-                    browser_window_map[seq] = {"id": _id}
+            self._collect_windows(data.get("list", []), browser_window_map)
 
             # 判断是否需要继续分页请求
             if total_num <= page_size:
                 logger.info("   d. 所有数据已包含在第一页中，跳过后续分页请求")
-                return browser_window_map
-
-            # 计算总页数
-            total_pages = (total_num + page_size - 1) // page_size
-            logger.info(f"   b. 开始分页请求，预计页数: {total_pages}")
-
-            # 从第2页开始拉取
-            for page in range(1, total_pages):
-                payload = {"page": page, "pageSize": page_size}
-                logger.info(f"   c. 请求第 {page + 1} 页数据")
-
-                try:
-                    response = requests.post(url, json=payload, headers=headers, timeout=60)
-                    response.raise_for_status()
-                    json_data = response.json()
-
-                    if not json_data.get("success"):
-                        raise Exception(f"第 {page + 1} 页接口返回失败，success=False")
+            else:
+                # 计算总页数，其余分页并发请求
+                total_pages = (total_num + page_size - 1) // page_size
+                workers = max(1, min(WINDOW_LIST_WORKERS, total_pages - 1))
+                logger.info(f"   b. 开始并发分页请求，预计页数: {total_pages}, 并发数: {workers}")
 
-                    data = json_data.get("data", {})
-                    for item in data.get("list", []):
-                        seq = item.get("seq")
-                        _id = item.get("id")
-                        if seq is not None and _id:
-                            browser_window_map[seq] = {"id": _id}
+                def fetch_page(page: int):
+                    try:
+                        return self._fetch_window_page({"page": page, "pageSize": page_size})
+                    except Exception as e:
+                        logger.error(f"      ⚠️ 请求第 {page + 1} 页失败: {str(e)}")
+                        raise
 
-                except Exception as e:
-                    logger.error(f"      ⚠️ 请求第 {page + 1} 页失败: {str(e)}")
-                    raise
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for page_data in executor.map(fetch_page, range(1, total_pages)):
+                        self._collect_windows(page_data.get("list", []), browser_window_map)
 
         except Exception as e:
             logger.error(f"   ❌ 请求接口失败: {str(e)}")
             raise
 
         logger.info(f"2. 数据收集完成，窗口总数: {len(browser_window_map)}")
+        cache.put(self.api_port, browser_window_map)
         return browser_window_map
     
+    def refresh_browser_windows(self, seqs, browser_windows: Optional[Dict[int, Dict[str, str]]] = None) -> Dict[int, Dict[str, str]]:
+        """
+        只刷新指定序号的窗口映射（用于缓存中找不到新建的窗口时）
+        
+        按序号逐个查询，结果合并到本地缓存和传入的 browser_windows 中
+        
+        Returns:
+            Dict[int, Dict[str, str]]: 本次查询到的 序号 -> 窗口信息
+        """
+        found = {}
+        for seq in {int(seq) for seq in seqs}:
+            try:
+                data = self._fetch_window_page({"page": 0, "pageSize": 10, "seq": seq})
+            except Exception as e:
+                logger.warning(f"按序号刷新窗口失败: seq={seq}, 错误: {e}")
+                continue
+            # 接口若忽略了 seq 过滤条件，只取序号一致的窗口
+            matched = [item for item in data.get("list", []) if str(item.get("seq")) == str(seq)]
+            self._collect_windows(matched, found)
+        
+        if found:
+            logger.info(f"🔄 已刷新窗口映射: {sorted(found)}")
+            get_window_cache().update(self.api_port, found)
+            if browser_windows is not None:
+                browser_windows.update(found)
+        return found
+    
+    @staticmethod
+    def _proxy_fingerprint(item: Dict) -> Optional[str]:
+        """根据窗口的代理配置生成指纹，代理切换后指纹变化（未返回代理字段时为None）"""
+        fields = [str(item.get(key) or "") for key in ("proxyMethod", "proxyType", "host", "port", "proxyUserName")]
+        return "|".join(fields) if any(fields) else None
+    
     def get_profile_id_by_browser_id(self, browser_id: str, browser_windows: Optional[Dict[int, Dict[str, str]]] = None) -> str:
         """根据BrowserID获取对应的profile_id（BitBrowser需要映射）"""
         try:
@@ -255,12 +328,16 @@ class BitBrowserInterface(BrowserInterface):
             
             seq = int(browser_id)
             
+            if seq not in browser_window_map:
+                # 映射表可能来自缓存，窗口为新建的，只刷新这一个序号
+                logger.info(f"映射表中没有BrowserID {browser_id}，刷新该窗口信息")
+                self.refresh_browser_windows([seq], browser_window_map)
+            
             if seq in browser_window_map:
                 profile_id = browser_window_map[seq]["id"]
                 logger.info(f"找到BrowserID {browser_id} 对应的profile_id: {profile_id}")
                 return profile_id
             else:
-                available_seqs = list(browser_window_map.keys())
                 raise ValueError(f"未找到BrowserID {browser_id} 对应的浏览器窗口")
                 
         except ValueError as e:
@@ -274,50 +351,32 @@ class BitBrowserInterface(BrowserInterface):
 class IxBrowserInterface(BrowserInterface):
     """IxBrowser接口实现"""
     
+    name = "IxBrowser"
+    
     def check_health(self) -> bool:
         """检查IxBrowser API健康状态"""
         try:
-            import requests
-            
             # 使用列表接口代替健康检查
-            url = f"http://127.0.0.1:{self.api_port}/api/v2/profile-list"
-            headers = {
-                "x-api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
+            path = "/api/v2/profile-list"
             payload = {"page": 1, "limit": 1}
             
-            logger.info(f"正在检查IxBrowser API健康状态: {url}")
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=20)
+            logger.info(f"正在检查IxBrowser API健康状态: {self.client.base_url}{path}")
             
-            if response.status_code == 200:
-                data = response.json()
-                error_info = data.get("error", {})
-                if error_info.get("code") == 0:
-                    logger.info("✅ IxBrowser API健康检查通过")
-                    return True
-                else:
-                    logger.error(f"❌ IxBrowser API健康检查失败，code: {error_info.get('code')}")
-                    return False
+            data = self.client.post("health", path, payload)
+            error_info = data.get("error", {})
+            if error_info.get("code") == 0:
+                logger.info("✅ IxBrowser API健康检查通过")
+                return True
             else:
-                logger.error(f"❌ IxBrowser API健康检查失败，HTTP状态码: {response.status_code}")
+                logger.error(f"❌ IxBrowser API健康检查失败，code: {error_info.get('code')}")
                 return False
                 
         except Exception as e:
             logger.error(f"❌ IxBrowser API健康检查发生错误: {e}")
             return False
     
-    def start_browser(self, profile_id: str) -> Tuple[Any, Any, Any]:
-        """启动IxBrowser，支持重试机制"""
-        import requests
-        
-        # 构建API URL
-        api_url = f"http://127.0.0.1:{self.api_port}/api/v2/profile-open"
-        headers = {
-            "x-api-key": self.api_key,
-            "Content-Type": "application/json"
-        }
+    def open_profile(self, profile_id: str) -> str:
+        """打开IxBrowser窗口，支持重试机制"""
         payload = {
             "profile_id": int(profile_id),
             "load_extensions": True,
@@ -329,10 +388,7 @@ class IxBrowserInterface(BrowserInterface):
         
         for attempt in range(max_retries):
             try:
-                resp = requests.post(api_url, headers=headers, json=payload)
-                resp.raise_for_status()
-                
-                data = resp.json()
+                data = self.client.post("open", "/api/v2/profile-open", payload)
                 error_info = data.get("error", {})
                 error_code = error_info.get("code")
                 
@@ -349,14 +405,7 @@ class IxBrowserInterface(BrowserInterface):
                 # 成功启动
                 ws_endpoint = data["data"]["ws"]
                 logger.info(f"IxBrowser已启动，WebSocket: {ws_endpoint}")
-
-                playwright = sync_playwright().start()
-                browser = playwright.chromium.connect_over_cdp(ws_endpoint)
-                context = browser.contexts[0] if browser.contexts else browser.new_context()
-                page = context.new_page()
-                
-                logger.info("IxBrowser连接成功")
-                return playwright, browser, page
+                return ws_endpoint
                 
             except Exception as e:
                 # 如果是最后一次尝试，直接抛出异常
@@ -370,19 +419,8 @@ class IxBrowserInterface(BrowserInterface):
     def close_browser(self, profile_id: str) -> bool:
         """关闭IxBrowser"""
         try:
-            import requests
-            
-            close_url = f"http://127.0.0.1:{self.api_port}/api/v2/profile-close"
-            headers = {
-                "x-api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
             payload = {"profile_id": int(profile_id)}
-            
-            resp = requests.post(close_url, headers=headers, json=payload)
-            resp.raise_for_status()
-            
-            data = resp.json()
+            data = self.client.post("close", "/api/v2/profile-close", payload)
             error_info = data.get("error", {})
             if error_info.get("code") == 0:
                 logger.info(f"IxBrowser窗口关闭成功: id={profile_id}")
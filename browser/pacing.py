@@ -0,0 +1,186 @@
+"""
+操作节奏（Pacing）配置
+集中管理所有刻意加入的延迟：操作前停顿、点击/输入后停顿、逐字输入间隔
+
+- 通过 settings.yaml 的 pacing 段配置命名档位（fast / normal / cautious ...）
+- 可按 BrowserID 指定档位，在速度与账号安全之间按账号分级取舍
+- human_typing 决定文本字段逐字输入还是批量一次设置值
+- 按线程（异步模式下按协程任务）统计每个商品累计注入的刻意延迟，便于评估各档位的耗时
+"""
+import time
+import random
+import asyncio
+import contextvars
+from typing import Dict, Optional, Tuple
+from core.logger import logger
+from core.config import load_config
+
+# 内置档位，配置文件中同名档位的字段会覆盖这里的值
+# 各项为 [最小值, 最大值] 的均匀分布；typing_delay 单位为毫秒/字符，其余为秒
+# human_typing 为 false 时文本字段批量一次设置值（见 EnhancedSafeActions.safe_fill_with_config），为 true 时逐字输入
+DEFAULT_PROFILES = {
+    "fast": {
+        "before_action": [0.1, 0.3],
+        "after_click": [0.0, 0.2],
+        "after_input": [0.0, 0.2],
+        "typing_delay": [10, 30],
+        "human_typing": False,
+        "max_pause": 0.5,
+    },
+    "normal": {
+        "before_action": [0.5, 1.0],
+        "after_click": [0.2, 0.6],
+        "after_input": [0.2, 0.6],
+        "typing_delay": [40, 70],
+        "human_typing": False,
+        "max_pause": 1.5,
+    },
+    "cautious": {
+        "before_action": [1.0, 2.0],
+        "after_click": [2.0, 3.0],
+        "after_input": [2.0, 3.0],
+        "typing_delay": [60, 120],
+        "human_typing": True,
+        "max_pause": 4.0,
+    },
+}
+
+
+class PacingProfile:
+    """单个节奏档位：每种操作类型对应一个延迟区间，所有停顿都不超过 max_pause"""
+
+    def __init__(self, name: str, settings: Dict):
+        self.name = name
+        self.max_pause = float(settings.get("max_pause", 1.5))
+        self.human_typing = bool(settings.get("human_typing", False))
+        self.ranges: Dict[str, Tuple[float, float]] = {
+            key: (float(value[0]), float(value[1]))
+            for key, value in settings.items()
+            if key not in ("max_pause", "human_typing")
+        }
+
+    def sample(self, action: str) -> float:
+        """按操作类型采样一个停顿时长（秒），未配置的操作类型返回0"""
+        low, high = self.ranges.get(action, (0.0, 0.0))
+        return min(random.uniform(low, high), self.max_pause)
+
+    def sample_typing_delay(self) -> int:
+        """采样逐字输入间隔（毫秒）"""
+        low, high = self.ranges.get("typing_delay", (50.0, 50.0))
+        return int(random.uniform(low, high))
+
+
+# ========= 从配置文件加载参数 =========
+def _load_pacing_config():
+    """从配置文件加载节奏档位"""
+    try:
+        config = load_config().get("pacing", {}) or {}
+    except Exception as e:
+        logger.warning(f"加载pacing配置失败，使用默认值: {e}")
+        config = {}
+
+    profiles = {}
+    for name, settings in DEFAULT_PROFILES.items():
+        profiles[name] = dict(settings)
+    for name, settings in (config.get("profiles", {}) or {}).items():
+        profiles.setdefault(name, {}).update(settings or {})
+
+    default_profile = config.get("profile", "normal")
+    if default_profile not in profiles:
+        logger.warning(f"未知的节奏档位: {default_profile}，使用 normal")
+        default_profile = "normal"
+
+    accounts = {str(k): v for k, v in (config.get("accounts", {}) or {}).items()}
+    return {name: PacingProfile(name, settings) for name, settings in profiles.items()}, default_profile, accounts
+
+_PROFILES, DEFAULT_PROFILE, _ACCOUNT_PROFILES = _load_pacing_config()
+logger.info(f"Pacing配置已加载: 默认档位={DEFAULT_PROFILE}, 可用档位={list(_PROFILES.keys())}, 按账号指定={len(_ACCOUNT_PROFILES)}个")
+
+# 每个工作线程 / 协程任务独立的当前档位和延迟统计（并发模式下不同账号互不影响）
+# 每个线程有各自的上下文，asyncio 任务创建时复制上下文，因此两种并发方式下都互相隔离
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("pacing_profile", default=None)
+_total_delay: contextvars.ContextVar = contextvars.ContextVar("pacing_total_delay", default=0.0)
+
+
+def get_profile() -> PacingProfile:
+    """获取当前线程（或协程任务）使用的节奏档位"""
+    return _current_profile.get() or _PROFILES[DEFAULT_PROFILE]
+
+
+def get_profile_name_for_account(browser_id: Optional[str]) -> str:
+    """根据BrowserID获取对应的档位名称（未单独配置时使用默认档位）"""
+    name = _ACCOUNT_PROFILES.get(str(browser_id), DEFAULT_PROFILE) if browser_id is not None else DEFAULT_PROFILE
+    if name not in _PROFILES:
+        logger.warning(f"BrowserID {browser_id} 配置了未知的节奏档位: {name}，使用 {DEFAULT_PROFILE}")
+        name = DEFAULT_PROFILE
+    return name
+
+
+def begin_listing(browser_id: Optional[str] = None) -> PacingProfile:
+    """
+    开始处理一个商品：按账号选择档位并清零当前线程的延迟统计
+
+    Returns:
+        PacingProfile: 本商品使用的档位
+    """
+    profile = _PROFILES[get_profile_name_for_account(browser_id)]
+    _current_profile.set(profile)
+    _total_delay.set(0.0)
+    return profile
+
+
+def listing_delay_total() -> float:
+    """当前线程（或协程任务）自 begin_listing 以来累计注入的刻意延迟（秒，含逐字输入间隔）"""
+    return _total_delay.get()
+
+
+def _record(seconds: float) -> None:
+    _total_delay.set(listing_delay_total() + seconds)
+
+
+def sleep(seconds: float) -> float:
+    """执行一次刻意延迟并计入统计"""
+    if seconds > 0:
+        time.sleep(seconds)
+        _record(seconds)
+    return seconds
+
+
+def pause(action: str) -> float:
+    """
+    按当前档位对指定操作类型停顿
+
+    Args:
+        action: 操作类型（before_action / after_click / after_input ...）
+
+    Returns:
+        float: 实际停顿时长（秒）
+    """
+    return sleep(get_profile().sample(action))
+
+
+async def async_sleep(seconds: float) -> float:
+    """sleep 的异步版本：停顿期间事件循环可继续驱动其他浏览器"""
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+        _record(seconds)
+    return seconds
+
+
+async def async_pause(action: str) -> float:
+    """pause 的异步版本"""
+    return await async_sleep(get_profile().sample(action))
+
+
+def human_typing() -> bool:
+    """当前档位是否要求文本字段逐字输入（否则可批量一次设置值）"""
+    return get_profile().human_typing
+
+
+def typing_delay(text: str) -> int:
+    """
+    获取本次输入的逐字间隔（毫秒），并把整段文字的输入耗时计入统计
+    """
+    delay = get_profile().sample_typing_delay()
+    _record(len(text or "") * delay / 1000)
+    return delay
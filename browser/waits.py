@@ -0,0 +1,140 @@
+"""
+事件驱动的等待策略
+每一步等待一个具体信号（DOM稳定、DOM变化、元素数量），而不是固定时长的睡眠
+"""
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeout  # pyright: ignore[reportMissingImports]
+from core.logger import logger
+from core.config import load_config
+from .pacing import pause
+
+# ========= 从配置文件加载参数 =========
+def _load_waits_config():
+    """从配置文件加载等待策略参数"""
+    defaults = {
+        "dom_quiet_ms": 300,
+        "settle_timeout": 3000,
+    }
+    try:
+        config = load_config()
+        defaults.update(config.get("waits", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载waits配置失败，使用默认值: {e}")
+    return defaults
+
+_waits_config = _load_waits_config()
+DOM_QUIET_MS = int(_waits_config["dom_quiet_ms"])
+SETTLE_TIMEOUT = int(_waits_config["settle_timeout"])
+
+# 在页面中等待：连续 quiet 毫秒内没有DOM变化，或超过 timeout 毫秒
+_DOM_SETTLED_JS = """
+([quiet, timeout]) => new Promise(resolve => {
+    let quietTimer = null;
+    const finish = settled => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(settled);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quiet);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    quietTimer = setTimeout(() => finish(true), quiet);
+    const hardTimer = setTimeout(() => finish(false), timeout);
+})
+"""
+
+# 在页面中等待：出现任意一次DOM变化，或超过 timeout 毫秒
+_DOM_CHANGED_JS = """
+(timeout) => new Promise(resolve => {
+    const observer = new MutationObserver(() => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve(true);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    const timer = setTimeout(() => { observer.disconnect(); resolve(false); }, timeout);
+})
+"""
+
+
+def wait_for_dom_settled(page: Page, quiet_ms: int = None, timeout: int = None) -> bool:
+    """
+    等待页面DOM稳定（连续 quiet_ms 毫秒无变化）
+
+    Args:
+        page: Playwright页面对象
+        quiet_ms: 视为稳定所需的无变化时长（毫秒）
+        timeout: 最长等待时间（毫秒）
+
+    Returns:
+        bool: True表示已稳定，False表示超时（页面持续变化）
+    """
+    quiet_ms = DOM_QUIET_MS if quiet_ms is None else quiet_ms
+    timeout = SETTLE_TIMEOUT if timeout is None else timeout
+    try:
+        return bool(page.evaluate(_DOM_SETTLED_JS, [quiet_ms, timeout]))
+    except Exception as e:
+        # 等待期间发生页面跳转会销毁执行上下文，改为等待新页面的DOM加载
+        logger.debug(f"DOM稳定等待被中断: {e}")
+        try:
+            page.wait_for_load_state("domcontentloaded", timeout=timeout)
+        except Exception:
+            pass
+        return False
+
+
+def wait_for_dom_change(page: Page, timeout: int = 1000) -> bool:
+    """
+    等待下一次DOM变化，用于替代轮询循环中的固定间隔
+
+    Returns:
+        bool: True表示发生了变化，False表示超时无变化或等待被中断
+    """
+    try:
+        return bool(page.evaluate(_DOM_CHANGED_JS, timeout))
+    except Exception as e:
+        logger.debug(f"DOM变化等待被中断: {e}")
+        return False
+
+
+def settle(page: Page, action: str = "after_click", timeout: int = None) -> bool:
+    """
+    操作后的标准等待：等待DOM稳定，再按当前节奏档位停顿（见 browser.pacing）
+    
+    Args:
+        action: 节奏档位中的操作类型（after_click / after_input）
+    """
+    settled = wait_for_dom_settled(page, timeout=timeout)
+    pause(action)
+    return settled
+
+
+def wait_for_element_count(page: Page, selector: str, count: int, timeout: int = 30000,
+                           absent_selector: str = None) -> bool:
+    """
+    等待页面中匹配 selector 的元素数量达到 count（且 absent_selector 匹配的元素不存在，如上传进度指示）
+
+    Args:
+        selector: CSS选择器（可包含逗号分隔的多个选择器）
+        count: 期望的最少数量
+        timeout: 最长等待时间（毫秒）
+        absent_selector: 必须不存在的元素选择器（可选）
+
+    Returns:
+        bool: 是否在超时前达到数量
+    """
+    try:
+        page.wait_for_function(
+            "([sel, n, absent]) => document.querySelectorAll(sel).length >= n"
+            " && !(absent && document.querySelector(absent))",
+            arg=[selector, count, absent_selector],
+            timeout=timeout
+        )
+        return True
+    except PlaywrightTimeout:
+        return False
+    except Exception as e:
+        logger.debug(f"等待元素数量失败: {selector}, 错误: {e}")
+        return False
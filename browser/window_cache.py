@@ -0,0 +1,135 @@
+"""
+BitBrowser窗口映射缓存
+把 序号(seq) -> 窗口ID 的映射持久化到本地，在有效期内启动时无需重新拉取完整窗口列表
+"""
+
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from core.logger import logger
+from core.config import load_config
+from core.file_store import JsonFileStore
+
+# ========= 从配置文件加载参数 =========
+def _load_window_cache_config():
+    """从配置文件加载窗口映射缓存参数"""
+    defaults = {
+        "ttl": 3600,
+        "file": ".cache/bitbrowser_windows.json",
+        "list_workers": 4,
+    }
+    try:
+        config = load_config()
+        browser_config = config.get("browser", {}) or {}
+        defaults.update(browser_config.get("window_cache", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载window_cache配置失败，使用默认值: {e}")
+    return defaults
+
+_window_cache_config = _load_window_cache_config()
+WINDOW_CACHE_TTL = float(_window_cache_config["ttl"] or 0)
+WINDOW_CACHE_FILE = _window_cache_config["file"]
+WINDOW_LIST_WORKERS = int(_window_cache_config["list_workers"] or 1)
+
+WindowMap = Dict[int, Dict[str, str]]
+
+
+class WindowMapCache:
+    """
+    BitBrowser窗口映射缓存（持久化到本地JSON文件，多进程共用）
+
+    - 按 API 端口区分，不同的 BitBrowser 实例互不影响
+    - 超过有效期后整体失效，下次获取时重新拉取完整列表
+    - 按序号单独刷新的窗口合并进现有缓存，不延长整体有效期
+    - 每次读取文件的最新内容，修改在跨进程锁内合并写回，其他进程的 invalidate 不会被覆盖
+    """
+
+    def __init__(self, cache_file: str = WINDOW_CACHE_FILE, ttl: float = WINDOW_CACHE_TTL):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self._store = JsonFileStore(self.cache_file, "窗口映射缓存")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, api_port: int) -> Optional[WindowMap]:
+        """
+        获取有效期内的窗口映射
+
+        Returns:
+            Optional[WindowMap]: 有效时返回映射（JSON中的字符串序号还原为int），否则返回None
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._store.read().get(str(api_port))
+        if not entry:
+            return None
+
+        age = time.time() - entry["fetched_at"]
+        if age > self.ttl:
+            return None
+
+        windows = {int(seq): dict(info) for seq, info in entry["windows"].items()}
+        logger.info(f"♻️ 使用 {int(age)} 秒前缓存的窗口映射，窗口总数: {len(windows)}")
+        return windows
+
+    def put(self, api_port: int, windows: WindowMap) -> None:
+        """保存完整拉取的窗口映射，重新开始计算有效期"""
+        if not self.enabled:
+            return
+
+        try:
+            with self._store.modify() as entries:
+                entries[str(api_port)] = {
+                    "fetched_at": time.time(),
+                    "windows": {str(seq): info for seq, info in windows.items()},
+                }
+        except Exception as e:
+            logger.warning(f"保存窗口映射缓存失败: {e}")
+
+    def update(self, api_port: int, windows: WindowMap) -> None:
+        """把按序号刷新到的窗口合并进现有缓存（缓存不存在时不创建）"""
+        if not self.enabled or not windows:
+            return
+
+        try:
+            with self._store.modify() as entries:
+                entry = entries.get(str(api_port))
+                if entry:
+                    entry["windows"].update({str(seq): info for seq, info in windows.items()})
+        except Exception as e:
+            logger.warning(f"保存窗口映射缓存失败: {e}")
+
+    def find_seq(self, api_port: int, window_id: str) -> Optional[int]:
+        """在有效期内的缓存中查找窗口ID对应的序号，用于判断打开失败的窗口ID是否来自缓存"""
+        if not self.enabled:
+            return None
+
+        entry = self._store.read().get(str(api_port))
+        if not entry or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return next((int(seq) for seq, info in entry["windows"].items() if info.get("id") == window_id), None)
+
+    def invalidate(self, api_port: int) -> None:
+        """清除指定端口的缓存"""
+        try:
+            with self._store.modify() as entries:
+                entries.pop(str(api_port), None)
+        except Exception as e:
+            logger.warning(f"清除窗口映射缓存失败: {e}")
+
+
+# 全局缓存实例
+_window_cache = None
+_window_cache_lock = threading.Lock()
+
+def get_window_cache() -> WindowMapCache:
+    """获取全局窗口映射缓存实例"""
+    global _window_cache
+    with _window_cache_lock:
+        if _window_cache is None:
+            _window_cache = WindowMapCache()
+    return _window_cache
@@ -62,17 +62,17 @@ class CarousellBuilder:
             "PIL","PIL._imaging","PIL.Image",
             "pymsgbox","pytweening","pyscreeze","mouseinfo",
             # 项目模块
-            "core","core.config","core.logger","core.models",
-            "browser","browser.browser","browser.actions","browser.browser_factory","browser.browser_interface","browser.browser_selector",
-            "data","data.excel_parser","data.record_manager",
-            "uploader","uploader.core","uploader.core.base_uploader","uploader.core.carousell_uploader",
-            "uploader.actions","uploader.actions.enhanced_safe_actions",
-            "uploader.config","uploader.config.enhanced_css_selector_manager","uploader.config.regional_config_loader",
+            "core","core.config","core.logger","core.models","core.file_store",
+            "browser","browser.browser","browser.actions","browser.waits","browser.pacing","browser.browser_factory","browser.browser_interface","browser.api_client","browser.window_cache","browser.async_waits","browser.async_actions","browser.async_browser_interface","browser.browser_selector",
+            "data","data.excel_parser","data.record_manager","data.work_queue",
+            "uploader","uploader.core","uploader.core.base_uploader","uploader.core.carousell_uploader","uploader.core.async_base_uploader","uploader.core.step_graph","uploader.core.flow_uploader",
+            "uploader.actions","uploader.actions.enhanced_safe_actions","uploader.actions.selector_race","uploader.actions.async_safe_actions",
+            "uploader.config","uploader.config.enhanced_css_selector_manager","uploader.config.regional_config_loader","uploader.config.selector_index",
             "uploader.factory","uploader.factory.uploader_factory",
-            "uploader.multi","uploader.multi.multi_account_uploader",
-            "uploader.utils","uploader.utils.utils",
+            "uploader.multi","uploader.multi.multi_account_uploader","uploader.multi.profile_warmer","uploader.multi.async_runner","uploader.multi.process_pool","uploader.multi.distributed",
+            "uploader.utils","uploader.utils.utils","uploader.utils.ip_validator","uploader.utils.ip_verdict_cache","uploader.utils.step_journal",
             "uploader.regions","uploader.regions.hk","uploader.regions.sg",
-            "cli","cli.main","cli.cli",
+            "cli","cli.main","cli.cli","cli.worker",
         ]
 
     # ---------------------- 日志 ----------------------
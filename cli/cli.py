@@ -1,4 +1,5 @@
 import argparse
+import logging
 import sys
 from pathlib import Path
 from core.config import create_upload_config
@@ -42,7 +43,7 @@ def main():
     try:
         # 设置日志级别
         if args.verbose:
-            logger.setLevel(logger.DEBUG)
+            logger.setLevel(logging.DEBUG)
         
         # 加载配置
         config = create_upload_config()
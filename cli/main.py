@@ -1,3 +1,4 @@
+import multiprocessing
 import signal
 import sys
 from core.config import create_upload_config
@@ -319,4 +320,6 @@ def run():
         raise
 
 if __name__ == "__main__":
+    # 打包后的程序在多进程模式下启动工作进程时需要
+    multiprocessing.freeze_support()
     run()
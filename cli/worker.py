@@ -0,0 +1,34 @@
+import argparse
+import logging
+import sys
+from core.config import create_upload_config
+from core.logger import logger
+from uploader.multi.distributed import DistributedWorker
+
+def main():
+    """分布式上传工作进程入口：从共享队列领取BrowserID分组并上传"""
+    parser = argparse.ArgumentParser(description="Carousell 分布式上传工作进程")
+    parser.add_argument("--queue", help="共享队列文件路径（默认读取配置 execution.distributed.queue_file）")
+    parser.add_argument("--worker-id", help="工作进程标识（默认 主机名:PID）")
+    parser.add_argument("--exit-when-idle", action="store_true", help="队列中没有未完成的任务时退出")
+    parser.add_argument("--verbose", "-v", action="store_true", help="详细输出")
+
+    args = parser.parse_args()
+
+    try:
+        if args.verbose:
+            logger.setLevel(logging.DEBUG)
+
+        config = create_upload_config()
+        worker = DistributedWorker(config, args.queue, args.worker_id)
+        worker.run(exit_when_idle=args.exit_when_idle)
+
+    except KeyboardInterrupt:
+        logger.info("用户中断工作进程")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"工作进程出错: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
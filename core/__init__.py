@@ -18,11 +18,12 @@ def get_logger():
 
 # 为了向后兼容，提供直接导入
 try:
-    from .models import ProductInfo, UploadConfig
+    from .models import ProductInfo, ProductRecord, UploadConfig
     from .logger import logger
 except ImportError:
     # 如果依赖包未安装，提供占位符
     ProductInfo = None
+    ProductRecord = None
     UploadConfig = None
     logger = None
 
@@ -31,6 +32,7 @@ __all__ = [
     'get_models', 
     'get_logger',
     'ProductInfo',
+    'ProductRecord',
     'UploadConfig',
     'logger'
 ]
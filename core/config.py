@@ -60,7 +60,9 @@ def create_upload_config() -> UploadConfig:
         meetup_locations=config["product"]["meetup_locations"],
         domains=config["domains"],
         categories=config["product"]["categories"],
-        navigation_timeouts=config.get("navigation", {})
+        navigation_timeouts=config.get("navigation", {}),
+        execution=config.get("execution", {}),
+        upload_method=config["upload"].get("method", "file_input")
     )
 
 # 保持向后兼容 - 移除模块级别的配置加载以避免重复日志
@@ -0,0 +1,91 @@
+"""
+本地JSON文件存储
+多个进程共用的小型缓存文件（IP校验缓存、窗口映射缓存）：修改时持有跨进程文件锁，
+在锁内重新读取最新内容再写回，写入使用按进程区分的临时文件后替换
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+from core.logger import logger
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class JsonFileStore:
+    """
+    JSON文件存储（多线程、多进程安全）
+
+    - read 每次读取文件的最新内容，不在进程内保留副本，其他进程的修改（如 invalidate）立即可见
+    - modify 在跨进程锁内读取、修改并写回，代码块抛出异常时不写回
+    """
+
+    def __init__(self, path: str, name: str):
+        """
+        Args:
+            path: JSON文件路径
+            name: 日志中显示的名称，如 "IP校验缓存"
+        """
+        self.path = Path(path)
+        self.name = name
+        self.lock_file = self.path.with_name(self.path.name + ".lock")
+        # 文件锁按进程生效，同一进程内的线程由 _lock 串行化
+        self._lock = threading.RLock()
+
+    def read(self) -> Dict[str, Any]:
+        """读取文件内容，文件不存在或损坏时返回空字典"""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f) or {}
+        except Exception as e:
+            logger.warning(f"读取{self.name}失败，忽略已有内容: {e}")
+            return {}
+
+    @contextmanager
+    def modify(self) -> Iterator[Dict[str, Any]]:
+        """持有跨进程锁读取最新内容，代码块正常结束后写回"""
+        with self._lock, self._file_lock():
+            data = self.read()
+            yield data
+            self._write(data)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """先写本进程的临时文件再替换，避免中断时留下不完整的文件"""
+        tmp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """跨进程文件锁（Windows 使用 msvcrt，其他系统使用 fcntl）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'a+') as f:
+            if os.name == "nt":
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+                try:
+                    yield
+                finally:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -1,10 +1,32 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import List, NamedTuple, Optional, Union
 from pathlib import Path
 
-@dataclass
-class ProductInfo:
-    """商品信息数据类"""
+
+class ProductRecord(NamedTuple):
+    """
+    Excel 中一行商品数据（不可变、无实例字典，可在线程/进程间安全传递）
+    """
+    sku: str
+    browser_id: str
+    product_name_cn: str = ""
+    product_name_en: str = ""
+    gender_en: str = ""
+    price: str = "0"
+    brand: str = ""
+    folder: str = ""
+    region: str = ""
+
+    def with_overrides(self, **changes) -> "ProductRecord":
+        """返回替换了指定字段的新记录"""
+        return self._replace(**changes)
+
+
+class ProductInfo(NamedTuple):
+    """
+    商品信息（不可变、无实例字典）
+    description / size / meetup_location 由 enrich_product_info 填充
+    """
     title: str
     price: str
     category: str = "others"
@@ -13,6 +35,13 @@ class ProductInfo:
     gender: str = "unisex"  # male, female, unisex
     location: str = "All of Singapore"
     multi_quantity: bool = False
+    description: Optional[str] = None
+    size: Optional[Union[str, int]] = None
+    meetup_location: Optional[str] = None
+
+    def with_overrides(self, **changes) -> "ProductInfo":
+        """返回替换了指定字段的新商品信息"""
+        return self._replace(**changes)
 
 @dataclass
 class UploadConfig:
@@ -30,4 +59,6 @@ class UploadConfig:
     domains: dict  # 地域域名配置
     categories: dict  # 商品类目配置
     navigation_timeouts: dict  # 页面导航超时配置
+    execution: dict = field(default_factory=dict)  # 多账号执行配置（串行/并发）
+    upload_method: str = "file_input"  # 图片上传方式: file_input / keyboard
 
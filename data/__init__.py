@@ -12,18 +12,26 @@ def get_record_manager():
     from .record_manager import SuccessRecordManager
     return SuccessRecordManager
 
+def get_work_queue():
+    from .work_queue import WorkQueue
+    return WorkQueue
+
 # 为了向后兼容，提供直接导入（如果依赖包可用）
 try:
     from .excel_parser import ExcelProductParser
     from .record_manager import SuccessRecordManager
+    from .work_queue import WorkQueue
 except ImportError:
     # 如果依赖包未安装，提供占位符
     ExcelProductParser = None
     SuccessRecordManager = None
+    WorkQueue = None
 
 __all__ = [
     'get_excel_parser',
     'get_record_manager',
+    'get_work_queue',
     'ExcelProductParser',
-    'SuccessRecordManager'
+    'SuccessRecordManager',
+    'WorkQueue'
 ]
@@ -1,82 +1,260 @@
+import os
+import pickle
+import hashlib
 import pandas as pd # type: ignore
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional, Iterator
 from pathlib import Path
-from core.models import ProductInfo # type: ignore
+from core.models import ProductInfo, ProductRecord # type: ignore
 from core.logger import logger # type: ignore   
+from core.config import load_config # type: ignore
+
+# ========= 从配置文件加载参数 =========
+def _load_parse_cache_config():
+    """从配置文件加载解析缓存参数"""
+    defaults = {
+        "enabled": True,
+        "dir": ".cache/parsed_sheets",
+    }
+    try:
+        config = load_config()
+        defaults.update(config.get("parse_cache", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载parse_cache配置失败，使用默认值: {e}")
+    return defaults
+
+_parse_cache_config = _load_parse_cache_config()
+PARSE_CACHE_ENABLED = bool(_parse_cache_config["enabled"])
+PARSE_CACHE_DIR = Path(_parse_cache_config["dir"])
+
+# 解析结果格式变化时递增，使旧缓存失效
+_PARSE_CACHE_VERSION = 3
+
+# 全角到半角字符映射
+_FULLWIDTH_TO_HALFWIDTH = str.maketrans({
+    'Ｗ': 'W', 'Ａ': 'A', 'Ｂ': 'B', 'Ｃ': 'C', 'Ｄ': 'D', 'Ｅ': 'E', 'Ｆ': 'F', 'Ｇ': 'G', 'Ｈ': 'H',
+    'Ｉ': 'I', 'Ｊ': 'J', 'Ｋ': 'K', 'Ｌ': 'L', 'Ｍ': 'M', 'Ｎ': 'N', 'Ｏ': 'O', 'Ｐ': 'P', 'Ｑ': 'Q',
+    'Ｒ': 'R', 'Ｓ': 'S', 'Ｔ': 'T', 'Ｕ': 'U', 'Ｖ': 'V', 'Ｘ': 'X', 'Ｙ': 'Y', 'Ｚ': 'Z',
+    'ａ': 'a', 'ｂ': 'b', 'ｃ': 'c', 'ｄ': 'd', 'ｅ': 'e', 'ｆ': 'f', 'ｇ': 'g', 'ｈ': 'h',
+    'ｉ': 'i', 'ｊ': 'j', 'ｋ': 'k', 'ｌ': 'l', 'ｍ': 'm', 'ｎ': 'n', 'ｏ': 'o', 'ｐ': 'p', 'ｑ': 'q',
+    'ｒ': 'r', 'ｓ': 's', 'ｔ': 't', 'ｕ': 'u', 'ｖ': 'v', 'ｗ': 'w', 'ｘ': 'x', 'ｙ': 'y', 'ｚ': 'z',
+    '０': '0', '１': '1', '２': '2', '３': '3', '４': '4', '５': '5', '６': '6', '７': '7', '８': '8', '９': '9',
+    '　': ' ', '（': '(', '）': ')', '，': ',', '。': '.', '：': ':', '；': ';', '？': '?', '！': '!'
+})
 
 class ExcelProductParser:
     """Excel 商品信息解析器"""
     
-    def __init__(self, excel_path: str):
+    def __init__(self, excel_path: str, must_exist: bool = True):
+        """
+        Args:
+            excel_path: 表格路径
+            must_exist: 是否检查表格存在（分布式/多进程工作进程只用 create_product_info，不读取表格）
+        """
         self.excel_path = Path(excel_path)
-        if not self.excel_path.exists():
+        if must_exist and not self.excel_path.exists():
             raise FileNotFoundError(f"Excel 文件不存在: {excel_path}")
+        # 文件夹路径解析结果，流式解析时跨块复用
+        self._resolved_paths: Dict[str, str] = {}
     
-    def parse_products(self, region: str) -> List[Dict[str, Any]]:
+    def parse_products(self, region: str, use_cache: bool = None) -> List[ProductRecord]:
         """
         解析 Excel 文件中的商品信息
         
+        同一文件（路径、大小、修改时间、内容哈希均一致）和地域的解析结果会缓存到本地，
+        重复运行时直接读取缓存，跳过解析、标准化和文件夹校验
+        
         Args:
             region (str): 地域代码 (HK, MY, SG)
+            use_cache (bool): 是否使用解析缓存，默认读取配置 parse_cache.enabled
             
         Returns:
-            List[Dict[str, Any]]: 解析后的商品信息列表
+            List[ProductRecord]: 解析后的商品信息列表
         """
         try:
+            if use_cache is None:
+                use_cache = PARSE_CACHE_ENABLED
+            
+            cache_file = self._get_cache_file(region) if use_cache else None
+            if cache_file:
+                products = self._load_cache(cache_file)
+                if products is not None:
+                    logger.info(f"Excel 未变化，使用解析缓存: {cache_file}，共 {len(products)} 个商品")
+                    return products
+            
             logger.info(f"开始解析 Excel 文件: {self.excel_path}")
             
             # 读取 Excel 文件
             df = pd.read_excel(self.excel_path)
             
-            # 验证必要的列是否存在
-            required_columns = [
-                'SKU', 'BrowserID', 'ProductNameCn', 'ProductNameEn',
-                'GenderEn', 'HKPrice', 'SGPrice', 'MYPrice',
-                'Brand', 'Folder'
-            ]
-            
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"Excel 文件缺少必要的列: {missing_columns}")
-            
-            # 根据地域选择价格列
-            price_column = self._get_price_column(region)
-            if price_column not in df.columns:
-                raise ValueError(f"地域 {region} 对应的价格列 {price_column} 不存在")
-            
-            products = []
-            for index, row in df.iterrows():
-                try:
-                    # 跳过空行
-                    if pd.isna(row['SKU']) or pd.isna(row['BrowserID']):
-                        continue
-                    
-                    product_info = {
-                        'sku': self._normalize_text(str(row['SKU'])),
-                        'browser_id': str(row['BrowserID']),
-                        'product_name_cn': self._normalize_text(str(row['ProductNameCn'])) if not pd.isna(row['ProductNameCn']) else '',
-                        'product_name_en': self._normalize_text(str(row['ProductNameEn'])) if not pd.isna(row['ProductNameEn']) else '',
-                        'gender_en': self._normalize_text(str(row['GenderEn'])) if not pd.isna(row['GenderEn']) else '',
-                        'price': self._normalize_text(str(row[price_column])) if not pd.isna(row[price_column]) else '0',
-                        'brand': self._normalize_text(str(row['Brand'])) if not pd.isna(row['Brand']) else '',
-                        'folder': self._normalize_path(str(row['Folder'])) if not pd.isna(row['Folder']) else '',
-                        'region': region
-                    }
-                    
-                    products.append(product_info)
-                    logger.info(f"解析商品 {index + 1}: SKU={product_info['sku']}, 价格={product_info['price']}")
-                    
-                except Exception as e:
-                    logger.error(f"解析第 {index + 1} 行数据失败: {e}")
-                    continue
+            price_column = self._validate_columns(df.columns, region)
+            products = self._parse_frame(df, region, price_column)
             
             logger.info(f"Excel 解析完成，共解析 {len(products)} 个商品")
+            if cache_file:
+                self._save_cache(cache_file, products)
             return products
             
         except Exception as e:
             logger.error(f"解析 Excel 文件失败: {e}")
             raise
     
+    def iter_products(self, region: str, chunk_size: int = 1000) -> Iterator[ProductRecord]:
+        """
+        流式解析商品信息：按块读取并逐个产出，内存占用只与块大小有关
+        
+        .csv 使用 pandas 分块读取，.xlsx/.xlsm 使用 openpyxl 只读模式逐行读取，
+        其他格式退回到一次性读取
+        
+        Args:
+            region (str): 地域代码 (HK, MY, SG)
+            chunk_size (int): 每块的行数
+            
+        Yields:
+            ProductRecord: 与 parse_products 相同格式的商品信息
+        """
+        logger.info(f"开始流式解析 Excel 文件: {self.excel_path}")
+        suffix = self.excel_path.suffix.lower()
+        
+        if suffix == '.csv':
+            chunks = pd.read_csv(self.excel_path, chunksize=chunk_size, dtype=object)
+        elif suffix in ('.xlsx', '.xlsm'):
+            chunks = self._iter_excel_chunks(chunk_size)
+        else:
+            chunks = iter([pd.read_excel(self.excel_path)])
+        
+        count = 0
+        price_column = None
+        for df in chunks:
+            if price_column is None:
+                price_column = self._validate_columns(df.columns, region)
+            for product in self._parse_frame(df, region, price_column):
+                count += 1
+                yield product
+        
+        logger.info(f"Excel 流式解析完成，共解析 {count} 个商品")
+    
+    def _iter_excel_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """以 openpyxl 只读模式逐行读取第一个工作表，每 chunk_size 行产出一个 DataFrame"""
+        from openpyxl import load_workbook  # type: ignore
+        
+        workbook = load_workbook(self.excel_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            # 保持单元格原始类型，避免各块分别推断列类型导致同一列格式不一致
+            header = [str(col).strip() if col is not None else '' for col in header]
+            
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield pd.DataFrame(chunk, columns=header, dtype=object)
+                    chunk = []
+            yield pd.DataFrame(chunk, columns=header, dtype=object)
+        finally:
+            workbook.close()
+    
+    def _get_cache_file(self, region: str) -> Optional[Path]:
+        """
+        根据 文件路径 + 大小 + 修改时间 + 内容哈希 + 地域 + 当前工作目录 生成缓存文件路径
+        
+        缓存中保存的是已解析为绝对路径的 Folder，表格中的相对路径随工作目录变化，因此工作目录也计入缓存键；
+        文件名前缀只取决于路径和地域，写入新缓存时据此清理同一表格的旧缓存
+        """
+        try:
+            resolved = str(self.excel_path.resolve())
+            stat = self.excel_path.stat()
+            content_hash = hashlib.sha256()
+            with open(self.excel_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    content_hash.update(block)
+        except OSError as e:
+            logger.warning(f"计算解析缓存键失败，跳过缓存: {e}")
+            return None
+        
+        prefix = f"{hashlib.sha256(resolved.encode('utf-8')).hexdigest()[:16]}_{region}"
+        key = hashlib.sha256(
+            f"{resolved}|{stat.st_size}|{stat.st_mtime_ns}|{region}|{content_hash.hexdigest()}|"
+            f"{os.getcwd()}|{_PARSE_CACHE_VERSION}".encode('utf-8')
+        ).hexdigest()[:32]
+        return PARSE_CACHE_DIR / f"{prefix}_{key}.pkl"
+    
+    def _load_cache(self, cache_file: Path) -> Optional[List[ProductRecord]]:
+        """读取解析缓存，不存在或损坏时返回None"""
+        if not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"读取解析缓存失败，重新解析: {cache_file}, 错误: {e}")
+            return None
+    
+    def _save_cache(self, cache_file: Path, products: List[ProductRecord]) -> None:
+        """写入解析缓存（先写临时文件再替换），并删除同一表格和地域的旧缓存"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            prefix = cache_file.name.rsplit('_', 1)[0]
+            for stale in cache_file.parent.glob(f"{prefix}_*.pkl"):
+                if stale != cache_file:
+                    stale.unlink()
+            
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(products, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+            logger.info(f"解析结果已缓存: {cache_file}")
+        except Exception as e:
+            logger.warning(f"写入解析缓存失败: {e}")
+    
+    def _validate_columns(self, columns, region: str) -> str:
+        """
+        验证必要的列是否存在
+        
+        Returns:
+            str: 地域对应的价格列名
+        """
+        required_columns = [
+            'SKU', 'BrowserID', 'ProductNameCn', 'ProductNameEn',
+            'GenderEn', 'HKPrice', 'SGPrice', 'MYPrice',
+            'Brand', 'Folder'
+        ]
+        
+        missing_columns = [col for col in required_columns if col not in columns]
+        if missing_columns:
+            raise ValueError(f"Excel 文件缺少必要的列: {missing_columns}")
+        
+        # 根据地域选择价格列
+        price_column = self._get_price_column(region)
+        if price_column not in columns:
+            raise ValueError(f"地域 {region} 对应的价格列 {price_column} 不存在")
+        
+        return price_column
+    
+    def _parse_frame(self, df: pd.DataFrame, region: str, price_column: str) -> List[ProductRecord]:
+        """把一个 DataFrame（整表或一个块）转换为商品信息列表"""
+        # 跳过空行（SKU 或 BrowserID 为空）
+        df = df[df['SKU'].notna() & df['BrowserID'].notna()]
+        
+        # 按列整体处理，避免逐行 iterrows 和逐单元格判空（列顺序与 ProductRecord 字段顺序一致）
+        columns = {
+            'sku': self._normalize_column(self._integral_ids(df['SKU']), ''),
+            'browser_id': self._integral_ids(df['BrowserID']).astype(str).tolist(),
+            'product_name_cn': self._normalize_column(df['ProductNameCn'], ''),
+            'product_name_en': self._normalize_column(df['ProductNameEn'], ''),
+            'gender_en': self._normalize_column(df['GenderEn'], ''),
+            'price': self._normalize_column(df[price_column], '0'),
+            'brand': self._normalize_column(df['Brand'], ''),
+            'folder': self._normalize_path_column(df['Folder']),
+        }
+        
+        return [
+            ProductRecord(*values, region=region)
+            for values in zip(*columns.values())
+        ]
+    
     def _normalize_text(self, text: str) -> str:
         """
         标准化文本，处理全角/半角字符问题
@@ -91,25 +269,8 @@ class ExcelProductParser:
             return text
             
         try:
-            # 全角到半角字符映射
-            fullwidth_to_halfwidth = {
-                'Ｗ': 'W', 'Ａ': 'A', 'Ｂ': 'B', 'Ｃ': 'C', 'Ｄ': 'D', 'Ｅ': 'E', 'Ｆ': 'F', 'Ｇ': 'G', 'Ｈ': 'H',
-                'Ｉ': 'I', 'Ｊ': 'J', 'Ｋ': 'K', 'Ｌ': 'L', 'Ｍ': 'M', 'Ｎ': 'N', 'Ｏ': 'O', 'Ｐ': 'P', 'Ｑ': 'Q',
-                'Ｒ': 'R', 'Ｓ': 'S', 'Ｔ': 'T', 'Ｕ': 'U', 'Ｖ': 'V', 'Ｘ': 'X', 'Ｙ': 'Y', 'Ｚ': 'Z',
-                'ａ': 'a', 'ｂ': 'b', 'ｃ': 'c', 'ｄ': 'd', 'ｅ': 'e', 'ｆ': 'f', 'ｇ': 'g', 'ｈ': 'h',
-                'ｉ': 'i', 'ｊ': 'j', 'ｋ': 'k', 'ｌ': 'l', 'ｍ': 'm', 'ｎ': 'n', 'ｏ': 'o', 'ｐ': 'p', 'ｑ': 'q',
-                'ｒ': 'r', 'ｓ': 's', 'ｔ': 't', 'ｕ': 'u', 'ｖ': 'v', 'ｗ': 'w', 'ｘ': 'x', 'ｙ': 'y', 'ｚ': 'z',
-                '０': '0', '１': '1', '２': '2', '３': '3', '４': '4', '５': '5', '６': '6', '７': '7', '８': '8', '９': '9',
-                '　': ' ', '（': '(', '）': ')', '，': ',', '。': '.', '：': ':', '；': ';', '？': '?', '！': '!'
-            }
-            
-            # 替换全角字符为半角字符
-            normalized_text = text
-            for fullwidth, halfwidth in fullwidth_to_halfwidth.items():
-                normalized_text = normalized_text.replace(fullwidth, halfwidth)
-            
-            # 去除首尾空格
-            normalized_text = normalized_text.strip()
+            # 替换全角字符为半角字符，并去除首尾空格
+            normalized_text = text.translate(_FULLWIDTH_TO_HALFWIDTH).strip()
             
             if normalized_text != text:
                 logger.info(f"文本标准化: '{text}' -> '{normalized_text}'")
@@ -120,6 +281,46 @@ class ExcelProductParser:
             logger.error(f"文本标准化失败: {text}, 错误: {e}")
             return text
 
+    @staticmethod
+    def _integral_ids(column: pd.Series) -> pd.Series:
+        """
+        编号列中的整数值浮点数转为整数（如 12.0 -> 12）
+
+        pandas 整表读取时含空值的数字列会变成浮点数，openpyxl 逐行读取时保持整数，
+        统一后批量和流式解析得到相同的 SKU / BrowserID 字符串
+        """
+        return column.map(lambda value: int(value) if isinstance(value, float) and value.is_integer() else value)
+
+    def _normalize_column(self, column: pd.Series, default: str) -> List[str]:
+        """
+        按列标准化文本（与 _normalize_text 结果一致），空值替换为 default
+        
+        Args:
+            column: 原始列
+            default: 空单元格的取值
+            
+        Returns:
+            List[str]: 标准化后的文本列表
+        """
+        missing = column.isna()
+        raw = column.astype(str)
+        normalized = raw.str.translate(_FULLWIDTH_TO_HALFWIDTH).str.strip()
+        
+        changed = int(((normalized != raw) & ~missing).sum())
+        if changed:
+            logger.info(f"列 {column.name} 文本标准化: {changed} 个单元格")
+        
+        return normalized.mask(missing, default).tolist()
+
+    def _normalize_path_column(self, column: pd.Series) -> List[str]:
+        """按列标准化路径，相同文件夹只解析和检查一次，空值替换为空字符串"""
+        missing = column.isna()
+        raw = column.astype(str)
+        for path in raw[~missing].unique():
+            if path not in self._resolved_paths:
+                self._resolved_paths[path] = self._normalize_path(path)
+        return raw.map(self._resolved_paths).mask(missing, '').tolist()
+
     def _normalize_path(self, path: str) -> str:
         """
         标准化路径，处理中文路径和编码问题
@@ -160,31 +361,31 @@ class ExcelProductParser:
         
         return price_mapping[region]
     
-    def _get_title_by_region(self, product_data: Dict[str, Any]) -> str:
+    def _get_title_by_region(self, product_data: ProductRecord) -> str:
         """根据地域获取对应的商品标题"""
-        region = product_data['region']
+        region = product_data.region
         
         if region == 'HK':
             # HK地域使用中文标题
-            title = product_data['product_name_cn'] or product_data['product_name_en']
+            title = product_data.product_name_cn or product_data.product_name_en
         elif region == 'SG':
             # SG地域使用英文标题
-            title = product_data['product_name_en'] or product_data['product_name_cn']
+            title = product_data.product_name_en or product_data.product_name_cn
         elif region == 'MY':
             # MY地域使用英文标题
-            title = product_data['product_name_en'] or product_data['product_name_cn']
+            title = product_data.product_name_en or product_data.product_name_cn
         else:
             # 默认使用英文标题
-            title = product_data['product_name_en'] or product_data['product_name_cn']
+            title = product_data.product_name_en or product_data.product_name_cn
         
         return title
     
-    def create_product_info(self, product_data: Dict[str, Any]) -> ProductInfo:
+    def create_product_info(self, product_data: ProductRecord) -> ProductInfo:
         """
         将解析的数据转换为 ProductInfo 对象
         
         Args:
-            product_data (Dict[str, Any]): 解析的商品数据
+            product_data (ProductRecord): 解析的商品数据
             
         Returns:
             ProductInfo: 商品信息对象
@@ -193,16 +394,16 @@ class ExcelProductParser:
         title = self._get_title_by_region(product_data)
         
         # 使用英文性别字段
-        gender = self._map_gender(product_data['gender_en'])
+        gender = self._map_gender(product_data.gender_en)
         
         return ProductInfo(
             title=title,
-            price=product_data['price'],
+            price=product_data.price,
             category="sneakers",  # 默认类目
-            brand=product_data['brand'],
+            brand=product_data.brand,
             condition="new",  # 默认新旧程度
             gender=gender,
-            location="All of Singapore" if product_data['region'] == 'SG' else "All of Hong Kong" if product_data['region'] == 'HK' else "All of Malaysia",
+            location="All of Singapore" if product_data.region == 'SG' else "All of Hong Kong" if product_data.region == 'HK' else "All of Malaysia",
             multi_quantity=False
         )
     
@@ -1,326 +1,500 @@
 import json
 import os
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Set, Any, Tuple
 from datetime import datetime, timedelta
 from core.logger import logger
+from core.config import load_config
+from core.models import ProductRecord
+
+# ========= 从配置文件加载参数 =========
+def _load_records_config():
+    """从配置文件加载成功记录参数"""
+    defaults = {
+        "db_file": "success_records.db",
+        "retention_days": 30,
+        "lookback_days": 2,
+        "shared_storage": False,
+    }
+    try:
+        config = load_config()
+        defaults.update(config.get("records", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载records配置失败，使用默认值: {e}")
+    return defaults
+
+_records_config = _load_records_config()
+RECORD_DB_FILE = _records_config["db_file"]
+RETENTION_DAYS = int(_records_config["retention_days"] or 0)
+LOOKBACK_DAYS = max(int(_records_config["lookback_days"] or 1), 1)
+# 记录库放在多台主机共享的网络存储上时，不能使用依赖本机共享内存的 WAL 模式
+SHARED_STORAGE = bool(_records_config["shared_storage"])
+
+# 旧版JSON记录文件，首次启动时迁移到SQLite
+LEGACY_RECORD_FILE = "success_records.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS success_records (
+    excel_path TEXT NOT NULL,
+    region     TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    browser_id TEXT NOT NULL,
+    sku        TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (excel_path, region, date, browser_id, sku)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_success_records_date ON success_records (date);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _integral_id(value) -> str:
+    """
+    整数编号的浮点数文本转为整数文本（如 "123.0" -> "123"）
+
+    与 ExcelProductParser._integral_ids 的结果一致；旧版解析直接保存 str(浮点数)，
+    旧记录按此规则迁移后才能与新解析的 SKU / BrowserID 匹配
+    """
+    text = str(value)
+    head, dot, tail = text.partition(".")
+    if dot and head.lstrip("-").isdigit() and tail.strip("0") == "":
+        return head
+    return text
+
+
+def connect_record_db(db_file=None, shared_storage: bool = None) -> sqlite3.Connection:
+    """
+    打开记录库连接（成功记录、步骤日志共用同一个记录库）
+
+    Args:
+        db_file: SQLite记录库路径，默认读取配置 records.db_file
+        shared_storage: 记录库是否在网络共享存储上，默认读取配置 records.shared_storage
+
+    Returns:
+        sqlite3.Connection: 自动提交模式的连接，可跨线程使用（调用方自行串行化）
+    """
+    db_file = Path(db_file or RECORD_DB_FILE)
+    shared_storage = SHARED_STORAGE if shared_storage is None else shared_storage
+    if db_file.parent != Path("."):
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_file), timeout=30, check_same_thread=False, isolation_level=None)
+    if shared_storage:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("PRAGMA locking_mode=NORMAL")
+        conn.execute("PRAGMA synchronous=FULL")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
 
 class SuccessRecordManager:
-    """成功记录管理器"""
-    
-    def __init__(self, record_file: str = "success_records.json"):
+    """
+    成功记录管理器（SQLite，支持多线程、多进程同时读写）
+
+    本机使用 WAL 模式；records.shared_storage 为 true（记录库在网络共享存储上）时使用 DELETE 日志模式
+    """
+
+    def __init__(self, record_file: str = None, legacy_file: str = LEGACY_RECORD_FILE,
+                 retention_days: int = None, lookback_days: int = None, shared_storage: bool = None):
         """
         初始化记录管理器
-        
+
         Args:
-            record_file: 记录文件路径
+            record_file: SQLite记录库路径，默认读取配置 records.db_file
+            legacy_file: 旧版JSON记录文件路径，存在且未迁移时自动导入
+            retention_days: 记录保留天数，默认读取配置 records.retention_days（0表示不清理）
+            lookback_days: 判断是否已成功时回看的天数（含今天），默认读取配置 records.lookback_days
+            shared_storage: 记录库是否在网络共享存储上，默认读取配置 records.shared_storage
         """
-        self.record_file = Path(record_file)
-        self.records = self._load_records()
-    
-    def _load_records(self) -> Dict[str, Any]:
-        """加载记录文件"""
-        if not self.record_file.exists():
-            return {
-                "created_at": datetime.now().isoformat(),
-                "records": {}
-            }
-        
-        try:
-            with open(self.record_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"成功加载记录文件: {self.record_file}")
-                return data
-        except Exception as e:
-            logger.warning(f"加载记录文件失败: {e}，将创建新文件")
-            return {
-                "created_at": datetime.now().isoformat(),
-                "records": {}
-            }
-    
-    def _save_records(self):
-        """保存记录文件"""
+        self.record_file = Path(record_file or RECORD_DB_FILE)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.retention_days = RETENTION_DAYS if retention_days is None else retention_days
+        self.lookback_days = LOOKBACK_DAYS if lookback_days is None else max(lookback_days, 1)
+        self.shared_storage = SHARED_STORAGE if shared_storage is None else shared_storage
+        # 并发上传时多个工作线程共用一个连接，语句执行需串行化；跨进程由SQLite文件锁保证
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._migrate_legacy_json()
+        self._migrate_integral_ids()
+        if self.retention_days > 0:
+            self.prune(self.retention_days)
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开记录库并初始化表结构"""
+        conn = connect_record_db(self.record_file, self.shared_storage)
+        conn.executescript(_SCHEMA)
+        logger.info(f"成功加载记录库: {self.record_file}")
+        return conn
+
+    def _migrate_legacy_json(self):
+        """把旧版 success_records.json 一次性导入记录库，导入后重命名为 .migrated"""
+        if not self.legacy_file or not self.legacy_file.exists():
+            return
+
+        with self._lock:
+            migrated = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'legacy_json_migrated'"
+            ).fetchone()
+            if migrated:
+                return
+
+            try:
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"读取旧版记录文件失败，跳过迁移: {self.legacy_file}, 错误: {e}")
+                return
+
+            rows = []
+            for record_data in (data.get("records") or {}).values():
+                excel_path = os.path.normpath(record_data.get("excel_path", ""))
+                region = record_data.get("region", "")
+                date = record_data.get("date", "")
+                created_at = record_data.get("updated_at") or record_data.get("created_at") or datetime.now().isoformat()
+                for browser_id, skus in (record_data.get("browser_records") or {}).items():
+                    for sku in skus:
+                        rows.append((excel_path, region, date, _integral_id(browser_id), _integral_id(sku), created_at))
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO success_records VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('legacy_json_migrated', ?)",
+                    (datetime.now().isoformat(),)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        logger.info(f"已迁移旧版记录文件: {self.legacy_file} -> {self.record_file}（{len(rows)}条）")
         try:
-            self.records["updated_at"] = datetime.now().isoformat()
-            with open(self.record_file, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2)
-            logger.info(f"记录文件已保存: {self.record_file}")
-        except Exception as e:
-            logger.error(f"保存记录文件失败: {e}")
-    
-    def _get_record_key(self, excel_path: str, region: str, date: datetime = None) -> str:
-        """生成记录的唯一键：文件路径_地域_日期"""
-        # 使用指定日期或当前日期作为时间窗口
-        if date is None:
-            date = datetime.now()
-        date_str = date.strftime("%Y-%m-%d")
-        # 使用文件路径的标准化形式
-        normalized_path = os.path.normpath(excel_path)
-        return f"{normalized_path}_{region}_{date_str}"
-    
-    def _get_record_keys_in_days(self, excel_path: str, region: str, days: int = 2) -> List[str]:
+            self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+        except OSError as e:
+            logger.warning(f"重命名旧版记录文件失败: {e}")
+
+    def _migrate_integral_ids(self):
+        """把旧记录中以浮点数文本保存的 SKU / BrowserID（如 "123.0"）一次性改写为整数文本"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                migrated = self._conn.execute(
+                    "SELECT value FROM meta WHERE key = 'integral_ids_migrated'"
+                ).fetchone()
+                if migrated:
+                    self._conn.execute("COMMIT")
+                    return
+                rows = self._conn.execute(
+                    "SELECT excel_path, region, date, browser_id, sku, created_at FROM success_records "
+                    "WHERE sku LIKE '%.0%' OR browser_id LIKE '%.0%'"
+                ).fetchall()
+                changed = [
+                    row for row in rows
+                    if (_integral_id(row[3]), _integral_id(row[4])) != (row[3], row[4])
+                ]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO success_records VALUES (?, ?, ?, ?, ?, ?)",
+                    [(excel_path, region, date, _integral_id(browser_id), _integral_id(sku), created_at)
+                     for excel_path, region, date, browser_id, sku, created_at in changed]
+                )
+                self._conn.executemany(
+                    "DELETE FROM success_records "
+                    "WHERE excel_path = ? AND region = ? AND date = ? AND browser_id = ? AND sku = ?",
+                    [row[:5] for row in changed]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('integral_ids_migrated', ?)",
+                    (datetime.now().isoformat(),)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if changed:
+            logger.info(f"已将 {len(changed)} 条旧记录的浮点数编号改写为整数（如 123.0 -> 123）")
+
+    def prune(self, retention_days: int) -> int:
         """
-        获取过去N天的记录键列表
-        
+        清理超过保留天数的记录
+
         Args:
-            excel_path: Excel文件路径
-            region: 地域（HK/MY/SG）
-            days: 天数（默认2天）
-            
+            retention_days: 保留天数
+
         Returns:
-            List[str]: 记录键列表，从今天到N天前
+            int: 删除的记录条数
         """
-        keys = []
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            key = self._get_record_key(excel_path, region, date)
-            keys.append(key)
-        return keys
-    
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM success_records WHERE date < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"已清理 {cutoff} 之前的成功记录: {deleted}条")
+        return deleted
+
+    def close(self):
+        """关闭记录库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _get_window_start(self) -> str:
+        """获取回看窗口的起始日期（今天往前 lookback_days-1 天）"""
+        return (datetime.now() - timedelta(days=self.lookback_days - 1)).strftime("%Y-%m-%d")
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
     def get_successful_browser_ids(self, excel_path: str, region: str) -> Set[str]:
         """
-        获取指定Excel文件和地域下已成功的BrowserID列表（检查过去2天）
-        
+        获取指定Excel文件和地域下已成功的BrowserID列表（检查过去 lookback_days 天）
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
-            
+
         Returns:
             Set[str]: 已成功的BrowserID集合
         """
-        # 获取过去2天的记录键
-        record_keys = self._get_record_keys_in_days(excel_path, region, days=2)
-        
-        successful_browser_ids = set()
-        # 遍历过去2天的记录
-        for record_key in record_keys:
-            record_data = self.records["records"].get(record_key, {})
-            for browser_id, products in record_data.get("browser_records", {}).items():
-                if products:  # 如果有商品记录，说明该BrowserID已成功
-                    successful_browser_ids.add(browser_id)
-        
+        window_start = self._get_window_start()
+        rows = self._query(
+            "SELECT DISTINCT browser_id FROM success_records "
+            "WHERE excel_path = ? AND region = ? AND date >= ?",
+            (os.path.normpath(excel_path), region, window_start)
+        )
+        successful_browser_ids = {row[0] for row in rows}
+
         if successful_browser_ids:
-            logger.info(f"找到已成功的BrowserID（过去2天）: {sorted(successful_browser_ids)}")
+            logger.info(f"找到已成功的BrowserID（过去{self.lookback_days}天）: {sorted(successful_browser_ids)}")
         else:
-            logger.info("未找到已成功的BrowserID记录（过去2天）")
-        
+            logger.info(f"未找到已成功的BrowserID记录（过去{self.lookback_days}天）")
+
         return successful_browser_ids
-    
+
     def get_successful_products(self, excel_path: str, region: str, browser_id: str) -> Set[str]:
         """
-        获取指定BrowserID下已成功的商品SKU列表（检查过去2天）
-        
+        获取指定BrowserID下已成功的商品SKU列表（检查过去 lookback_days 天）
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
             browser_id: 浏览器ID
-            
+
         Returns:
             Set[str]: 已成功的商品SKU集合
         """
-        # 获取过去2天的记录键
-        record_keys = self._get_record_keys_in_days(excel_path, region, days=2)
-        
-        successful_skus = set()
-        # 遍历过去2天的记录
-        for record_key in record_keys:
-            record_data = self.records["records"].get(record_key, {})
-            browser_records = record_data.get("browser_records", {})
-            skus = browser_records.get(browser_id, [])
-            successful_skus.update(skus)
-        
+        window_start = self._get_window_start()
+        rows = self._query(
+            "SELECT DISTINCT sku FROM success_records "
+            "WHERE excel_path = ? AND region = ? AND date >= ? AND browser_id = ?",
+            (os.path.normpath(excel_path), region, window_start, str(browser_id))
+        )
+        successful_skus = {row[0] for row in rows}
+
         if successful_skus:
-            logger.info(f"BrowserID {browser_id} 已成功的商品SKU（过去2天）: {sorted(successful_skus)}")
+            logger.info(f"BrowserID {browser_id} 已成功的商品SKU（过去{self.lookback_days}天）: {sorted(successful_skus)}")
         else:
-            logger.info(f"BrowserID {browser_id} 无已成功的商品记录（过去2天）")
-        
+            logger.info(f"BrowserID {browser_id} 无已成功的商品记录（过去{self.lookback_days}天）")
+
         return successful_skus
-    
+
     def is_product_successful(self, excel_path: str, region: str, browser_id: str, sku: str) -> bool:
         """
-        检查指定商品是否已成功上传（检查过去2天）
-        
+        检查指定商品是否已成功上传（检查过去 lookback_days 天）
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
             browser_id: 浏览器ID
             sku: 商品SKU
-            
+
         Returns:
             bool: 是否已成功
         """
-        # 获取过去2天的记录键
-        record_keys = self._get_record_keys_in_days(excel_path, region, days=2)
-        
-        # 遍历过去2天的记录
-        for record_key in record_keys:
-            record_data = self.records["records"].get(record_key, {})
-            browser_records = record_data.get("browser_records", {})
-            successful_skus = set(browser_records.get(browser_id, []))
-            if sku in successful_skus:
-                return True
-        
-        return False
-    
+        window_start = self._get_window_start()
+        rows = self._query(
+            "SELECT 1 FROM success_records "
+            "WHERE excel_path = ? AND region = ? AND date >= ? "
+            "AND browser_id = ? AND sku = ? LIMIT 1",
+            (os.path.normpath(excel_path), region, window_start, str(browser_id), str(sku))
+        )
+        return bool(rows)
+
+    def get_successful_pairs(self, excel_path: str, region: str) -> Set[Tuple[str, str]]:
+        """
+        一次查询获取指定Excel文件和地域在回看窗口内所有已成功的 (BrowserID, SKU)
+
+        Args:
+            excel_path: Excel文件路径
+            region: 地域（HK/MY/SG）
+
+        Returns:
+            Set[Tuple[str, str]]: 已成功的 (BrowserID, SKU) 集合
+        """
+        rows = self._query(
+            "SELECT DISTINCT browser_id, sku FROM success_records "
+            "WHERE excel_path = ? AND region = ? AND date >= ?",
+            (os.path.normpath(excel_path), region, self._get_window_start())
+        )
+        return {(browser_id, sku) for browser_id, sku in rows}
+
+    def find_successful_products(self, excel_path: str, region: str,
+                                 products_data: List[ProductRecord]) -> Set[Tuple[str, str]]:
+        """
+        批量检查商品列表中哪些已成功上传（替代逐行调用 is_product_successful）
+
+        Args:
+            excel_path: Excel文件路径
+            region: 地域（HK/MY/SG）
+            products_data: 解析后的商品列表
+
+        Returns:
+            Set[Tuple[str, str]]: 商品列表中已成功的 (BrowserID, SKU) 集合
+        """
+        done = self.get_successful_pairs(excel_path, region)
+        if not done:
+            return set()
+        return {
+            pair for pair in ((str(p.browser_id), str(p.sku)) for p in products_data)
+            if pair in done
+        }
+
     def record_success(self, excel_path: str, region: str, browser_id: str, sku: str):
         """
         记录成功执行的商品
-        
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
             browser_id: 浏览器ID
             sku: 商品SKU
         """
-        record_key = self._get_record_key(excel_path, region)
-        
-        # 确保记录结构存在
-        if record_key not in self.records["records"]:
-            self.records["records"][record_key] = {
-                "excel_path": excel_path,
-                "region": region,
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "created_at": datetime.now().isoformat(),
-                "browser_records": {}
-            }
-        
-        # 确保BrowserID记录存在
-        if browser_id not in self.records["records"][record_key]["browser_records"]:
-            self.records["records"][record_key]["browser_records"][browser_id] = []
-        
-        # 添加SKU到成功记录
-        if sku not in self.records["records"][record_key]["browser_records"][browser_id]:
-            self.records["records"][record_key]["browser_records"][browser_id].append(sku)
-            logger.info(f"记录成功: {region} - BrowserID {browser_id} - SKU {sku}")
-        
-        # 更新最后修改时间
-        self.records["records"][record_key]["updated_at"] = datetime.now().isoformat()
-        
-        # 保存记录
-        self._save_records()
-    
+        now = datetime.now()
+        try:
+            with self._lock:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO success_records VALUES (?, ?, ?, ?, ?, ?)",
+                    (os.path.normpath(excel_path), region, now.strftime("%Y-%m-%d"),
+                     str(browser_id), str(sku), now.isoformat())
+                ).rowcount
+            if inserted:
+                logger.info(f"记录成功: {region} - BrowserID {browser_id} - SKU {sku}")
+        except Exception as e:
+            logger.error(f"保存成功记录失败: {e}")
+
     def record_browser_success(self, excel_path: str, region: str, browser_id: str, successful_skus: List[str]):
         """
-        批量记录BrowserID的成功商品
-        
+        批量记录BrowserID的成功商品（覆盖该BrowserID今天的记录）
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
             browser_id: 浏览器ID
             successful_skus: 成功的商品SKU列表
         """
-        record_key = self._get_record_key(excel_path, region)
-        
-        # 确保记录结构存在
-        if record_key not in self.records["records"]:
-            self.records["records"][record_key] = {
-                "excel_path": excel_path,
-                "region": region,
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "created_at": datetime.now().isoformat(),
-                "browser_records": {}
-            }
-        
-        # 记录成功的SKU
-        self.records["records"][record_key]["browser_records"][browser_id] = successful_skus.copy()
-        
-        # 更新最后修改时间
-        self.records["records"][record_key]["updated_at"] = datetime.now().isoformat()
-        
-        logger.info(f"批量记录成功: {region} - BrowserID {browser_id} - {len(successful_skus)} 个商品")
-        
-        # 保存记录
-        self._save_records()
-    
+        now = datetime.now()
+        normalized_path = os.path.normpath(excel_path)
+        date_str = now.strftime("%Y-%m-%d")
+
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "DELETE FROM success_records WHERE excel_path = ? AND region = ? AND date = ? AND browser_id = ?",
+                        (normalized_path, region, date_str, str(browser_id))
+                    )
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO success_records VALUES (?, ?, ?, ?, ?, ?)",
+                        [(normalized_path, region, date_str, str(browser_id), str(sku), now.isoformat())
+                         for sku in successful_skus]
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            logger.info(f"批量记录成功: {region} - BrowserID {browser_id} - {len(successful_skus)} 个商品")
+        except Exception as e:
+            logger.error(f"保存成功记录失败: {e}")
+
     def get_record_summary(self, excel_path: str, region: str) -> Dict[str, Any]:
         """
-        获取记录摘要信息（汇总过去2天的数据）
-        
+        获取记录摘要信息（汇总过去 lookback_days 天的数据）
+
         Args:
             excel_path: Excel文件路径
             region: 地域（HK/MY/SG）
-            
+
         Returns:
             Dict[str, Any]: 记录摘要
         """
-        # 获取过去2天的记录键
-        record_keys = self._get_record_keys_in_days(excel_path, region, days=2)
-        
+        window_start = self._get_window_start()
+        rows = self._query(
+            "SELECT date, browser_id, sku, created_at FROM success_records "
+            "WHERE excel_path = ? AND region = ? AND date >= ?",
+            (os.path.normpath(excel_path), region, window_start)
+        )
+
         # 汇总所有浏览器和商品数据
         all_browser_details = {}
-        dates_found = []
-        earliest_created = None
-        latest_updated = None
-        
-        for record_key in record_keys:
-            record_data = self.records["records"].get(record_key, {})
-            if not record_data:
-                continue
-                
-            browser_records = record_data.get("browser_records", {})
-            dates_found.append(record_data.get("date", ""))
-            
-            # 汇总浏览器记录
-            for browser_id, skus in browser_records.items():
-                if browser_id not in all_browser_details:
-                    all_browser_details[browser_id] = set()
-                all_browser_details[browser_id].update(skus)
-            
-            # 追踪最早创建时间和最新更新时间
-            created_at = record_data.get("created_at", "")
-            updated_at = record_data.get("updated_at", "")
-            
-            if created_at and (not earliest_created or created_at < earliest_created):
-                earliest_created = created_at
-            if updated_at and (not latest_updated or updated_at > latest_updated):
-                latest_updated = updated_at
-        
+        dates_found = set()
+        created_times = []
+
+        for date, browser_id, sku, created_at in rows:
+            dates_found.add(date)
+            all_browser_details.setdefault(browser_id, set()).add(sku)
+            created_times.append(created_at)
+
         # 计算汇总统计
         total_browsers = len(all_browser_details)
         total_products = sum(len(skus) for skus in all_browser_details.values())
-        
+
         return {
             "excel_path": excel_path,
             "region": region,
             "dates": sorted(dates_found),  # 涉及的日期
-            "days_checked": 2,  # 检查的天数
+            "days_checked": self.lookback_days,  # 检查的天数
             "total_browsers": total_browsers,
             "total_products": total_products,
             "browser_details": {
-                browser_id: len(skus) 
+                browser_id: len(skus)
                 for browser_id, skus in all_browser_details.items()
             },
-            "created_at": earliest_created or "",
-            "updated_at": latest_updated or ""
+            "created_at": min(created_times) if created_times else "",
+            "updated_at": max(created_times) if created_times else ""
         }
-    
+
     def clear_records(self, excel_path: str = None, region: str = None):
         """
         清除记录
-        
+
         Args:
             excel_path: 指定Excel文件路径，为None时清除所有记录
             region: 指定地域，为None时清除该文件的所有地域记录
         """
-        if excel_path is None:
-            # 清除所有记录
-            self.records["records"] = {}
-            logger.info("已清除所有成功记录")
-        elif region is None:
-            # 清除指定Excel文件的所有记录
-            normalized_path = os.path.normpath(excel_path)
-            keys_to_remove = [
-                key for key in self.records["records"].keys() 
-                if key.startswith(normalized_path)
-            ]
-            for key in keys_to_remove:
-                del self.records["records"][key]
-            logger.info(f"已清除Excel文件 {excel_path} 的所有记录")
-        else:
-            # 清除指定Excel文件和地域的记录
-            record_key = self._get_record_key(excel_path, region)
-            if record_key in self.records["records"]:
-                del self.records["records"][record_key]
+        with self._lock:
+            if excel_path is None:
+                # 清除所有记录
+                self._conn.execute("DELETE FROM success_records")
+                logger.info("已清除所有成功记录")
+            elif region is None:
+                # 清除指定Excel文件的所有记录
+                self._conn.execute(
+                    "DELETE FROM success_records WHERE excel_path = ?",
+                    (os.path.normpath(excel_path),)
+                )
+                logger.info(f"已清除Excel文件 {excel_path} 的所有记录")
+            else:
+                # 清除指定Excel文件和地域今天的记录
+                self._conn.execute(
+                    "DELETE FROM success_records WHERE excel_path = ? AND region = ? AND date = ?",
+                    (os.path.normpath(excel_path), region, datetime.now().strftime("%Y-%m-%d"))
+                )
                 logger.info(f"已清除记录: {excel_path} - {region}")
-        
-        self._save_records()
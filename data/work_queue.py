@@ -0,0 +1,521 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from core.logger import logger
+from core.models import ProductRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    excel_path  TEXT NOT NULL,
+    region      TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    total       INTEGER NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    run_id        TEXT NOT NULL,
+    browser_id    TEXT NOT NULL,
+    seq           INTEGER NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    worker_id     TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    released_by   TEXT,
+    retry_after   REAL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, seq);
+CREATE TABLE IF NOT EXISTS items (
+    job_id     TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    product    TEXT NOT NULL,
+    sku        TEXT,
+    status     TEXT NOT NULL DEFAULT 'pending',
+    worker_id  TEXT,
+    error      TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id   TEXT PRIMARY KEY,
+    browser_ids TEXT,
+    last_seen   REAL NOT NULL
+);
+"""
+
+# 任务状态
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_DONE = "done"
+
+# 商品状态：started 表示已开始上传但结果未写回；租约被回收时转为 unknown，不再重新上传
+ITEM_PENDING = "pending"
+ITEM_STARTED = "started"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+ITEM_UNKNOWN = "unknown"
+
+
+class WorkQueue:
+    """
+    分布式上传任务队列（SQLite 文件，可放在多台主机共享的存储上）
+
+    WAL 依赖同一台主机上的共享内存，在网络文件系统上不安全，因此使用 DELETE 日志模式 + 普通文件锁，
+    所有写操作在 BEGIN IMMEDIATE 事务中执行，锁冲突时按 busy_timeout 等待
+
+    - 每个任务是一个BrowserID下的全部商品，工作进程以租约方式领取，并定期续约
+    - 租约过期（工作进程崩溃或失联）的任务重新排队，由其他工作进程接手未开始的商品
+    - 每个商品开始上传前先标记为 started，租约被回收时 started 的商品记为结果未知，
+      永远不会被第二个工作进程再次上传
+    - 任务未处理完就被释放（处理异常）时重新排队，释放它的工作进程 retry_backoff 秒内不再领取；
+      领取次数达到 max_attempts 后剩余商品记为失败，避免同一任务被无限重复领取
+
+    商品的图片文件夹（ProductRecord.folder）由工作进程直接读取，必须在每台工作主机上都能访问（同一路径）
+    """
+
+    def __init__(self, db_file: str, max_attempts: int = 3, retry_backoff: float = 60):
+        """
+        Args:
+            db_file: 队列文件路径
+            max_attempts: 每个任务最多被领取的次数（含租约过期后的重新领取）
+            retry_backoff: 工作进程释放未完成的任务后，多少秒内不再领取该任务（其他工作进程不受限制）
+        """
+        self.db_file = Path(db_file)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_backoff = float(retry_backoff)
+        # 工作进程的心跳线程与上传线程共用连接，语句执行需串行化；跨进程由SQLite文件锁保证
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开队列库并初始化表结构"""
+        if self.db_file.parent != Path("."):
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("PRAGMA locking_mode=NORMAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.executescript(_SCHEMA)
+        # 旧版队列库没有 sku 列（按商品查询历史记录需要）
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+        if "sku" not in columns:
+            conn.execute("ALTER TABLE items ADD COLUMN sku TEXT")
+        job_columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("released_by", "TEXT"), ("retry_after", "REAL")):
+            if column not in job_columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_items_sku ON items (sku)")
+        return conn
+
+    def _transaction(self, func, *args):
+        """在 BEGIN IMMEDIATE 事务中执行，保证领取/续约/回收在多进程间互斥"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------------------- 协调进程 ----------------------
+    def create_run(self, run_id: str, excel_path: str, region: str, category: str,
+                   groups: Dict[str, List[Tuple[int, ProductRecord]]], total: int) -> None:
+        """
+        发布一次上传：每个BrowserID一个任务，组的顺序即领取顺序
+
+        Args:
+            run_id: 本次上传的唯一标识
+            groups: 按BrowserID分组的 (Excel序号, 商品) 列表
+            total: 本次需要处理的商品总数
+        """
+        now = time.time()
+
+        def insert():
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, os.path.normpath(excel_path), region, category, total, now)
+            )
+            for seq, (browser_id, group) in enumerate(groups.items()):
+                job_id = f"{run_id}:{browser_id}"
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, run_id, browser_id, seq, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, run_id, str(browser_id), seq, now)
+                )
+                self._conn.executemany(
+                    "INSERT INTO items (job_id, idx, product, sku, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    [(job_id, index, json.dumps(list(product), ensure_ascii=False), str(product.sku), now)
+                     for index, product in group]
+                )
+
+        self._transaction(insert)
+        logger.info(f"已发布上传任务: run_id={run_id}, {len(groups)} 个BrowserID, {total} 个商品")
+
+    def requeue_expired(self) -> int:
+        """回收过期租约：任务重新排队，已开始但未写回结果的商品记为结果未知"""
+        return self._transaction(self._requeue_expired)
+
+    def _requeue_expired(self) -> int:
+        now = time.time()
+        expired = self._conn.execute(
+            "SELECT job_id, worker_id FROM jobs WHERE status = ? AND lease_expires < ?",
+            (JOB_LEASED, now)
+        ).fetchall()
+        for job_id, worker_id in expired:
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (ITEM_UNKNOWN, f"工作进程 {worker_id} 失联，上传结果未知", now, job_id, ITEM_STARTED)
+            )
+            if self._release(job_id, worker_id, f"工作进程 {worker_id} 失联", now):
+                logger.warning(f"⚠️ 工作进程 {worker_id} 的租约已过期，任务重新排队: {job_id}")
+        return len(expired)
+
+    def _release(self, job_id: str, worker_id: str, error: str, now: float) -> bool:
+        """
+        释放未处理完的任务：重新排队（worker_id 在 retry_backoff 秒内不再领取），
+        领取次数已达上限时剩余商品记为失败、任务结束
+
+        Returns:
+            bool: True 表示已重新排队
+        """
+        attempts = self._conn.execute("SELECT attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+        if attempts >= self.max_attempts:
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (ITEM_FAILED, f"任务已领取 {attempts} 次仍未完成，不再重试（最后一次: {error}）", now, job_id, ITEM_PENDING)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? WHERE job_id = ?",
+                (JOB_DONE, now, job_id)
+            )
+            logger.error(f"❌ 任务 {job_id} 已领取 {attempts} 次仍未完成，剩余商品记为失败: {error}")
+            return False
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, worker_id = NULL, lease_expires = NULL, released_by = ?, retry_after = ?, "
+            "updated_at = ? WHERE job_id = ?",
+            (JOB_PENDING, worker_id, now + self.retry_backoff, now, job_id)
+        )
+        return True
+
+    def run_progress(self, run_id: str) -> Dict[str, int]:
+        """返回本次上传各状态的任务数量"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def is_run_finished(self, run_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE run_id = ? AND status != ?", (run_id, JOB_DONE)
+            ).fetchone()
+        return row[0] == 0
+
+    def last_activity(self, run_id: str) -> float:
+        """本次上传最近一次状态变化或续约的时间"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(t) FROM ("
+                "SELECT MAX(updated_at) AS t FROM jobs WHERE run_id = ? "
+                "UNION ALL SELECT MAX(items.updated_at) FROM items JOIN jobs ON items.job_id = jobs.job_id WHERE jobs.run_id = ?)",
+                (run_id, run_id)
+            ).fetchone()
+        return row[0] or 0.0
+
+    def orphaned_jobs(self, run_id: str, alive_since: float) -> List[Tuple[str, str]]:
+        """
+        返回本次上传中没有任何在线工作进程能够领取的待处理任务（工作进程只领取本机窗口列表中的BrowserID）
+
+        Args:
+            alive_since: 此时间之后有领取或续约记录的工作进程视为在线
+
+        Returns:
+            List[Tuple[str, str]]: (job_id, BrowserID)
+        """
+        with self._lock:
+            workers = self._conn.execute(
+                "SELECT browser_ids FROM workers WHERE last_seen >= ?", (alive_since,)
+            ).fetchall()
+            pending = self._conn.execute(
+                "SELECT job_id, browser_id FROM jobs WHERE run_id = ? AND status = ?", (run_id, JOB_PENDING)
+            ).fetchall()
+        # 还没有工作进程在线时无法判断（由协调进程的空闲超时处理）
+        if not workers or any(browser_ids is None for (browser_ids,) in workers):
+            return []
+        available: Set[str] = set()
+        for (browser_ids,) in workers:
+            available.update(json.loads(browser_ids))
+        return [(job_id, browser_id) for job_id, browser_id in pending if browser_id not in available]
+
+    def fail_job(self, job_id: str, error: str) -> bool:
+        """
+        放弃一个仍未被领取的任务：其商品全部记为失败
+
+        Returns:
+            bool: False 表示任务已被工作进程领取或已完成，未做修改
+        """
+        def fail():
+            now = time.time()
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (JOB_DONE, now, job_id, JOB_PENDING)
+            ).rowcount
+            if not updated:
+                return False
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (ITEM_FAILED, error, now, job_id, ITEM_PENDING)
+            )
+            return True
+        return self._transaction(fail)
+
+    def abort_run(self, run_id: str, error: str) -> None:
+        """
+        中止本次上传：未开始的商品记为失败，已开始的商品记为结果未知，所有任务结束
+
+        仍在运行的工作进程之后不能再开始新的商品（begin_item 失败），已开始的商品结果照常写回
+        """
+        def abort():
+            now = time.time()
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM jobs WHERE run_id = ? AND status != ?", (run_id, JOB_DONE)
+            ).fetchall()]
+            for job_id in job_ids:
+                self._conn.execute(
+                    "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                    (ITEM_FAILED, error, now, job_id, ITEM_PENDING)
+                )
+                self._conn.execute(
+                    "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                    (ITEM_UNKNOWN, error, now, job_id, ITEM_STARTED)
+                )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_expires = NULL, updated_at = ? WHERE run_id = ? AND status != ?",
+                (JOB_DONE, now, run_id, JOB_DONE)
+            )
+        self._transaction(abort)
+
+    def run_items(self, run_id: str) -> List[Tuple[int, str, ProductRecord, str, Optional[str]]]:
+        """
+        返回本次上传全部商品的状态，按Excel序号排列
+
+        Returns:
+            List[Tuple[int, str, ProductRecord, str, Optional[str]]]: (Excel序号, BrowserID, 商品, 状态, 错误)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT items.idx, jobs.browser_id, items.product, items.status, items.error "
+                "FROM items JOIN jobs ON items.job_id = jobs.job_id "
+                "WHERE jobs.run_id = ? ORDER BY items.idx",
+                (run_id,)
+            ).fetchall()
+        return [(idx, browser_id, ProductRecord(*json.loads(product)), status, error)
+                for idx, browser_id, product, status, error in rows]
+
+    # ---------------------- 工作进程 ----------------------
+    def claim(self, worker_id: str, lease_seconds: float,
+              browser_ids: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        领取一个待处理任务（同时回收过期租约）
+
+        Args:
+            worker_id: 工作进程标识（主机名:PID）
+            lease_seconds: 租约时长
+            browser_ids: 本机可用的BrowserID，None 表示不限制
+
+        Returns:
+            Optional[Dict[str, Any]]: 任务信息（job_id / run_id / browser_id / excel_path / region /
+            category / total / group），没有可领取的任务时返回None
+        """
+        allowed: Optional[Set[str]] = {str(b) for b in browser_ids} if browser_ids is not None else None
+        return self._transaction(self._claim, worker_id, lease_seconds, allowed)
+
+    def _touch_worker(self, worker_id: str, allowed: Optional[Set[str]] = None, update_ids: bool = False) -> None:
+        """记录工作进程在线及其可处理的BrowserID（协调进程据此判断任务是否无人可领取）"""
+        now = time.time()
+        if update_ids:
+            self._conn.execute(
+                "INSERT INTO workers (worker_id, browser_ids, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET browser_ids = excluded.browser_ids, last_seen = excluded.last_seen",
+                (worker_id, json.dumps(sorted(allowed)) if allowed is not None else None, now)
+            )
+        else:
+            self._conn.execute("UPDATE workers SET last_seen = ? WHERE worker_id = ?", (now, worker_id))
+
+    def _claim(self, worker_id: str, lease_seconds: float, allowed: Optional[Set[str]]) -> Optional[Dict[str, Any]]:
+        self._touch_worker(worker_id, allowed, update_ids=True)
+        self._requeue_expired()
+        candidates = self._conn.execute(
+            "SELECT jobs.job_id, jobs.run_id, jobs.browser_id, runs.excel_path, runs.region, runs.category, runs.total, "
+            "jobs.attempts, jobs.released_by, jobs.retry_after "
+            "FROM jobs JOIN runs ON jobs.run_id = runs.run_id "
+            "WHERE jobs.status = ? ORDER BY runs.created_at, jobs.seq",
+            (JOB_PENDING,)
+        ).fetchall()
+        now = time.time()
+        for job_id, run_id, browser_id, excel_path, region, category, total, attempts, released_by, retry_after in candidates:
+            if allowed is not None and browser_id not in allowed:
+                continue
+            if released_by == worker_id and retry_after and retry_after > now:
+                # 本工作进程刚释放的任务，等待一段时间或交给其他工作进程
+                continue
+
+            # 只交出尚未开始的商品，已有结果或结果未知的商品不会再次上传
+            items = self._conn.execute(
+                "SELECT idx, product FROM items WHERE job_id = ? AND status = ? ORDER BY idx",
+                (job_id, ITEM_PENDING)
+            ).fetchall()
+            if not items:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (JOB_DONE, now, job_id)
+                )
+                continue
+
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ?",
+                (JOB_LEASED, worker_id, now + lease_seconds, now, job_id)
+            )
+            return {
+                "job_id": job_id,
+                "run_id": run_id,
+                "browser_id": browser_id,
+                "excel_path": excel_path,
+                "region": region,
+                "category": category,
+                "total": total,
+                "attempts": attempts + 1,
+                "group": [(idx, ProductRecord(*json.loads(product))) for idx, product in items],
+            }
+        return None
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """续约，返回False表示租约已被回收（不应再继续处理该任务）"""
+        def renew():
+            self._touch_worker(worker_id)
+            return self._conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (time.time() + lease_seconds, time.time(), job_id, worker_id, JOB_LEASED)
+            ).rowcount == 1
+        return self._transaction(renew)
+
+    def begin_item(self, job_id: str, index: int, worker_id: str) -> bool:
+        """
+        标记商品开始上传，只有仍持有租约且商品尚未开始时才成功
+
+        Returns:
+            bool: False 表示租约已失效或商品已被处理，不能上传
+        """
+        def begin():
+            owned = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, JOB_LEASED)
+            ).fetchone()
+            if not owned:
+                return False
+            return self._conn.execute(
+                "UPDATE items SET status = ?, worker_id = ?, updated_at = ? WHERE job_id = ? AND idx = ? AND status = ?",
+                (ITEM_STARTED, worker_id, time.time(), job_id, index, ITEM_PENDING)
+            ).rowcount == 1
+        return self._transaction(begin)
+
+    def handled_status(self, job_id: str, index: int, sku: str, since: float) -> Optional[str]:
+        """
+        同一表格/地域/BrowserID的该商品是否已在队列中被处理过（其他任务中已成功、正在上传或结果未知）
+
+        队列对所有主机可见，比各主机本地的成功记录更适合作为分布式模式下的去重依据
+
+        Args:
+            job_id: 当前任务
+            index: 当前商品的Excel序号（不与自身比较）
+            sku: 商品SKU
+            since: 只查询此时间（时间戳）之后发布的上传
+
+        Returns:
+            Optional[str]: 已成功时为 done，正在上传或结果未知时为 started / unknown，未处理过时为None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items.status FROM items "
+                "JOIN jobs ON items.job_id = jobs.job_id "
+                "JOIN runs ON jobs.run_id = runs.run_id "
+                "JOIN jobs AS cur ON cur.job_id = ? "
+                "JOIN runs AS cur_run ON cur.run_id = cur_run.run_id "
+                "WHERE items.sku = ? AND jobs.browser_id = cur.browser_id "
+                "AND runs.excel_path = cur_run.excel_path AND runs.region = cur_run.region "
+                "AND runs.created_at >= ? AND items.status IN (?, ?, ?) "
+                "AND NOT (items.job_id = ? AND items.idx = ?) "
+                "ORDER BY items.status = ? DESC LIMIT 1",
+                (job_id, str(sku), since, ITEM_DONE, ITEM_STARTED, ITEM_UNKNOWN, job_id, index, ITEM_DONE)
+            ).fetchone()
+        return row[0] if row else None
+
+    def finish_item(self, job_id: str, index: int, worker_id: str, success: bool, error: Optional[str] = None) -> None:
+        """写回商品结果（租约被回收后仍写回本工作进程开始的商品，结果比“未知”更准确）"""
+        def finish():
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ? AND worker_id = ? AND status IN (?, ?)",
+                (ITEM_DONE if success else ITEM_FAILED, error, time.time(),
+                 job_id, index, worker_id, ITEM_STARTED, ITEM_UNKNOWN)
+            )
+        self._transaction(finish)
+
+    def skip_item(self, job_id: str, index: int, success: bool, error: Optional[str] = None) -> None:
+        """不上传直接写回结果（如成功记录中已存在）"""
+        def skip():
+            self._conn.execute(
+                "UPDATE items SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND idx = ? AND status = ?",
+                (ITEM_DONE if success else ITEM_FAILED, error, time.time(), job_id, index, ITEM_PENDING)
+            )
+        self._transaction(skip)
+
+    def complete(self, job_id: str, worker_id: str, error: Optional[str] = None) -> bool:
+        """
+        任务处理完毕，释放租约；仍有未开始的商品（处理异常）时按 _release 重新排队或记为失败
+
+        Args:
+            error: 处理异常的原因（达到领取次数上限时写入剩余商品）
+
+        Returns:
+            bool: False 表示租约已被回收，剩余商品由接手的工作进程处理
+        """
+        def done():
+            now = time.time()
+            owned = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, JOB_LEASED)
+            ).fetchone()
+            if not owned:
+                return False
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status = ?", (job_id, ITEM_PENDING)
+            ).fetchone()[0]
+            if pending:
+                self._release(job_id, worker_id, error or "任务未处理完即被释放", now)
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, lease_expires = NULL, updated_at = ? WHERE job_id = ?",
+                    (JOB_DONE, now, job_id)
+                )
+            return True
+        return self._transaction(done)
+
+    def has_open_jobs(self) -> bool:
+        """队列中是否还有未完成的任务"""
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status != ?", (JOB_DONE,)).fetchone()
+        return row[0] > 0
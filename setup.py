@@ -66,6 +66,7 @@ setup(
     entry_points={
         "console_scripts": [
             "carousell-uploader=cli.main:run",
+            "carousell-worker=cli.worker:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,211 @@
+"""
+WorkQueue 测试：领取、续约、回收过期租约、队列内去重与完成任务
+"""
+
+import time
+
+import pytest
+
+from core.models import ProductRecord
+from data.work_queue import (
+    ITEM_DONE,
+    ITEM_FAILED,
+    ITEM_STARTED,
+    ITEM_UNKNOWN,
+    JOB_DONE,
+    JOB_LEASED,
+    JOB_PENDING,
+    WorkQueue,
+)
+
+LEASE = 60
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = WorkQueue(str(tmp_path / "queue.db"), max_attempts=2, retry_backoff=60)
+    yield q
+    q.close()
+
+
+def _product(sku, browser_id):
+    return ProductRecord(sku=sku, browser_id=browser_id, price="100", folder=f"/images/{sku}", region="HK")
+
+
+def _publish(queue, run_id="run1", groups=None):
+    groups = groups or {
+        "1": [(0, _product("A1", "1")), (1, _product("A2", "1"))],
+        "2": [(2, _product("B1", "2"))],
+    }
+    total = sum(len(group) for group in groups.values())
+    queue.create_run(run_id, "products.xlsx", "HK", "sneakers", groups, total)
+    return groups
+
+
+def _job_row(queue, job_id):
+    return queue._conn.execute(
+        "SELECT status, worker_id, lease_expires, attempts FROM jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+
+
+def _item_status(queue, job_id, index):
+    return queue._conn.execute(
+        "SELECT status FROM items WHERE job_id = ? AND idx = ?", (job_id, index)
+    ).fetchone()[0]
+
+
+def _expire(queue, job_id):
+    queue._conn.execute("UPDATE jobs SET lease_expires = ? WHERE job_id = ?", (time.time() - 1, job_id))
+
+
+def test_claim_returns_jobs_in_publish_order(queue):
+    groups = _publish(queue)
+
+    job = queue.claim("w1", LEASE)
+
+    assert job["job_id"] == "run1:1"
+    assert job["browser_id"] == "1"
+    assert job["attempts"] == 1
+    assert job["group"] == groups["1"]
+    assert _job_row(queue, "run1:1")[:2] == (JOB_LEASED, "w1")
+    assert queue.claim("w2", LEASE)["job_id"] == "run1:2"
+    assert queue.claim("w3", LEASE) is None
+
+
+def test_claim_only_takes_allowed_browser_ids(queue):
+    _publish(queue)
+
+    assert queue.claim("w1", LEASE, browser_ids=["2"])["job_id"] == "run1:2"
+    assert queue.claim("w1", LEASE, browser_ids=["3"]) is None
+
+
+def test_claim_skips_started_items(queue):
+    _publish(queue)
+    job = queue.claim("w1", LEASE)
+    assert queue.begin_item(job["job_id"], 0, "w1")
+    _expire(queue, job["job_id"])
+
+    retaken = queue.claim("w2", LEASE, browser_ids=["1"])
+
+    assert [index for index, _ in retaken["group"]] == [1]
+
+
+def test_heartbeat_renews_lease(queue):
+    _publish(queue)
+    job = queue.claim("w1", 1)
+    before = _job_row(queue, job["job_id"])[2]
+
+    assert queue.heartbeat(job["job_id"], "w1", LEASE)
+    assert _job_row(queue, job["job_id"])[2] > before
+
+
+def test_heartbeat_fails_after_lease_reclaimed(queue):
+    _publish(queue)
+    job = queue.claim("w1", LEASE)
+    _expire(queue, job["job_id"])
+    assert queue.requeue_expired() == 1
+
+    assert not queue.heartbeat(job["job_id"], "w1", LEASE)
+
+
+def test_requeue_expired_marks_started_items_unknown(queue):
+    _publish(queue)
+    job = queue.claim("w1", LEASE)
+    queue.begin_item(job["job_id"], 0, "w1")
+    _expire(queue, job["job_id"])
+
+    assert queue.requeue_expired() == 1
+
+    assert _job_row(queue, job["job_id"])[:2] == (JOB_PENDING, None)
+    assert _item_status(queue, job["job_id"], 0) == ITEM_UNKNOWN
+    assert not queue.begin_item(job["job_id"], 1, "w1")
+
+
+def test_requeue_expired_ignores_live_leases(queue):
+    _publish(queue)
+    queue.claim("w1", LEASE)
+
+    assert queue.requeue_expired() == 0
+
+
+def test_released_job_not_reclaimed_by_same_worker_during_backoff(queue):
+    _publish(queue, groups={"1": [(0, _product("A1", "1"))]})
+    job = queue.claim("w1", LEASE)
+    _expire(queue, job["job_id"])
+
+    assert queue.claim("w1", LEASE) is None
+    assert queue.claim("w2", LEASE)["job_id"] == job["job_id"]
+
+
+def test_requeue_expired_fails_items_after_max_attempts(queue):
+    _publish(queue, groups={"1": [(0, _product("A1", "1"))]})
+    for worker_id in ("w1", "w2"):
+        job = queue.claim(worker_id, LEASE)
+        _expire(queue, job["job_id"])
+    queue.requeue_expired()
+
+    assert _job_row(queue, "run1:1")[0] == JOB_DONE
+    assert _item_status(queue, "run1:1", 0) == ITEM_FAILED
+    assert queue.is_run_finished("run1")
+
+
+def test_handled_status_reports_other_runs(queue):
+    since = time.time() - 1
+    _publish(queue, "run1", {"1": [(0, _product("A1", "1"))]})
+    first = queue.claim("w1", LEASE)
+    queue.begin_item(first["job_id"], 0, "w1")
+    _publish(queue, "run2", {"1": [(0, _product("A1", "1"))]})
+
+    assert queue.handled_status("run2:1", 0, "A1", since) == ITEM_STARTED
+    # 不与自身比较
+    assert queue.handled_status("run1:1", 0, "A1", since) is None
+
+    queue.finish_item(first["job_id"], 0, "w1", success=True)
+    assert queue.handled_status("run2:1", 0, "A1", since) == ITEM_DONE
+    assert queue.handled_status("run2:1", 0, "A1", time.time() + 60) is None
+
+
+def test_handled_status_scoped_to_browser_id(queue):
+    since = time.time() - 1
+    _publish(queue, "run1", {"1": [(0, _product("A1", "1"))]})
+    job = queue.claim("w1", LEASE)
+    queue.begin_item(job["job_id"], 0, "w1")
+    queue.finish_item(job["job_id"], 0, "w1", success=True)
+    _publish(queue, "run2", {"2": [(0, _product("A1", "2"))]})
+
+    assert queue.handled_status("run2:2", 0, "A1", since) is None
+
+
+def test_complete_finishes_processed_job(queue):
+    _publish(queue, groups={"1": [(0, _product("A1", "1"))]})
+    job = queue.claim("w1", LEASE)
+    queue.begin_item(job["job_id"], 0, "w1")
+    queue.finish_item(job["job_id"], 0, "w1", success=True)
+
+    assert queue.complete(job["job_id"], "w1")
+
+    assert _job_row(queue, job["job_id"])[0] == JOB_DONE
+    assert queue.is_run_finished("run1")
+    assert not queue.has_open_jobs()
+
+
+def test_complete_requeues_unfinished_job(queue):
+    _publish(queue)
+    job = queue.claim("w1", LEASE)
+    queue.begin_item(job["job_id"], 0, "w1")
+    queue.finish_item(job["job_id"], 0, "w1", success=True)
+
+    assert queue.complete(job["job_id"], "w1", error="浏览器崩溃")
+
+    assert _job_row(queue, job["job_id"])[0] == JOB_PENDING
+    retaken = queue.claim("w2", LEASE, browser_ids=["1"])
+    assert [index for index, _ in retaken["group"]] == [1]
+
+
+def test_complete_fails_after_lease_reclaimed(queue):
+    _publish(queue)
+    job = queue.claim("w1", LEASE)
+    _expire(queue, job["job_id"])
+    queue.requeue_expired()
+
+    assert not queue.complete(job["job_id"], "w1")
@@ -4,8 +4,11 @@
 """
 
 from .enhanced_safe_actions import EnhancedSafeActions, create_enhanced_safe_actions
+from .async_safe_actions import AsyncEnhancedSafeActions, create_async_enhanced_safe_actions
 
 __all__ = [
     'EnhancedSafeActions',
     'create_enhanced_safe_actions',
+    'AsyncEnhancedSafeActions',
+    'create_async_enhanced_safe_actions',
 ]
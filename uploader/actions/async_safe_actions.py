@@ -0,0 +1,258 @@
+"""
+增强的安全操作函数（异步版本）
+操作方法为协程，选择器解析、命中记录和配置热更新与同步版本共用；
+有人值守时的选择器输入提示放到线程池执行，多个浏览器的提示依次显示
+"""
+
+import asyncio
+import functools
+import threading
+from typing import Dict, Iterable
+from playwright.async_api import Page  # pyright: ignore[reportMissingImports]
+from browser.actions import DEFAULT_TIMEOUT
+from browser.async_actions import human_delay
+from browser.async_waits import settle
+from browser import pacing
+from core.logger import logger
+from ..config.selector_index import compile_selector
+from .selector_race import resolve_first_async
+from .enhanced_safe_actions import (
+    EnhancedSafeActions, SkipCurrentProduct, BULK_FILL_SCRIPT,
+    ATTEMPT_DONE, ATTEMPT_ABSENT, ATTEMPT_ASK_USER
+)
+
+# 多个协程同时请求输入选择器时，终端提示逐个显示
+_prompt_lock = threading.Lock()
+
+
+class AsyncEnhancedSafeActions(EnhancedSafeActions):
+    """
+    增强的安全操作类（异步版本）
+
+    点击、输入及其重试方法为协程，只负责访问页面；选择器提示（_get_user_input）、get_selector，
+    以及重试判断、命中记录、批量填写分组等不访问页面的步骤沿用 EnhancedSafeActions 的共用方法
+    """
+
+    async def _smart_click(self, selector: str, must_exist: bool = True, timeout: int = None) -> bool:
+        """智能点击：所有备选项同时等待，最先出现的命中"""
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+
+        resolved = await self._resolve_selector(selector, timeout)
+        if not resolved:
+            if must_exist and len(compile_selector(selector)) > 1:
+                raise RuntimeError(f"所有选择器都失败: {selector}")
+            return False
+
+        alternative, element = resolved
+        try:
+            await element.scroll_into_view_if_needed()
+            await pacing.async_pause("before_action")
+            await element.click(timeout=timeout)
+
+            # 等待点击引起的页面变化稳定
+            await settle(self.page)
+
+            return True
+
+        except Exception as e:
+            logger.debug(f"{self.log_prefix}选择器失败: {alternative.raw}, 错误: {e}")
+            return False
+
+    async def _smart_input(self, selector: str, text: str, must_exist: bool = True, timeout: int = None) -> bool:
+        """智能输入：所有备选项同时等待，最先出现的命中"""
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+
+        resolved = await self._resolve_selector(selector, timeout, for_input=True)
+        if not resolved:
+            if must_exist and len(compile_selector(selector)) > 1:
+                raise RuntimeError(f"所有输入选择器都失败: {selector}")
+            return False
+
+        alternative, element = resolved
+        try:
+            await element.scroll_into_view_if_needed()
+            await pacing.async_pause("before_action")
+
+            await element.fill("")
+            await element.type(text, delay=pacing.typing_delay(text))
+
+            # 等待输入引起的页面变化（如搜索结果）稳定
+            await settle(self.page, "after_input")
+
+            return True
+
+        except Exception as e:
+            logger.debug(f"{self.log_prefix}输入选择器失败: {alternative.raw}, 错误: {e}")
+            return False
+
+    async def _resolve_selector(self, selector: str, timeout: int, for_input: bool = False):
+        """
+        解析选择器：备选项合并为一个组合定位器同时等待（共用一次超时）
+
+        Returns:
+            Optional[Tuple[SelectorAlternative, Locator]]: 命中的备选项及其定位器
+        """
+        race = self._race_alternatives(selector)
+        if not race:
+            return None
+
+        ordered, winner = race
+        resolved = await resolve_first_async(self.page, ordered, timeout, for_input)
+        return self._race_result(selector, ordered, winner, resolved)
+
+    def _prompt_user_input(self, prompt: str, element_key: str, must_exist: bool, region: str) -> str:
+        with _prompt_lock:
+            return self._get_user_input(prompt, element_key, must_exist, region)
+
+    async def _ask_user_input(self, prompt: str, element_key: str, must_exist: bool = True, region: str = None) -> str:
+        """
+        获取新的CSS选择器：无人值守时直接返回，有人值守时在线程池中等待终端输入，不阻塞其他浏览器
+        """
+        if self.unattended:
+            return self._get_user_input(prompt, element_key, must_exist, region)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self._prompt_user_input, prompt, element_key, must_exist, region)
+        )
+
+    async def _update_selector_and_retry(self, element_key: str, operation_type: str,
+                                         must_exist: bool = True, region: str = None, text: str = None) -> bool:
+        """
+        更新选择器并重试操作
+
+        Args:
+            operation_type: 操作类型 (click, input)
+            text: 输入操作的文本
+        """
+        try:
+            if not region:
+                logger.error(f"❌ 必须提供地域代码: {element_key}")
+                return False
+
+            prompt = f"{operation_type.upper()}操作失败，需要更新CSS选择器"
+            new_selector = await self._ask_user_input(prompt, element_key, must_exist, region)
+
+            applied = self._apply_new_selector(element_key, new_selector, region)
+            if applied is not None:
+                return applied
+
+            await human_delay(1, 2)
+
+            if operation_type == "click":
+                result = await self._smart_click(new_selector, True, DEFAULT_TIMEOUT)
+            else:
+                result = await self._smart_input(new_selector, text, True, DEFAULT_TIMEOUT)
+            return self._retry_result(element_key, result)
+
+        except KeyboardInterrupt:
+            logger.info("用户中断操作")
+            raise
+        except SkipCurrentProduct:
+            raise
+        except Exception as e:
+            logger.error(f"❌ 更新选择器并重试失败: {element_key}, 错误: {e}")
+            raise SkipCurrentProduct(f"更新并重试异常: {element_key}, {e}")
+
+    async def _run_with_config(self, operation_type: str, element_key: str, region: str, must_exist: bool,
+                               timeout: int, operation: str, max_retries: int, text: str = None) -> bool:
+        """safe_click_with_config / safe_input_with_config 的公共流程"""
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+
+        target = self._config_target(element_key, region, must_exist)
+        if not target:
+            return False
+        primary_selector, full_operation = target[0], f"{operation}: {target[1]}"
+
+        for attempt in range(max_retries + 1):
+            last_attempt = attempt >= max_retries
+            try:
+                self._log_attempt(attempt, full_operation, primary_selector)
+                if attempt > 0:
+                    await human_delay(1, 2)
+
+                if operation_type == "click":
+                    result = await self._smart_click(primary_selector, must_exist, timeout)
+                else:
+                    result = await self._smart_input(primary_selector, text, must_exist, timeout)
+                outcome = self._attempt_outcome(result, must_exist, last_attempt, full_operation, primary_selector)
+
+            except SkipCurrentProduct:
+                raise
+            except Exception as e:
+                outcome = self._attempt_error(e, attempt, last_attempt)
+
+            if outcome == ATTEMPT_DONE:
+                return True
+            if outcome == ATTEMPT_ABSENT:
+                return False
+            if outcome == ATTEMPT_ASK_USER:
+                return await self._update_selector_and_retry(element_key, operation_type, must_exist, region, text)
+
+        return False
+
+    async def safe_click_with_config(self, element_key: str, region: str = None,
+                                     must_exist: bool = True, timeout: int = None,
+                                     operation: str = "点击操作", max_retries: int = 1) -> bool:
+        """基于配置文件的安全点击操作"""
+        return await self._run_with_config("click", element_key, region, must_exist, timeout, operation, max_retries)
+
+    async def safe_input_with_config(self, element_key: str, text: str, region: str = None,
+                                     must_exist: bool = True, timeout: int = None,
+                                     operation: str = "输入操作", max_retries: int = 1) -> bool:
+        """基于配置文件的安全输入操作"""
+        return await self._run_with_config("input", element_key, region, must_exist, timeout, operation, max_retries, text)
+
+    async def safe_fill_with_config(self, fields: Dict[str, str], region: str = None,
+                                    must_exist: bool = True, timeout: int = None,
+                                    operation: str = "批量填写", typed: Iterable[str] = ()) -> bool:
+        """基于配置文件的批量填写：一次 page.evaluate 设置所有字段的值，逐字输入的字段按顺序单独输入"""
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+
+        results = []
+        for batch, typed_field in self._fill_plan(fields, typed):
+            if typed_field:
+                results.append(await self.safe_input_with_config(*typed_field, region, must_exist, timeout, operation))
+            else:
+                results.append(await self._fill_batch(batch, region, must_exist, timeout, operation))
+        return all(results)
+
+    async def _fill_batch(self, batch: Dict[str, str], region: str, must_exist: bool, timeout: int, operation: str) -> bool:
+        """一次设置一批字段的值，未能设置的字段改为逐字输入"""
+        self._log_fill_batch(batch, operation)
+
+        resolved = []
+        failed = []
+        for element_key, text in batch.items():
+            selector = self.css_manager.get_selector(element_key, region, "primary", self.category)
+            target = await self._resolve_selector(selector, timeout, for_input=True) if selector else None
+            if target:
+                resolved.append((element_key, text, target[1]))
+            else:
+                failed.append(element_key)
+
+        if resolved:
+            await pacing.async_pause("before_action")
+            try:
+                handles = [await locator.element_handle(timeout=timeout) for _, _, locator in resolved]
+                done = await self.page.evaluate(BULK_FILL_SCRIPT, [[handle, text] for handle, (_, text, _) in zip(handles, resolved)])
+            except Exception as e:
+                logger.warning(f"{self.log_prefix}{operation}失败，改为逐个输入: {e}")
+                done = [False] * len(resolved)
+            failed.extend(self._unfilled_fields(resolved, done, region, operation))
+
+            await settle(self.page, "after_input")
+
+        results = []
+        for element_key in failed:
+            results.append(await self.safe_input_with_config(element_key, batch[element_key], region, must_exist, timeout, operation))
+        return all(results)
+
+
+def create_async_enhanced_safe_actions(page: Page, browser_id: str = None, sku: str = None,
+                                       region: str = "HK", category: str = "sneakers") -> AsyncEnhancedSafeActions:
+    """创建异步增强安全操作实例"""
+    return AsyncEnhancedSafeActions(page, browser_id, sku, region, category)
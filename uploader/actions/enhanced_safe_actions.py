@@ -2,13 +2,15 @@
 增强的安全操作函数 - 支持配置文件管理和用户交互式更新
 """
 
-import time
-import random
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict, Iterable
 from playwright.sync_api import Page # pyright: ignore[reportMissingImports]    
-from browser.actions import click_with_wait, input_with_wait, human_delay, DEFAULT_TIMEOUT
+from browser.actions import human_delay, DEFAULT_TIMEOUT
+from browser.waits import settle
+from browser import pacing
 from core.logger import logger
 from ..config.enhanced_css_selector_manager import get_enhanced_css_manager, EnhancedCSSSelectorManager
+from ..config.selector_index import compile_selector
+from .selector_race import get_winner, remember_winner, order_alternatives, resolve_first
 
 # 运行模式控制：默认有人值守
 _UNATTENDED_MODE = False
@@ -18,6 +20,10 @@ def set_unattended_mode(flag: bool) -> None:
     global _UNATTENDED_MODE
     _UNATTENDED_MODE = bool(flag)
 
+def is_unattended_mode() -> bool:
+    """当前是否为无人值守模式"""
+    return _UNATTENDED_MODE
+
 class SkipCurrentProduct(Exception):
     """跳过当前商品，继续下一个商品的异常"""
     pass
@@ -28,6 +34,36 @@ class CriticalOperationFailed(Exception):
     pass
 
 
+# 批量填写：在页面内一次设置多个输入框的值并派发 input/change 事件，返回每个字段是否设置成功。
+# 受控输入框（React 等）只认原型上的 value setter，直接给 el.value 赋值不会更新组件状态
+BULK_FILL_SCRIPT = """
+(fields) => fields.map(([el, value]) => {
+    try {
+        el.focus();
+        if (el.isContentEditable) {
+            el.textContent = value;
+        } else {
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        }
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.blur();
+        return (el.isContentEditable ? el.textContent : el.value) === value;
+    } catch (e) {
+        return false;
+    }
+})
+"""
+
+
+# 基于配置的操作每次尝试的结果
+ATTEMPT_DONE = "done"          # 操作成功
+ATTEMPT_ABSENT = "absent"      # 非必需元素不存在，跳过
+ATTEMPT_RETRY = "retry"        # 失败，继续下一次尝试
+ATTEMPT_ASK_USER = "ask_user"  # 重试次数用完，请求用户更新选择器
+
+
 class EnhancedSafeActions:
     """增强的安全操作类 - 支持配置文件和用户交互"""
     
@@ -55,150 +91,83 @@ class EnhancedSafeActions:
     def _smart_click(self, selector: str, must_exist: bool = True, timeout: int = None) -> bool:
         """
         智能点击方法，支持CSS、XPath和Playwright Locator
-        支持逗号分隔的多个选择器（或条件）
+        支持逗号分隔的多个选择器（或条件），所有备选项同时等待，最先出现的命中
         """
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
         
-        # 检查是否包含逗号分隔的多个选择器
-        if "," in selector:
-            selectors = [s.strip() for s in selector.split(",")]
-            logger.info(f"{self.log_prefix}检测到多个选择器，将依次尝试: {len(selectors)}个")
-            
-            for i, single_selector in enumerate(selectors, 1):
-                try:
-                    logger.info(f"{self.log_prefix}尝试第{i}个选择器: {single_selector}")
-                    if self._try_single_selector(single_selector, timeout):
-                        logger.info(f"{self.log_prefix}第{i}个选择器成功: {single_selector}")
-                        return True
-                    else:
-                        logger.debug(f"{self.log_prefix}第{i}个选择器失败: {single_selector}")
-                except Exception as e:
-                    logger.debug(f"{self.log_prefix}第{i}个选择器异常: {single_selector}, 错误: {e}")
-                    continue
-            
-            # 所有选择器都失败
-            if must_exist:
+        resolved = self._resolve_selector(selector, timeout)
+        if not resolved:
+            # 多个选择器全部失败
+            if must_exist and len(compile_selector(selector)) > 1:
                 raise RuntimeError(f"所有选择器都失败: {selector}")
             return False
-        else:
-            # 单个选择器
-            return self._try_single_selector(selector, timeout)
-    
-    def _try_single_selector(self, selector: str, timeout: int) -> bool:
-        """
-        尝试单个选择器
-        """
+        
+        alternative, element = resolved
         try:
-            # 判断选择器类型
-            if selector.startswith("//"):
-                # XPath选择器
-                element = self.page.wait_for_selector(f"xpath={selector}", timeout=timeout)
-            elif selector.startswith("text="):
-                # Playwright Locator
-                element = self.page.get_by_text(selector.replace("text=", "")).first
-                element.wait_for(state="visible", timeout=timeout)
-            elif ":has-text(" in selector:
-                # Playwright has-text选择器
-                element = self.page.locator(selector)
-                element.wait_for(state="visible", timeout=timeout)
-            else:
-                # 普通CSS选择器
-                element = self.page.wait_for_selector(selector, timeout=timeout)
+            element.scroll_into_view_if_needed()
+            pacing.pause("before_action")
+            element.click(timeout=timeout)
             
-            if element:
-                element.scroll_into_view_if_needed()
-                human_delay(0.5, 1.0)
-                element.click()
-                
-                # 点击成功后添加2-3秒随机等待时间
-                success_delay = random.uniform(2.0, 3.0)
-                logger.info(f"{self.log_prefix}点击操作完成，等待 {success_delay:.1f}s 后继续...")
-                time.sleep(success_delay)
-                
-                return True
-            else:
-                return False
+            # 等待点击引起的页面变化稳定
+            settle(self.page)
+            
+            return True
                 
         except Exception as e:
-            logger.debug(f"{self.log_prefix}选择器失败: {selector}, 错误: {e}")
+            logger.debug(f"{self.log_prefix}选择器失败: {alternative.raw}, 错误: {e}")
             return False
     
     def _smart_input(self, selector: str, text: str, must_exist: bool = True, timeout: int = None) -> bool:
         """
         智能输入方法，支持CSS、XPath和Playwright Locator
-        支持逗号分隔的多个选择器（或条件）
+        支持逗号分隔的多个选择器（或条件），所有备选项同时等待，最先出现的命中
         """
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
         
-        # 检查是否包含逗号分隔的多个选择器
-        if "," in selector:
-            selectors = [s.strip() for s in selector.split(",")]
-            logger.info(f"{self.log_prefix}检测到多个输入选择器，将依次尝试: {len(selectors)}个")
-            
-            for i, single_selector in enumerate(selectors, 1):
-                try:
-                    logger.info(f"{self.log_prefix}尝试第{i}个输入选择器: {single_selector}")
-                    if self._try_single_input_selector(single_selector, text, timeout):
-                        logger.info(f"{self.log_prefix}第{i}个输入选择器成功: {single_selector}")
-                        return True
-                    else:
-                        logger.debug(f"{self.log_prefix}第{i}个输入选择器失败: {single_selector}")
-                except Exception as e:
-                    logger.debug(f"{self.log_prefix}第{i}个输入选择器异常: {single_selector}, 错误: {e}")
-                    continue
-            
-            # 所有选择器都失败
-            if must_exist:
+        resolved = self._resolve_selector(selector, timeout, for_input=True)
+        if not resolved:
+            # 多个选择器全部失败
+            if must_exist and len(compile_selector(selector)) > 1:
                 raise RuntimeError(f"所有输入选择器都失败: {selector}")
             return False
-        else:
-            # 单个选择器
-            return self._try_single_input_selector(selector, text, timeout)
-    
-    def _try_single_input_selector(self, selector: str, text: str, timeout: int) -> bool:
-        """
-        尝试单个输入选择器
-        """
+        
+        alternative, element = resolved
         try:
-            # 判断选择器类型
-            if selector.startswith("//"):
-                # XPath选择器
-                element = self.page.wait_for_selector(f"xpath={selector}", timeout=timeout)
-            elif selector.startswith("text="):
-                # Playwright Locator - 文本选择器通常用于点击，这里需要找到对应的输入框
-                # 这里可能需要更复杂的逻辑来找到对应的输入框
-                element = self.page.wait_for_selector("textarea, input[type='text']", timeout=timeout)
-            elif ":has-text(" in selector:
-                # Playwright has-text选择器
-                element = self.page.locator(selector)
-                element.wait_for(state="visible", timeout=timeout)
-            else:
-                # 普通CSS选择器
-                element = self.page.wait_for_selector(selector, timeout=timeout)
+            element.scroll_into_view_if_needed()
+            pacing.pause("before_action")
             
-            if element:
-                element.scroll_into_view_if_needed()
-                human_delay(0.5, 1.0)
-                
-                # 清空输入框并输入指定文本，避免剪贴板干扰
-                element.fill("")  # 先清空
-                element.type(text, delay=50)  # 模拟人工输入
-                
-                # 输入成功后添加2-3秒随机等待时间
-                success_delay = random.uniform(2.0, 3.0)
-                logger.info(f"{self.log_prefix}输入操作完成，等待 {success_delay:.1f}s 后继续...")
-                time.sleep(success_delay)
-                
-                return True
-            else:
-                return False
+            # 清空输入框并输入指定文本，避免剪贴板干扰
+            element.fill("")  # 先清空
+            element.type(text, delay=pacing.typing_delay(text))  # 模拟人工输入
+            
+            # 等待输入引起的页面变化（如搜索结果）稳定
+            settle(self.page, "after_input")
+            
+            return True
                 
         except Exception as e:
-            logger.debug(f"{self.log_prefix}输入选择器失败: {selector}, 错误: {e}")
+            logger.debug(f"{self.log_prefix}输入选择器失败: {alternative.raw}, 错误: {e}")
             return False
     
+    def _resolve_selector(self, selector: str, timeout: int, for_input: bool = False):
+        """
+        解析选择器：备选项合并为一个组合定位器同时等待（共用一次超时）
+        
+        命中的备选项按 地域/账号 记录，下次同时可见时优先使用
+        
+        Returns:
+            Optional[Tuple[SelectorAlternative, Locator]]: 命中的备选项及其定位器
+        """
+        race = self._race_alternatives(selector)
+        if not race:
+            return None
+        
+        ordered, winner = race
+        resolved = resolve_first(self.page, ordered, timeout, for_input)
+        return self._race_result(selector, ordered, winner, resolved)
+    
     def _get_user_input(self, prompt: str, element_key: str, must_exist: bool = True, region: str = None) -> str:
         """
         获取用户输入的新CSS选择器
@@ -305,17 +274,17 @@ class EnhancedSafeActions:
                 print(f"❌ 输入错误: {e}")
                 continue
     
-    def _update_selector_and_retry(self, element_key: str, operation_type: str, 
-                                  operation_func, must_exist: bool = True, region: str = None, *args, **kwargs) -> bool:
+    def _update_selector_and_retry(self, element_key: str, operation_type: str,
+                                  must_exist: bool = True, region: str = None, text: str = None) -> bool:
         """
         更新选择器并重试操作
         
         Args:
             element_key: 元素键名
-            operation_type: 操作类型 (click, input, check)
-            operation_func: 操作函数
+            operation_type: 操作类型 (click, input)
+            must_exist: 是否必须存在
             region: 地域代码
-            *args, **kwargs: 操作函数参数
+            text: 输入操作的文本
             
         Returns:
             bool: 操作是否成功
@@ -330,24 +299,9 @@ class EnhancedSafeActions:
             prompt = f"{operation_type.upper()}操作失败，需要更新CSS选择器"
             new_selector = self._get_user_input(prompt, element_key, must_exist, region)
             
-            # 如果用户选择跳过操作
-            if new_selector == "SKIP":
-                logger.info(f"✅ 用户跳过非必要操作: {element_key}")
-                return True  # 返回True表示操作"成功"（被跳过）
-            
-            # 更新配置文件
-            success = self.css_manager.update_selector(
-                element_key, "primary", new_selector, region, self.category
-            )
-            
-            if not success:
-                logger.error(f"❌ 更新CSS选择器配置失败: {element_key}")
-                return False
-            
-            logger.info(f"✅ CSS选择器已更新: {element_key} -> {new_selector}")
-            
-            # 使用新选择器重试操作
-            logger.info(f"🔄 使用新选择器重试操作: {element_key}")
+            applied = self._apply_new_selector(element_key, new_selector, region)
+            if applied is not None:
+                return applied
             
             # 等待页面稳定
             human_delay(1, 2)
@@ -355,21 +309,9 @@ class EnhancedSafeActions:
             # 执行操作
             if operation_type == "click":
                 result = self._smart_click(new_selector, True, DEFAULT_TIMEOUT)
-            elif operation_type == "input":
-                result = self._smart_input(new_selector, args[0], True, DEFAULT_TIMEOUT)
-            elif operation_type == "check":
-                result = self._check_element_exists(new_selector, must_exist, DEFAULT_TIMEOUT)
-            else:
-                logger.error(f"❌ 不支持的操作类型: {operation_type}")
-                return False
-            
-            if result:
-                logger.info(f"✅ 使用新选择器操作成功: {element_key}")
-                return True
             else:
-                logger.error(f"❌ 使用新选择器操作仍然失败: {element_key}")
-                # 直接退出当前任务，继续下一个
-                raise SkipCurrentProduct(f"使用新选择器仍失败: {element_key}")
+                result = self._smart_input(new_selector, text, True, DEFAULT_TIMEOUT)
+            return self._retry_result(element_key, result)
                 
         except KeyboardInterrupt:
             logger.info("用户中断操作")
@@ -382,86 +324,67 @@ class EnhancedSafeActions:
             # 出现异常时也退出当前任务
             raise SkipCurrentProduct(f"更新并重试异常: {element_key}, {e}")
     
-    def safe_click_with_config(self, element_key: str, region: str = None, 
-                              must_exist: bool = True, timeout: int = None,
-                              operation: str = "点击操作", max_retries: int = 1) -> bool:
-        """
-        基于配置文件的安全点击操作
-        
-        Args:
-            element_key: 元素键名
-            region: 地域代码
-            must_exist: 是否必须存在
-            timeout: 超时时间
-            operation: 操作描述
-            max_retries: 最大重试次数
-            
-        Returns:
-            bool: 操作是否成功
-        """
+    def _run_with_config(self, operation_type: str, element_key: str, region: str, must_exist: bool,
+                         timeout: int, operation: str, max_retries: int, text: str = None) -> bool:
+        """safe_click_with_config / safe_input_with_config 的公共流程"""
         # 设置默认超时时间
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
         
-        # 检查并重新加载配置
-        self.css_manager.check_and_reload()
-        
-        # 获取选择器
-        primary_selector = self.css_manager.get_selector(element_key, region, "primary", self.category)
-        
-        if not primary_selector:
-            logger.error(f"❌ 找不到CSS选择器配置: {element_key}")
-            if must_exist:
-                raise CriticalOperationFailed(f"找不到CSS选择器配置: {element_key}")
+        target = self._config_target(element_key, region, must_exist)
+        if not target:
             return False
-        
-        element_description = self.css_manager.get_element_description(element_key, region, self.category)
-        full_operation = f"{operation}: {element_description}"
+        primary_selector, full_operation = target[0], f"{operation}: {target[1]}"
         
         # 尝试选择器
         for attempt in range(max_retries + 1):
+            last_attempt = attempt >= max_retries
             try:
+                self._log_attempt(attempt, full_operation, primary_selector)
                 if attempt > 0:
-                    logger.info(f"{self.log_prefix}第{attempt + 1}次尝试{full_operation}")
                     human_delay(1, 2)
-                else:
-                    logger.info(f"{self.log_prefix}正在{full_operation}: {primary_selector}")
                 
-                result = self._smart_click(primary_selector, must_exist, timeout)
-                if result:
-                    logger.info(f"{self.log_prefix}{full_operation}成功")
-                    return True
+                if operation_type == "click":
+                    result = self._smart_click(primary_selector, must_exist, timeout)
                 else:
-                    # 如果must_exist=False且选择器返回False，说明元素不存在，直接返回False
-                    if not must_exist:
-                        logger.info(f"{self.log_prefix}元素不存在，跳过操作: {primary_selector}")
-                        return False
-                    
-                    logger.warning(f"{self.log_prefix}选择器失败: {primary_selector}")
-                    
-                    # 如果重试次数达到上限，请求用户输入新选择器
-                    if attempt >= max_retries:
-                        logger.error(f"{self.log_prefix}所有选择器都失败，请求用户更新")
-                        return self._update_selector_and_retry(
-                            element_key, "click", click_with_wait, 
-                            must_exist, region, primary_selector, must_exist, timeout
-                        )
-                        
+                    result = self._smart_input(primary_selector, text, must_exist, timeout)
+                outcome = self._attempt_outcome(result, must_exist, last_attempt, full_operation, primary_selector)
+                
             except SkipCurrentProduct:
                 # 向上抛出以便上层跳过当前任务
                 raise
             except Exception as e:
-                logger.warning(f"{self.log_prefix}第{attempt + 1}次尝试异常: {e}")
-                
-                if attempt >= max_retries:
-                    logger.error(f"{self.log_prefix}操作失败，请求用户更新选择器")
-                    return self._update_selector_and_retry(
-                        element_key, "click", click_with_wait,
-                        must_exist, region, primary_selector, must_exist, timeout
-                    )
+                outcome = self._attempt_error(e, attempt, last_attempt)
+            
+            if outcome == ATTEMPT_DONE:
+                return True
+            if outcome == ATTEMPT_ABSENT:
+                return False
+            if outcome == ATTEMPT_ASK_USER:
+                # 重试次数达到上限，请求用户输入新选择器
+                return self._update_selector_and_retry(element_key, operation_type, must_exist, region, text)
         
         return False
     
+    def safe_click_with_config(self, element_key: str, region: str = None, 
+                              must_exist: bool = True, timeout: int = None,
+                              operation: str = "点击操作", max_retries: int = 1) -> bool:
+        """
+        基于配置文件的安全点击操作
+        
+        Args:
+            element_key: 元素键名
+            region: 地域代码
+            must_exist: 是否必须存在
+            timeout: 超时时间
+            operation: 操作描述
+            max_retries: 最大重试次数
+            
+        Returns:
+            bool: 操作是否成功
+        """
+        return self._run_with_config("click", element_key, region, must_exist, timeout, operation, max_retries)
+    
     def safe_input_with_config(self, element_key: str, text: str, region: str = None,
                               must_exist: bool = True, timeout: int = None,
                               operation: str = "输入操作", max_retries: int = 1) -> bool:
@@ -480,68 +403,229 @@ class EnhancedSafeActions:
         Returns:
             bool: 操作是否成功
         """
-        # 设置默认超时时间
+        return self._run_with_config("input", element_key, region, must_exist, timeout, operation, max_retries, text)
+    
+    def safe_fill_with_config(self, fields: Dict[str, str], region: str = None,
+                              must_exist: bool = True, timeout: int = None,
+                              operation: str = "批量填写", typed: Iterable[str] = ()) -> bool:
+        """
+        基于配置文件的批量填写：先解析所有输入框，再通过一次 page.evaluate 设置值并派发 input/change 事件
+        
+        当前节奏档位要求逐字输入（human_typing）或字段在 typed 中时，该字段按顺序改用 safe_input_with_config 逐字输入；
+        批量设置失败的字段同样改用 safe_input_with_config（含请求更新选择器的流程）
+        
+        Args:
+            fields: 元素键名 -> 填写内容（按顺序填写）
+            region: 地域代码
+            must_exist: 是否必须存在
+            timeout: 超时时间
+            operation: 操作描述
+            typed: 需要逐字输入的元素键名（如依赖键盘事件触发搜索的输入框）
+            
+        Returns:
+            bool: 所有字段是否填写成功
+        """
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
         
-        # 检查并重新加载配置
+        results = []
+        for batch, typed_field in self._fill_plan(fields, typed):
+            if typed_field:
+                results.append(self.safe_input_with_config(*typed_field, region, must_exist, timeout, operation))
+            else:
+                results.append(self._fill_batch(batch, region, must_exist, timeout, operation))
+        return all(results)
+    
+    def _fill_batch(self, batch: Dict[str, str], region: str, must_exist: bool, timeout: int, operation: str) -> bool:
+        """一次设置一批字段的值，未能设置的字段改为逐字输入"""
+        self._log_fill_batch(batch, operation)
+        
+        resolved = []
+        failed = []
+        for element_key, text in batch.items():
+            selector = self.css_manager.get_selector(element_key, region, "primary", self.category)
+            target = self._resolve_selector(selector, timeout, for_input=True) if selector else None
+            if target:
+                resolved.append((element_key, text, target[1]))
+            else:
+                failed.append(element_key)
+        
+        if resolved:
+            pacing.pause("before_action")
+            try:
+                handles = [locator.element_handle(timeout=timeout) for _, _, locator in resolved]
+                done = self.page.evaluate(BULK_FILL_SCRIPT, [[handle, text] for handle, (_, text, _) in zip(handles, resolved)])
+            except Exception as e:
+                logger.warning(f"{self.log_prefix}{operation}失败，改为逐个输入: {e}")
+                done = [False] * len(resolved)
+            failed.extend(self._unfilled_fields(resolved, done, region, operation))
+            
+            # 等待输入引起的页面变化稳定
+            settle(self.page, "after_input")
+        
+        results = [
+            self.safe_input_with_config(element_key, batch[element_key], region, must_exist, timeout, operation)
+            for element_key in failed
+        ]
+        return all(results)
+    
+    # ========= 同步/异步共用（不访问页面） =========
+    def _race_alternatives(self, selector: str) -> Optional[Tuple[tuple, Optional[str]]]:
+        """
+        拆分备选选择器并把该地域/账号上次命中的排在最前
+        
+        Returns:
+            Optional[Tuple[tuple, Optional[str]]]: (排序后的备选项, 上次命中的备选项)，没有备选项时返回None
+        """
+        # 备选选择器已在配置加载时拆分并识别类型（compile_selector 按字符串缓存）
+        alternatives = compile_selector(selector)
+        if not alternatives:
+            return None
+        
+        winner = get_winner(self.region, self.browser_id, selector)
+        ordered = order_alternatives(alternatives, winner)
+        if len(ordered) > 1:
+            logger.info(f"{self.log_prefix}检测到多个选择器，同时等待: {len(ordered)}个"
+                        + (f"（优先: {winner}）" if winner else ""))
+        return ordered, winner
+    
+    def _race_result(self, selector: str, ordered: tuple, winner: Optional[str], resolved):
+        """记录并返回并发等待的结果，命中的备选项与上次不同时更新命中记录"""
+        if not resolved:
+            logger.debug(f"{self.log_prefix}选择器失败: {selector}")
+            return None
+        
+        alternative = resolved[0]
+        if len(ordered) > 1:
+            logger.info(f"{self.log_prefix}选择器命中: {alternative.raw}")
+            if alternative.raw != winner:
+                remember_winner(self.region, self.browser_id, selector, alternative.raw)
+        return resolved
+    
+    def _config_target(self, element_key: str, region: str, must_exist: bool) -> Optional[Tuple[str, str]]:
+        """
+        读取元素键名的主选择器和元素描述（先检查配置热更新）
+        
+        Returns:
+            Optional[Tuple[str, str]]: (主选择器, 元素描述)，未配置时返回None
+        
+        Raises:
+            CriticalOperationFailed: 未配置且 must_exist 为True
+        """
         self.css_manager.check_and_reload()
         
-        # 获取选择器
         primary_selector = self.css_manager.get_selector(element_key, region, "primary", self.category)
-        
         if not primary_selector:
             logger.error(f"❌ 找不到CSS选择器配置: {element_key}")
             if must_exist:
                 raise CriticalOperationFailed(f"找不到CSS选择器配置: {element_key}")
-            return False
+            return None
         
-        element_description = self.css_manager.get_element_description(element_key, region, self.category)
-        full_operation = f"{operation}: {element_description}"
+        return primary_selector, self.css_manager.get_element_description(element_key, region, self.category)
+    
+    def _log_attempt(self, attempt: int, full_operation: str, primary_selector: str) -> None:
+        if attempt > 0:
+            logger.info(f"{self.log_prefix}第{attempt + 1}次尝试{full_operation}")
+        else:
+            logger.info(f"{self.log_prefix}正在{full_operation}: {primary_selector}")
+    
+    def _attempt_outcome(self, result: bool, must_exist: bool, last_attempt: bool,
+                         full_operation: str, primary_selector: str) -> str:
+        """一次尝试的结果：成功 / 元素不存在（非必需操作） / 重试 / 请求用户更新选择器"""
+        if result:
+            logger.info(f"{self.log_prefix}{full_operation}成功")
+            return ATTEMPT_DONE
         
-        # 尝试选择器
-        for attempt in range(max_retries + 1):
-            try:
-                if attempt > 0:
-                    logger.info(f"{self.log_prefix}第{attempt + 1}次尝试{full_operation}")
-                    human_delay(1, 2)
-                else:
-                    logger.info(f"{self.log_prefix}正在{full_operation}: {primary_selector}")
-                
-                result = self._smart_input(primary_selector, text, must_exist, timeout)
-                if result:
-                    logger.info(f"{self.log_prefix}{full_operation}成功")
-                    return True
-                else:
-                    # 如果must_exist=False且选择器返回False，说明元素不存在，直接返回False
-                    if not must_exist:
-                        logger.info(f"{self.log_prefix}元素不存在，跳过操作: {primary_selector}")
-                        return False
-                    
-                    logger.warning(f"{self.log_prefix}选择器失败: {primary_selector}")
-                    
-                    # 如果重试次数达到上限，请求用户输入新选择器
-                    if attempt >= max_retries:
-                        logger.error(f"{self.log_prefix}所有选择器都失败，请求用户更新")
-                        return self._update_selector_and_retry(
-                            element_key, "input", input_with_wait,
-                            must_exist, region, primary_selector, text, must_exist, timeout
-                        )
-                        
-            except SkipCurrentProduct:
-                # 向上抛出以便上层跳过当前任务
-                raise
-            except Exception as e:
-                logger.warning(f"{self.log_prefix}第{attempt + 1}次尝试异常: {e}")
-                
-                if attempt >= max_retries:
-                    logger.error(f"{self.log_prefix}操作失败，请求用户更新选择器")
-                    return self._update_selector_and_retry(
-                        element_key, "input", input_with_wait,
-                        must_exist, region, primary_selector, text, must_exist, timeout
-                    )
+        # 如果must_exist=False且选择器返回False，说明元素不存在
+        if not must_exist:
+            logger.info(f"{self.log_prefix}元素不存在，跳过操作: {primary_selector}")
+            return ATTEMPT_ABSENT
         
-        return False
+        logger.warning(f"{self.log_prefix}选择器失败: {primary_selector}")
+        if last_attempt:
+            logger.error(f"{self.log_prefix}所有选择器都失败，请求用户更新")
+            return ATTEMPT_ASK_USER
+        return ATTEMPT_RETRY
+    
+    def _attempt_error(self, error: Exception, attempt: int, last_attempt: bool) -> str:
+        """一次尝试抛出异常：重试 / 请求用户更新选择器"""
+        logger.warning(f"{self.log_prefix}第{attempt + 1}次尝试异常: {error}")
+        if last_attempt:
+            logger.error(f"{self.log_prefix}操作失败，请求用户更新选择器")
+            return ATTEMPT_ASK_USER
+        return ATTEMPT_RETRY
+    
+    def _apply_new_selector(self, element_key: str, new_selector: str, region: str) -> Optional[bool]:
+        """
+        处理用户输入的新选择器
+        
+        Returns:
+            Optional[bool]: 用户跳过非必要操作返回True，写入配置失败返回False，
+                            已写入配置返回None（由调用方使用新选择器重试）
+        """
+        # 如果用户选择跳过操作
+        if new_selector == "SKIP":
+            logger.info(f"✅ 用户跳过非必要操作: {element_key}")
+            return True  # 返回True表示操作"成功"（被跳过）
+        
+        # 更新配置文件
+        success = self.css_manager.update_selector(
+            element_key, "primary", new_selector, region, self.category
+        )
+        if not success:
+            logger.error(f"❌ 更新CSS选择器配置失败: {element_key}")
+            return False
+        
+        logger.info(f"✅ CSS选择器已更新: {element_key} -> {new_selector}")
+        logger.info(f"🔄 使用新选择器重试操作: {element_key}")
+        return None
+    
+    def _retry_result(self, element_key: str, result: bool) -> bool:
+        """使用新选择器重试的结果，仍失败时跳过当前商品"""
+        if result:
+            logger.info(f"✅ 使用新选择器操作成功: {element_key}")
+            return True
+        logger.error(f"❌ 使用新选择器操作仍然失败: {element_key}")
+        # 直接退出当前任务，继续下一个
+        raise SkipCurrentProduct(f"使用新选择器仍失败: {element_key}")
+    
+    @staticmethod
+    def _fill_plan(fields: Dict[str, str], typed: Iterable[str]) -> List[Tuple[Dict[str, str], Optional[Tuple[str, str]]]]:
+        """
+        按字段顺序把批量填写拆分为若干步：(一次设置的字段, None) 或 ({}, (逐字输入的元素键名, 文本))
+        
+        当前节奏档位要求逐字输入时所有字段都逐字输入
+        """
+        typed = set(typed)
+        human_typing = pacing.human_typing()
+        plan = []
+        batch: Dict[str, str] = {}
+        for element_key, value in fields.items():
+            text = "" if value is None else str(value)
+            if human_typing or element_key in typed:
+                if batch:
+                    plan.append((batch, None))
+                    batch = {}
+                plan.append(({}, (element_key, text)))
+            else:
+                batch[element_key] = text
+        if batch:
+            plan.append((batch, None))
+        return plan
+    
+    def _log_fill_batch(self, batch: Dict[str, str], operation: str) -> None:
+        self.css_manager.check_and_reload()
+        logger.info(f"{self.log_prefix}正在{operation}: {len(batch)}个字段 {list(batch)}")
+    
+    def _unfilled_fields(self, resolved: List[tuple], done: List[bool], region: str, operation: str) -> List[str]:
+        """记录批量设置的结果，返回未能设置的元素键名"""
+        failed = []
+        for (element_key, _, _), ok in zip(resolved, done):
+            if ok:
+                logger.info(f"{self.log_prefix}{operation}成功: {self.css_manager.get_element_description(element_key, region, self.category)}")
+            else:
+                failed.append(element_key)
+        return failed
     
     def _check_element_exists(self, selector: str, must_exist: bool = False, timeout: int = None) -> bool:
         """
@@ -0,0 +1,120 @@
+"""
+备选选择器并发解析
+逗号分隔的多个备选选择器合并为一个 Playwright 组合定位器同时等待，任一出现即命中，
+并按 地域/账号 记住命中的备选项，下次优先使用
+"""
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+from playwright.sync_api import Page, Locator  # pyright: ignore[reportMissingImports]
+from core.logger import logger
+from ..config.selector_index import SelectorAlternative, KIND_TEXT
+
+# 命中记录: (地域, 账号, 原始选择器字符串) -> 命中的备选项原始写法
+_winners: Dict[Tuple[str, str, str], str] = {}
+_winners_lock = threading.Lock()
+
+
+def _winner_key(region: Optional[str], account: Optional[str], selector: str) -> Tuple[str, str, str]:
+    return (str(region or "").upper(), str(account or ""), selector)
+
+
+def get_winner(region: Optional[str], account: Optional[str], selector: str) -> Optional[str]:
+    """获取该地域/账号下此选择器上次命中的备选项"""
+    with _winners_lock:
+        return _winners.get(_winner_key(region, account, selector))
+
+
+def remember_winner(region: Optional[str], account: Optional[str], selector: str, winner: str) -> None:
+    """记录该地域/账号下此选择器命中的备选项"""
+    with _winners_lock:
+        _winners[_winner_key(region, account, selector)] = winner
+
+
+def order_alternatives(alternatives: Sequence[SelectorAlternative], winner: Optional[str]) -> Tuple[SelectorAlternative, ...]:
+    """把上次命中的备选项排在最前，其余保持配置顺序"""
+    if not winner:
+        return tuple(alternatives)
+    return tuple(sorted(alternatives, key=lambda alt: alt.raw != winner))
+
+
+def build_locator(page: Page, alternative: SelectorAlternative, for_input: bool = False) -> Locator:
+    """
+    把单个备选项转换为 Playwright 定位器
+
+    Args:
+        for_input: 输入操作时 text= 类型无法直接定位输入框，改为匹配页面上的文本输入框
+    """
+    if alternative.kind == KIND_TEXT:
+        if for_input:
+            return page.locator("textarea, input[type='text']")
+        return page.get_by_text(alternative.value)
+    return page.locator(alternative.value)
+
+
+def visible_only(locator: Locator) -> Locator:
+    """只保留可见的匹配元素（visible=true 引擎，兼容 filter(visible=True) 之前的 Playwright 版本）"""
+    return locator.locator("visible=true")
+
+
+def resolve_first(page: Page, alternatives: Sequence[SelectorAlternative], timeout: int,
+                  for_input: bool = False) -> Optional[Tuple[SelectorAlternative, Locator]]:
+    """
+    同时等待所有备选项，返回最先可见的一个
+
+    所有备选项共用一次超时，而不是每个备选项各等待一个完整超时。
+    多个备选项同时可见时按传入顺序（上次命中的在前）选择。
+
+    Returns:
+        Optional[Tuple[SelectorAlternative, Locator]]: 命中的备选项及其定位器，超时返回None
+    """
+    locators = [build_locator(page, alt, for_input) for alt in alternatives]
+    combined = locators[0]
+    for locator in locators[1:]:
+        combined = combined.or_(locator)
+
+    # 等待任一可见的匹配，前面的备选项匹配到隐藏元素时不会挡住后面可见的备选项
+    try:
+        visible_only(combined).first.wait_for(state="visible", timeout=timeout)
+    except Exception as e:
+        logger.debug(f"所有备选选择器均未出现: {[alt.raw for alt in alternatives]}, 错误: {e}")
+        return None
+
+    for alternative, locator in zip(alternatives, locators):
+        visible = visible_only(locator)
+        try:
+            if visible.count() > 0:
+                return alternative, visible.first
+        except Exception as e:
+            logger.debug(f"检查备选选择器可见性失败: {alternative.raw}, 错误: {e}")
+    return None
+
+
+async def resolve_first_async(page, alternatives: Sequence[SelectorAlternative], timeout: int,
+                              for_input: bool = False):
+    """
+    resolve_first 的异步版本（page 为 playwright.async_api 的页面对象）
+
+    Returns:
+        Optional[Tuple[SelectorAlternative, Locator]]: 命中的备选项及其定位器，超时返回None
+    """
+    locators = [build_locator(page, alt, for_input) for alt in alternatives]
+    combined = locators[0]
+    for locator in locators[1:]:
+        combined = combined.or_(locator)
+
+    # 等待任一可见的匹配，前面的备选项匹配到隐藏元素时不会挡住后面可见的备选项
+    try:
+        await visible_only(combined).first.wait_for(state="visible", timeout=timeout)
+    except Exception as e:
+        logger.debug(f"所有备选选择器均未出现: {[alt.raw for alt in alternatives]}, 错误: {e}")
+        return None
+
+    for alternative, locator in zip(alternatives, locators):
+        visible = visible_only(locator)
+        try:
+            if await visible.count() > 0:
+                return alternative, visible.first
+        except Exception as e:
+            logger.debug(f"检查备选选择器可见性失败: {alternative.raw}, 错误: {e}")
+    return None
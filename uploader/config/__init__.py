@@ -5,10 +5,15 @@
 
 from .enhanced_css_selector_manager import EnhancedCSSSelectorManager, get_enhanced_css_manager
 from .regional_config_loader import RegionalConfigLoader, get_regional_config_loader
+from .selector_index import SelectorEntry, SelectorAlternative, build_selector_index, compile_selector
 
 __all__ = [
     'EnhancedCSSSelectorManager',
     'get_enhanced_css_manager',
     'RegionalConfigLoader',
     'get_regional_config_loader',
+    'SelectorEntry',
+    'SelectorAlternative',
+    'build_selector_index',
+    'compile_selector',
 ]
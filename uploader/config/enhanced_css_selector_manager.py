@@ -25,12 +25,12 @@ class EnhancedCSSSelectorManager:
         """
         检查配置文件是否有更新，如果有则重新加载
         
+        只比较文件修改时间，未变化时继续使用内存中已解析的配置
+        
         Returns:
             bool: 是否重新加载了配置
         """
-        # 清除缓存以强制重新加载
-        self.regional_loader.clear_cache()
-        return True
+        return self.regional_loader.reload_if_changed()
 
  
     def get_selector(self, element_key: str, region: str = None, selector_type: str = "primary", category: str = "sneakers") -> Optional[str]:
@@ -132,8 +132,8 @@ class EnhancedCSSSelectorManager:
             
             current[keys[-1]][selector_type] = new_selector
             
-            # 保存到文件
-            config_path = self.regional_loader.base_path / region / category / "css_selectors.yaml"
+            # 保存到文件（写回实际加载的配置文件）
+            config_path = self.regional_loader.get_config_file(region, category)
             with open(config_path, 'w', encoding='utf-8') as f:
                 yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
             
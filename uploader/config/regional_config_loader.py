@@ -5,23 +5,31 @@
 
 import yaml
 import sys
+import time
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 from core.logger import logger
+from .selector_index import SelectorEntry, build_selector_index
 
 
 class RegionalConfigLoader:
     """地域和类别特定的配置加载器"""
     
-    def __init__(self, base_path: str = "uploader/regions"):
+    def __init__(self, base_path: str = "uploader/regions", check_interval: float = 1.0):
         """
         初始化配置加载器
         
         Args:
             base_path: 配置文件基础路径
+            check_interval: 两次检查配置文件修改时间的最小间隔（秒）
         """
         self.base_path = self._get_config_path(base_path)
-        self._cache = {}  # 配置缓存
+        self.check_interval = check_interval
+        # 配置缓存: cache_key -> {"config", "index", "path", "mtime", "checked_at"}
+        # 只有文件修改时间变化时才重新解析YAML并重建选择器索引
+        self._cache = {}
+        self._lock = threading.RLock()
     
     def _get_config_path(self, base_path: str) -> Path:
         """获取配置文件路径，支持PyInstaller打包后的情况"""
@@ -75,6 +83,9 @@ class RegionalConfigLoader:
         """
         加载指定地域和类别的配置文件
         
+        已加载的配置常驻内存，最多每 check_interval 秒检查一次文件修改时间，
+        文件变化时才重新解析
+        
         Args:
             region: 地域 (HK, SG, MY)
             category: 类别 (sneakers, bags, clothes)
@@ -82,35 +93,120 @@ class RegionalConfigLoader:
         Returns:
             Dict[str, Any]: 配置字典
         """
+        entry = self._load_entry(region, category)
+        return entry["config"] if entry else {}
+    
+    def load_index(self, region: str, category: str) -> Dict[str, SelectorEntry]:
+        """
+        加载指定地域和类别的选择器索引（点分路径 -> 预编译的选择器条目）
+        
+        Returns:
+            Dict[str, SelectorEntry]: 选择器索引，配置不存在时为空
+        """
+        entry = self._load_entry(region, category)
+        return entry["index"] if entry else {}
+    
+    def _load_entry(self, region: str, category: str) -> Optional[Dict[str, Any]]:
+        """获取缓存条目，必要时（首次加载或文件已修改）重新解析"""
         # 统一转换为小写，避免缓存键不一致
         region_lower = region.lower()
         category_lower = category.lower()
         cache_key = f"{region_lower}_{category_lower}"
         
-        # 检查缓存
-        if cache_key in self._cache:
-            logger.debug(f"从缓存加载配置: {cache_key}")
-            return self._cache[cache_key]
-        
-        # 构建配置文件路径 - 支持外部和内部配置
-        config_path = self._get_config_file_path(region, category)
-        
-        if not config_path or not config_path.exists():
-            logger.error(f"配置文件不存在: {config_path}")
-            return {}
+        with self._lock:
+            # 检查缓存
+            entry = self._cache.get(cache_key)
+            if entry and not self._is_changed(entry):
+                logger.debug(f"从缓存加载配置: {cache_key}")
+                return entry
+            
+            # 构建配置文件路径 - 支持外部和内部配置
+            config_path = entry["path"] if entry else self._get_config_file_path(region, category)
+            
+            if not config_path or not config_path.exists():
+                logger.error(f"配置文件不存在: {config_path}")
+                return None
+            
+            return self._parse_config(cache_key, config_path)
+    
+    def _is_changed(self, entry: Dict[str, Any], force: bool = False) -> bool:
+        """检查缓存对应的配置文件是否已修改（未到检查间隔时直接视为未修改）"""
+        now = time.monotonic()
+        if not force and now - entry["checked_at"] < self.check_interval:
+            return False
+        entry["checked_at"] = now
         
         try:
+            return entry["path"].stat().st_mtime_ns != entry["mtime"]
+        except OSError:
+            return True
+    
+    def _parse_config(self, cache_key: str, config_path: Path) -> Optional[Dict[str, Any]]:
+        """解析配置文件、编译选择器索引并写入缓存，解析失败时保留上一次成功加载的配置"""
+        previous = self._cache.get(cache_key)
+        try:
+            mtime = config_path.stat().st_mtime_ns
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.safe_load(f) or {}
+            index = build_selector_index(config)
             
             # 缓存配置
-            self._cache[cache_key] = config
-            logger.info(f"成功加载配置文件: {config_path}")
-            return config
+            entry = {
+                "config": config,
+                "index": index,
+                "path": config_path,
+                "mtime": mtime,
+                "checked_at": time.monotonic(),
+            }
+            self._cache[cache_key] = entry
+            if previous:
+                logger.info(f"检测到配置文件变化，已重新加载: {config_path} ({len(index)}个选择器)")
+            else:
+                logger.info(f"成功加载配置文件: {config_path} ({len(index)}个选择器)")
+            return entry
             
         except Exception as e:
             logger.error(f"加载配置文件失败: {config_path}, 错误: {e}")
-            return {}
+            if previous:
+                logger.warning(f"继续使用上一次加载的配置: {cache_key}")
+                return previous
+            return None
+    
+    def reload_if_changed(self) -> bool:
+        """
+        立即检查所有已加载的配置文件，重新解析发生变化的文件
+        
+        Returns:
+            bool: 是否有配置被重新加载
+        """
+        reloaded = False
+        with self._lock:
+            for cache_key, entry in list(self._cache.items()):
+                if self._is_changed(entry, force=True):
+                    self._parse_config(cache_key, entry["path"])
+                    reloaded = True
+        return reloaded
+    
+    def get_config_file(self, region: str, category: str) -> Optional[Path]:
+        """获取指定地域和类别当前使用的配置文件路径"""
+        cache_key = f"{region.lower()}_{category.lower()}"
+        with self._lock:
+            entry = self._cache.get(cache_key)
+        return entry["path"] if entry else self._get_config_file_path(region, category)
+    
+    def get_entry(self, region: str, category: str, selector_path: str) -> Optional[SelectorEntry]:
+        """
+        获取预编译的选择器条目（含拆分好的备选选择器、描述和 mouse_x/mouse_y 等附加字段）
+        
+        Args:
+            region: 地域
+            category: 类别
+            selector_path: 选择器路径，如 "basic_elements.sell_button"
+            
+        Returns:
+            Optional[SelectorEntry]: 选择器条目或None
+        """
+        return self.load_index(region, category).get(selector_path)
     
     def get_selector(self, region: str, category: str, selector_path: str) -> Optional[Dict[str, str]]:
         """
@@ -124,12 +220,18 @@ class RegionalConfigLoader:
         Returns:
             Optional[Dict[str, str]]: 选择器配置或None
         """
-        config = self.load_config(region, category)
+        entry = self._load_entry(region, category)
         
-        if not config:
+        if not entry:
             return None
         
-        # 按路径获取选择器
+        # 选择器条目直接从索引获取
+        selector_entry = entry["index"].get(selector_path)
+        if selector_entry:
+            return selector_entry.raw
+        
+        # 非选择器条目（如整个分组）按路径获取
+        config = entry["config"]
         keys = selector_path.split('.')
         current = config
         
@@ -155,16 +257,21 @@ class RegionalConfigLoader:
         Returns:
             Optional[str]: 选择器值或None
         """
+        selector_entry = self.get_entry(region, category, selector_path)
+        if selector_entry:
+            return selector_entry.raw.get(value_type)
+        
         selector_config = self.get_selector(region, category, selector_path)
         
-        if not selector_config:
+        if not isinstance(selector_config, dict):
             return None
         
         return selector_config.get(value_type)
     
     def clear_cache(self):
         """清除配置缓存"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.info("配置缓存已清除")
 
 
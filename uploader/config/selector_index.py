@@ -0,0 +1,133 @@
+"""
+CSS选择器索引
+把地域/类别的选择器配置预编译为扁平索引：点分路径 -> 选择器条目
+每个条目预先拆分逗号分隔的备选选择器并识别其类型，避免每次操作时重复解析
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# 选择器条目中的标准字段，其余字段（如 mouse_x / mouse_y）视为附加字段
+_STANDARD_FIELDS = ("primary", "description")
+
+# 选择器类型
+KIND_XPATH = "xpath"        # //... 或 xpath=...
+KIND_TEXT = "text"          # text=...，使用 get_by_text 定位
+KIND_HAS_TEXT = "has_text"  # 包含 :has-text( 的Playwright选择器
+KIND_CSS = "css"            # 普通CSS选择器
+
+
+@dataclass(frozen=True)
+class SelectorAlternative:
+    """单个备选选择器"""
+    raw: str    # 配置中的原始写法
+    kind: str   # 选择器类型（KIND_*）
+    value: str  # 可直接交给Playwright的选择器（text 类型为要匹配的文本）
+
+
+@dataclass
+class SelectorEntry:
+    """一个选择器配置项的编译结果"""
+    path: str
+    primary: Optional[str] = None
+    alternatives: Tuple[SelectorAlternative, ...] = ()
+    description: Optional[str] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+
+def split_selector_alternatives(selector: str) -> List[str]:
+    """
+    按顶层逗号拆分备选选择器，忽略引号、括号和方括号内的逗号
+
+    Args:
+        selector: 可能包含多个逗号分隔选择器的字符串
+
+    Returns:
+        List[str]: 去除首尾空白后的非空选择器列表
+    """
+    parts = []
+    current = []
+    quote = None
+    depth = 0
+    for char in selector:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def classify_selector(selector: str) -> SelectorAlternative:
+    """识别单个选择器的类型，并转换为Playwright可直接使用的写法"""
+    if selector.startswith("//"):
+        return SelectorAlternative(selector, KIND_XPATH, f"xpath={selector}")
+    if selector.startswith("xpath="):
+        return SelectorAlternative(selector, KIND_XPATH, selector)
+    if selector.startswith("text="):
+        return SelectorAlternative(selector, KIND_TEXT, selector[len("text="):])
+    if ":has-text(" in selector:
+        return SelectorAlternative(selector, KIND_HAS_TEXT, selector)
+    return SelectorAlternative(selector, KIND_CSS, selector)
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(selector: str) -> Tuple[SelectorAlternative, ...]:
+    """
+    编译选择器字符串：拆分备选项并识别类型（结果按字符串缓存）
+
+    用户交互更新的选择器不在索引中，同样通过这里编译
+    """
+    return tuple(classify_selector(part) for part in split_selector_alternatives(selector or ""))
+
+
+def _compile_entry(path: str, node: Dict[str, Any]) -> SelectorEntry:
+    primary = node.get("primary")
+    primary = str(primary) if primary is not None else None
+    return SelectorEntry(
+        path=path,
+        primary=primary,
+        alternatives=compile_selector(primary) if primary else (),
+        description=node.get("description"),
+        extras={k: v for k, v in node.items() if k not in _STANDARD_FIELDS},
+        raw=node,
+    )
+
+
+def build_selector_index(config: Dict[str, Any]) -> Dict[str, SelectorEntry]:
+    """
+    把嵌套的选择器配置编译为扁平索引
+
+    含有 primary 字段的字典视为选择器条目，其余字典继续向下展开
+
+    Args:
+        config: YAML解析后的配置字典
+
+    Returns:
+        Dict[str, SelectorEntry]: 点分路径（如 "basic_elements.sell_button"）到条目的映射
+    """
+    index: Dict[str, SelectorEntry] = {}
+    stack = [("", config or {})]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in node.items():
+            if not isinstance(value, dict):
+                continue
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if "primary" in value:
+                index[path] = _compile_entry(path, value)
+            else:
+                stack.append((path, value))
+    return index
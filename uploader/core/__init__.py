@@ -1,12 +1,22 @@
 """
 核心上传器模块
-包含基础上传器和工厂包装器
+包含基础上传器、流程驱动上传器和工厂包装器
 """
 
 from .base_uploader import BaseUploader
 from .carousell_uploader import CarousellUploader
+from .async_base_uploader import AsyncBaseUploader
+from .step_graph import StepGraph, StepGraphError, load_step_graph, has_step_graph
+from .flow_uploader import FlowUploader, AsyncFlowUploader
 
 __all__ = [
     'BaseUploader',
     'CarousellUploader',
+    'AsyncBaseUploader',
+    'StepGraph',
+    'StepGraphError',
+    'load_step_graph',
+    'has_step_graph',
+    'FlowUploader',
+    'AsyncFlowUploader',
 ]
@@ -0,0 +1,552 @@
+"""
+基础上传器类（异步版本）- 基于 playwright.async_api 的公共上传步骤
+点击操作顺序和CSS选择器与同步版本 BaseUploader 保持一致
+
+与同步版本的差异：
+- 图片始终通过 filechooser / 文件输入框注入（upload.method 为 keyboard 时同样如此），
+  系统文件对话框和屏幕坐标点击依赖全局键鼠焦点，无法在同一事件循环中并发
+- 新账号弹窗只使用选择器点击关闭
+"""
+import time
+from playwright.async_api import Page  # pyright: ignore[reportMissingImports]
+from core.models import ProductInfo
+from core.logger import logger
+from browser.async_actions import smart_goto, upload_folder_with_file_input
+from browser.async_waits import wait_for_dom_settled, wait_for_dom_change, wait_for_element_count
+from ..actions.async_safe_actions import AsyncEnhancedSafeActions, create_async_enhanced_safe_actions
+from .base_uploader import (
+    BaseUploader, WHATSAPP_PROMPT_SELECTORS, MEETUP_ENABLED_SELECTORS, DELIVERY_ENABLED_SELECTORS,
+    DELIVERY_DETAILS_SELECTORS, BUYER_PROTECTION_ENABLED_SELECTORS
+)
+
+
+class AsyncBaseUploader(BaseUploader):
+    """
+    基础上传器类（异步版本）
+
+    上传步骤方法为协程，只负责访问页面；步骤日志、选择器查找、开关检测文字、激活判断等
+    不访问页面的部分沿用 BaseUploader 的共用方法
+    """
+
+    def _create_safe_actions(self, page: Page, browser_id: str, sku: str) -> AsyncEnhancedSafeActions:
+        return create_async_enhanced_safe_actions(page, browser_id, sku, self.region, self.category)
+
+    async def upload_product(self, product_info: ProductInfo, folder_path: str = None, category: str = "sneakers") -> bool:
+        """由地域/类目上传器实现"""
+        raise NotImplementedError
+
+    async def _read_text(self, selector: str):
+        """按选择器等待元素出现并读取 innerText，失败返回None"""
+        element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
+        if selector.startswith("//"):
+            element = await self.page.wait_for_selector(f"xpath={selector}", timeout=element_timeout)
+        elif ":has-text(" in selector:
+            element = self.page.locator(selector)
+            await element.wait_for(state="visible", timeout=element_timeout)
+        else:
+            element = await self.page.wait_for_selector(selector, timeout=element_timeout)
+        return await element.inner_text() if element else None
+
+    async def _get_button_text(self, element_key: str, allow_user_input: bool = True) -> str:
+        """获取按钮的innerText值，获取失败返回None"""
+        try:
+            primary_selector = self._button_text_selector(element_key)
+            if not primary_selector:
+                return None
+
+            try:
+                text = await self._read_text(primary_selector)
+                if text:
+                    logger.debug(f"✅ 获取到按钮文本: '{text}'")
+                    return text
+            except Exception as e:
+                logger.debug(f"选择器获取文本失败: {e}")
+
+            logger.warning(f"⚠️ 无法获取按钮文本: {element_key}")
+
+        except Exception as e:
+            logger.error(f"❌ 获取按钮文本异常: {e}")
+
+        if allow_user_input:
+            logger.info(f"🔄 尝试让用户输入新的CSS选择器来获取按钮文本")
+            return await self._get_button_text_with_user_input(element_key)
+        return None
+
+    async def _get_button_text_with_user_input(self, element_key: str) -> str:
+        """通过用户输入CSS选择器来获取按钮文本"""
+        try:
+            new_selector = await self.safe_actions._ask_user_input(
+                f"获取按钮文本 - {element_key}", element_key, must_exist=False, region=self.region
+            )
+            if not self._use_user_selector(new_selector):
+                return None
+
+            try:
+                return self._user_selector_text(await self._read_text(new_selector))
+            except Exception as e:
+                logger.warning(f"⚠️ 用户选择器获取文本失败: {e}")
+                return None
+
+        except Exception as e:
+            logger.error(f"❌ 用户输入获取按钮文本异常: {e}")
+            return None
+
+    # ========= 公共方法：服务商品上传流程 =========
+    async def _step(self, name: str, func, *args, **kwargs):
+        """执行一个命名步骤（协程）：已提交的步骤直接跳过，成功后立即写入步骤日志"""
+        if self.journal is None:
+            return await func(*args, **kwargs)
+
+        if self._step_committed(name):
+            return None
+
+        if self._take_resume_pending():
+            await self._prepare_resume(name)
+
+        start = time.time()
+        result = await func(*args, **kwargs)
+        self._commit_step(name, start)
+        return result
+
+    async def _prepare_resume(self, step: str):
+        """从中断处继续前在管理页面中打开本SKU已发布的商品（按刊登ID或标题匹配），找不到时中止"""
+        logger.info(f"{self.log_prefix}♻️ 打开管理页面，继续步骤: {step}")
+        await self._navigate_to_manage_page()
+        await wait_for_dom_settled(self.page)
+
+        element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
+        for description, locator, unique in self._own_listing_locators():
+            try:
+                await locator.first.wait_for(state="visible", timeout=element_timeout)
+            except Exception:
+                continue
+            if unique and await locator.count() != 1:
+                logger.warning(f"{self.log_prefix}⚠️ 按{description}匹配到多个商品，无法确定本SKU的商品")
+                continue
+            logger.info(f"{self.log_prefix}🎯 打开本SKU的商品（{description}）")
+            await locator.first.click()
+            await wait_for_dom_settled(self.page)
+            self._own_listing_opened = True
+            return
+        raise self._own_listing_not_found()
+
+    async def _publish_service_product(self):
+        """发布服务商品并等待发布完成"""
+        # 等待页面稳定（表单校验、图片处理等异步更新结束后再发布）
+        pre_publish_timeout = self.config.navigation_timeouts.get("pre_publish_timeout", 10000)
+        if not await wait_for_dom_settled(self.page, quiet_ms=1000, timeout=pre_publish_timeout):
+            logger.warning(f"{self.log_prefix}页面在{pre_publish_timeout/1000:.0f}秒内仍在变化，继续发布")
+
+        await self._publish_product()
+
+        # 判断dialog消失 - 使用role="dialog"元素消失作为判断条件
+        try:
+            dialog_element = self.page.locator('[role="dialog"]')
+            if await dialog_element.count() > 0:
+                logger.info(f"{self.log_prefix}检测到dialog元素，等待其消失...")
+                dialog_timeout = self.config.navigation_timeouts.get("dialog_timeout", 30000)
+                await dialog_element.wait_for(state="hidden", timeout=dialog_timeout)
+                logger.info(f"{self.log_prefix}Dialog已消失，操作完成，继续执行后续流程")
+            else:
+                logger.info(f"{self.log_prefix}未检测到dialog元素，可能已经消失，继续执行后续流程")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix}等待dialog消失时发生异常: {e}")
+            logger.info(f"{self.log_prefix}继续执行后续流程")
+
+        network_idle_timeout = self.config.navigation_timeouts.get("network_idle_timeout", 5000)
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=network_idle_timeout)
+            logger.info(f"{self.log_prefix}✅ 页面网络活动已结束")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix}⚠️ 等待页面网络活动结束超时: {e}")
+            logger.info(f"{self.log_prefix}✅ 继续执行后续流程")
+
+    async def _any_visible(self, selectors) -> bool:
+        """任一选择器对应的元素可见"""
+        for selector in selectors:
+            if await self.page.locator(selector).is_visible():
+                return True
+        return False
+
+    async def _toggle_if(self, name: str, condition: bool, element_key: str, operation: str) -> None:
+        """condition 为真时点击开关，弹窗/面交/送货等检测逻辑的公共部分"""
+        if condition:
+            logger.info(f"{self.log_prefix}检测到需要{operation}，准备执行")
+            await self.safe_actions.safe_click_with_config(
+                element_key, self.region, must_exist=True, operation=operation
+            )
+        else:
+            logger.info(f"{self.log_prefix}{name}无需处理，跳过{operation}")
+
+    # HK逻辑
+    async def _closewhatsapp(self):
+        """关闭WhatsApp"""
+        logger.info(f"{self.log_prefix}开始检查WhatsApp弹窗")
+        try:
+            detected = await self._any_visible(WHATSAPP_PROMPT_SELECTORS)
+            await self._toggle_if("WhatsApp弹窗", detected, "popups_and_settings.whatsapp_close", "关闭WhatsApp")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测WhatsApp弹窗异常: {e}")
+            logger.info(f"{self.log_prefix}跳过WhatsApp关闭操作")
+
+    # HK逻辑
+    async def _closemeetup(self):
+        """关闭面交"""
+        logger.info(f"{self.log_prefix}开始检查面交状态")
+        try:
+            enabled = await self._any_visible(MEETUP_ENABLED_SELECTORS)
+            await self._toggle_if("面交", enabled, "popups_and_settings.meetup_toggle", "关闭面交")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测面交状态异常: {e}")
+            logger.info(f"{self.log_prefix}跳过面交关闭操作")
+
+    async def _openmeetup(self, enriched_info=None):
+        """开启面交"""
+        logger.info(f"{self.log_prefix}开始检查面交状态")
+        try:
+            if await self._any_visible(MEETUP_ENABLED_SELECTORS):
+                logger.info(f"{self.log_prefix}面交已开启，跳过开启操作")
+                return
+
+            logger.info(f"{self.log_prefix}检测到面交未开启，准备开启")
+            await self.safe_actions.safe_click_with_config(
+                "popups_and_settings.meetup_toggle", self.region, must_exist=True,
+                operation="开启面交"
+            )
+            if enriched_info and enriched_info.meetup_location:
+                await self.safe_actions.safe_input_with_config(
+                    "popups_and_settings.meetup_input", enriched_info.meetup_location, self.region, must_exist=True,
+                    operation="输入面交地点"
+                )
+            else:
+                logger.warning(f"{self.log_prefix}未提供面交地点信息，跳过输入操作")
+
+            await self.safe_actions.safe_click_with_config(
+                "popups_and_settings.meetup_option", self.region, must_exist=True,
+                operation="选择面交地点"
+            )
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测面交状态异常: {e}")
+            logger.info(f"{self.log_prefix}跳过面交开启操作")
+
+    async def _close_delivery(self):
+        """关闭送货"""
+        logger.info(f"{self.log_prefix}开始检查送货状态")
+        try:
+            enabled = await self._any_visible(DELIVERY_ENABLED_SELECTORS)
+            await self._toggle_if("送货", enabled, "popups_and_settings.delivery_toggle", "关闭送货")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测送货状态异常: {e}")
+            logger.info(f"{self.log_prefix}跳过送货关闭操作")
+
+    # HK开启送货
+    async def _open_delivery(self):
+        """开启送货"""
+        logger.info(f"{self.log_prefix}开始检查送货状态")
+        try:
+            enabled = await self._any_visible(DELIVERY_DETAILS_SELECTORS)
+            await self._toggle_if("送货", not enabled, "popups_and_settings.delivery_toggle", "开启送货")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测送货状态异常: {e}")
+            logger.info(f"{self.log_prefix}跳过送货开启操作")
+
+    async def _close_buyer_protection(self):
+        """关闭收款保障"""
+        logger.info(f"{self.log_prefix}开始检查收款保障状态")
+        try:
+            if not await self._any_visible(BUYER_PROTECTION_ENABLED_SELECTORS):
+                logger.info(f"{self.log_prefix}收款保障未开启，跳过关闭操作")
+                return
+
+            logger.info(f"{self.log_prefix}检测到收款保障已开启，准备关闭")
+            await self.safe_actions.safe_click_with_config(
+                "popups_and_settings.buyer_protection_toggle", self.region, must_exist=True,
+                operation="关闭收款保障"
+            )
+            await self.safe_actions.safe_click_with_config(
+                "popups_and_settings.buyer_protection_confirm", self.region, must_exist=True,
+                operation="确认关闭收款保障"
+            )
+        except Exception as e:
+            logger.error(f"{self.log_prefix}检测收款保障状态异常: {e}")
+            logger.info(f"{self.log_prefix}跳过收款保障关闭操作")
+
+    # ========= 公共方法：页面导航 =========
+    async def _navigate_to_homepage(self):
+        """导航到主页"""
+        domain = self._get_domain_by_region()
+        timeout = self.config.navigation_timeouts.get("homepage_timeout", 120000)
+        await smart_goto(self.page, domain, wait_until="domcontentloaded", timeout=timeout)
+        logger.info("🌐 已打开主页")
+
+    async def _navigate_to_manage_page(self):
+        """导航到管理页面"""
+        domain = self._get_domain_by_region()
+        timeout = self.config.navigation_timeouts.get("manage_page_timeout", 30000)
+        await smart_goto(self.page, f"{domain}/manage-listings/", wait_until="domcontentloaded", timeout=timeout)
+        logger.info("🌐 已打开目标页面")
+
+    async def _navigate_to_upload_page(self):
+        """导航到上传图片页面"""
+        domain = self._get_domain_by_region()
+        timeout = self.config.navigation_timeouts.get("upload_page_timeout", 30000)
+        await smart_goto(self.page, f"{domain}/sell?source=nav_bar", wait_until="domcontentloaded", timeout=timeout)
+        logger.info("🌐 已打开目标页面")
+
+    # ========= 公共方法：上传流程 =========
+    async def _start_upload_flow(self, folder_path: str):
+        """开始上传流程"""
+        self.sell_button_text = await self._get_button_text("basic_elements.sell_button")
+        if not self.sell_button_text:
+            logger.warning("⚠️ 未能获取到Sell按钮文本，搜索关键词使用流程定义的默认值")
+        else:
+            logger.info(f"✅ 已获取Sell按钮文本: '{self.sell_button_text}'")
+
+        await self._navigate_to_upload_page()
+
+        page_load_timeout = self.config.navigation_timeouts.get("page_load_timeout", 10000)
+        try:
+            logger.info(f"{self.log_prefix}等待页面加载完成（最多{page_load_timeout/1000:.0f}秒）...")
+            await self.page.wait_for_load_state("domcontentloaded", timeout=page_load_timeout)
+            logger.info(f"{self.log_prefix}页面加载完成")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix}页面加载等待超时，继续执行: {e}")
+
+        if not folder_path:
+            raise ValueError("folder_path参数不能为空")
+
+        image_count = await self._upload_images(folder_path)
+
+        image_upload_wait_timeout = self.config.navigation_timeouts.get("image_upload_wait_timeout", 10000)
+        await self._wait_for_images_uploaded(image_count, image_upload_wait_timeout)
+
+        # 新账号初次上品会出现（可选），连续点击两次关闭按钮
+        if self.region == "SG":
+            for attempt in (1, 2):
+                await self.safe_actions.safe_click_with_config(
+                    "basic_elements.new_account_popup_close", self.region, must_exist=False,
+                    operation=f"关闭新账号弹窗（第{attempt}次点击）"
+                )
+                if attempt == 1:
+                    await self.page.wait_for_timeout(1000)
+
+        await self._handle_ai_writing_operations()
+
+    async def _upload_images(self, folder_path: str):
+        """点击上传图片按钮并把文件夹中的全部图片注入页面"""
+        if self.config.upload_method == "keyboard":
+            logger.warning(f"{self.log_prefix}异步执行核心不支持系统文件对话框上传，改为直接注入文件")
+
+        async def click_upload_button():
+            await self.safe_actions.safe_click_with_config(
+                "basic_elements.upload_images_button", self.region, must_exist=True,
+                operation="点击上传图片按钮"
+            )
+
+        image_count = await upload_folder_with_file_input(
+            self.page, click_upload_button, folder_path, self.config.image_extensions
+        )
+        logger.info(f"{self.log_prefix}已注入 {image_count} 张图片")
+        return image_count
+
+    async def _wait_for_images_uploaded(self, image_count: int, timeout: int):
+        """等待图片上传到服务器（CDN地址的图片数量达到上传数量且配置的上传进度指示消失），至少等待 image_upload_min_wait 毫秒"""
+        start = time.time()
+        try:
+            thumbnail_selector = self._optional_selector("basic_elements.uploaded_image_thumbnail")
+
+            if not thumbnail_selector:
+                logger.info(f"{self.log_prefix}未配置缩略图选择器，等待页面稳定（最多{timeout/1000:.0f}秒）...")
+                await wait_for_dom_settled(self.page, quiet_ms=1500, timeout=timeout)
+                return
+
+            loading_selector = self._optional_selector("basic_elements.image_upload_loading")
+            logger.info(f"{self.log_prefix}等待 {image_count} 张图片上传到服务器（最多{timeout/1000:.0f}秒）...")
+            if await wait_for_element_count(self.page, thumbnail_selector, image_count, timeout=timeout,
+                                            absent_selector=loading_selector):
+                logger.info(f"{self.log_prefix}✅ 图片上传完成")
+            else:
+                logger.warning(f"{self.log_prefix}⚠️ 未在{timeout/1000:.0f}秒内检测到全部图片上传完成，继续执行")
+        finally:
+            remaining = self._image_upload_min_wait() - (time.time() - start) * 1000
+            if remaining > 0:
+                await self.page.wait_for_timeout(remaining)
+
+    async def _select_service_category(self, search_keyword: str):
+        """选择服务类目（search_keyword 为流程定义 keywords.service）"""
+        await self.safe_actions.safe_click_with_config(
+            "category_selection.service_category_selector", self.region, must_exist=True,
+            operation="选择服务类目"
+        )
+
+        await self.safe_actions.safe_input_with_config(
+            "category_selection.category_search_input", search_keyword, self.region, must_exist=True,
+            operation=f"输入{search_keyword}搜索服务"
+        )
+
+        await wait_for_dom_settled(self.page)
+
+        await self.safe_actions.safe_click_with_config(
+            "category_selection.service_category_option", self.region, must_exist=True,
+            operation="选择服务类目选项"
+        )
+
+    async def _fill_basic_info(self, enriched_info: ProductInfo):
+        """填写基本信息（标题、价格、描述一次设置值，节奏档位要求时逐字输入）"""
+        await self.safe_actions.safe_fill_with_config(
+            {
+                "product_info.title_input": enriched_info.title,
+                "product_info.price_input": enriched_info.price,
+                "product_info.description_input": enriched_info.description,
+            },
+            self.region, must_exist=True,
+            operation="填写基本信息"
+        )
+
+    async def _handle_ai_writing_operations(self):
+        """处理AI文案相关操作"""
+        logger.info(f"{self.log_prefix}开始处理AI文案相关操作")
+        try:
+            await self.safe_actions.safe_click_with_config(
+                "basic_elements.ai_writing_cancel_button",
+                self.region,
+                must_exist=False,
+                operation="点击AI文案取消按钮"
+            )
+            logger.info(f"{self.log_prefix}AI文案操作完成")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}AI文案操作异常: {e}")
+
+    async def _select_location_by_region(self):
+        """根据地域选择Location"""
+        await self.safe_actions.safe_click_with_config(
+            "basic_elements.location_selector", self.region, must_exist=True,
+            operation="点击选择Location"
+        )
+        await wait_for_dom_settled(self.page)
+
+        await self.safe_actions.safe_click_with_config(
+            "basic_elements.location_option", self.region, must_exist=True,
+            operation="选择面交地点"
+        )
+
+    async def _publish_product(self):
+        """发布商品"""
+        await self.safe_actions.safe_click_with_config(
+            "publishing.publish_button", self.region, must_exist=True,
+            operation="点击发布按钮"
+        )
+
+    # ========= 公共方法：编辑模式 =========
+    async def _enter_edit_mode(self):
+        """进入编辑模式（从中断处继续时商品页面已由 _prepare_resume 打开）"""
+        await self._click_inactive_product()
+
+        await self.safe_actions.safe_click_with_config(
+            "editing.edit_button", self.region, must_exist=True,
+            operation="点击编辑按钮"
+        )
+
+    async def _wait_for_page_load_and_enter_edit(self):
+        """等待当前页面加载结束，然后直接进入编辑模式"""
+        logger.info(f"{self.log_prefix}⏳ 等待页面加载并进入编辑模式")
+        try:
+            await self._wait_for_page_stability()
+            await self._enter_edit_mode()
+            logger.info(f"{self.log_prefix}✅ 页面加载并进入编辑模式完成")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}❌ 进入编辑模式失败: {e}")
+            raise RuntimeError(f"进入编辑模式失败")
+
+    async def _wait_for_page_stability(self, timeout: int = 10000):
+        """等待页面DOM内容加载完成"""
+        logger.info(f"{self.log_prefix}⏳ 等待页面稳定...")
+        try:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=timeout)
+            logger.info(f"{self.log_prefix}✅ 页面已稳定")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix}⚠️ 页面稳定等待超时: {e}")
+            await self.page.wait_for_timeout(500)
+
+    async def _click_inactive_product(self):
+        """点击未激活的商品（从中断处继续时已打开本SKU的商品，不再点击）"""
+        if self._own_listing_opened:
+            self._own_listing_opened = False
+            return
+        logger.info(f"{self.log_prefix}🎯 点击未激活的商品")
+        await self.safe_actions.safe_click_with_config(
+            "editing.inactive_image", self.region, must_exist=True,
+            operation="点击成功跳服务的产品"
+        )
+        await wait_for_dom_settled(self.page)
+
+    async def _click_activate_button(self):
+        """点击激活按钮并等待激活完成"""
+        logger.info(f"{self.log_prefix}🚀 点击激活按钮")
+
+        button_selector = self.safe_actions.get_selector("editing.activate_button", self.region)
+
+        initial_text = None
+        try:
+            element = await self.page.query_selector(button_selector)
+            if element:
+                initial_text = (await element.text_content()).strip()
+                logger.info(f"{self.log_prefix}📝 按钮初始文字: '{initial_text}'")
+            else:
+                logger.warning(f"{self.log_prefix}⚠️ 无法获取按钮初始文字")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix}⚠️ 获取按钮初始文字失败: {e}")
+
+        await self.safe_actions.safe_click_with_config(
+            "editing.activate_button", self.region, must_exist=True,
+            operation="点击激活商品"
+        )
+
+        logger.info(f"{self.log_prefix}⏳ 等待激活完成...")
+        activation_timeout = self.config.navigation_timeouts.get("activation_timeout", 15000)
+        await self._wait_for_activation_complete(button_selector, initial_text, timeout=activation_timeout)
+        logger.info(f"{self.log_prefix}✅ 商品激活完成")
+
+    async def _activate_product(self):
+        """激活商品 - 主流程"""
+        logger.info(f"{self.log_prefix}开始激活商品流程")
+        try:
+            await self._wait_for_page_stability()
+            await self._click_activate_button()
+            logger.info(f"{self.log_prefix}✅ 激活商品流程完成")
+        except Exception as e:
+            logger.error(f"{self.log_prefix}❌ 激活商品失败: {e}")
+            raise RuntimeError(f"激活商品失败: {e}")
+
+    async def _wait_for_activation_complete(self, selector: str = "button[innerText='Mark as active']", initial_text: str = None, timeout: int = 60000):
+        """等待激活完成：按钮消失、文字变化或变为禁用状态"""
+        logger.info(f"{self.log_prefix}等待激活完成: {selector}, 初始文字: {initial_text}, 超时时间: {timeout}ms")
+
+        start_time = time.time()
+        last_text = ""
+
+        while (time.time() - start_time) * 1000 < timeout:
+            try:
+                element = await self.page.query_selector(selector)
+                if not element:
+                    logger.info(f"{self.log_prefix}激活按钮已消失，激活可能完成")
+                    return True
+
+                current_text = ((await element.text_content()) or "").strip()
+                if current_text != last_text:
+                    logger.info(f"{self.log_prefix}按钮文字变化: '{last_text}' -> '{current_text}'")
+                    last_text = current_text
+                if self._activation_text_done(initial_text, current_text):
+                    return True
+
+                if await element.is_disabled():
+                    logger.info(f"{self.log_prefix}按钮变为禁用状态，激活完成")
+                    return True
+
+                await wait_for_dom_change(self.page, timeout=1000)
+
+            except Exception as e:
+                logger.warning(f"{self.log_prefix}检查激活状态时出错: {e}")
+                await self.page.wait_for_timeout(1000)
+
+        raise self._activation_timeout(selector, last_text, timeout)
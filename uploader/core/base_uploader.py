@@ -2,23 +2,42 @@
 基础上传器类 - 包含所有地域和类目的公共功能
 保持原有的点击操作顺序和CSS选择器不变
 """
+import re
 import time
-from typing import Optional
+from typing import Any, Dict, Optional
 from playwright.sync_api import Page  # pyright: ignore[reportMissingImports]
-import pyautogui  # 用于屏幕坐标点击（处理系统对话框）
 from core.models import ProductInfo, UploadConfig
 from browser.actions import (
     click_with_wait, 
     upload_folder_with_keyboard, 
-    human_delay, 
+    upload_folder_with_file_input,
+    list_image_files,
     input_with_wait, 
     smart_goto,
+    desktop_input_lock,
     DEFAULT_TIMEOUT
 )
 from core.logger import logger
+from browser.waits import wait_for_dom_settled, wait_for_dom_change, wait_for_element_count
 from ..utils.utils import enrich_product_info
+from ..utils.step_journal import get_step_journal, DURABLE_STEPS
 from ..actions.enhanced_safe_actions import EnhancedSafeActions, CriticalOperationFailed, create_enhanced_safe_actions
 
+# 从页面地址中提取商品刊登ID（商品详情页 /p/<标题>-<ID>、编辑页 /edit/<ID> 等）
+LISTING_ID_PATTERN = re.compile(r"(?:/p/[^/?#]*-|/edit/|/listings?/|[?&]listing_id=)(\d{6,})")
+# 管理页面中按标题查找商品时使用的标题长度（商品卡片上的标题可能被截断）
+LISTING_TITLE_MATCH_LENGTH = 40
+
+# 发布页面上各开关状态的检测文字（支持中英文），同步/异步上传器共用
+WHATSAPP_PROMPT_SELECTORS = ("text=添加WhatsApp號碼",)
+MEETUP_ENABLED_SELECTORS = ("text=添加地點", "text=Add location")
+DELIVERY_ENABLED_SELECTORS = ("text=仲有冇額外郵寄資料同埋更多選擇", "text=Carousell Official Delivery")
+DELIVERY_DETAILS_SELECTORS = ("textarea[placeholder='仲有冇額外郵寄資料同埋更多選擇']",)
+BUYER_PROTECTION_ENABLED_SELECTORS = (
+    "text=所有透過「平台收款功能」成功交易的訂單將豁免所有費用",
+    "text=We're waiving the platform fee for a limited time！",
+)
+
 def safe_click_with_wait(page: Page, selector: str, must_exist: bool = False, timeout: int = None, 
                         browser_id: str = None, sku: str = None, operation: str = "点击操作"):
     """安全的点击操作，must_exist=True时失败会抛出CriticalOperationFailed"""
@@ -90,11 +109,33 @@ class BaseUploader:
         # 初始化日志前缀
         self.log_prefix = f"BrowserID: {browser_id}, SKU: {sku}, " if browser_id and sku else ""
         # 初始化增强安全操作
-        self.safe_actions = create_enhanced_safe_actions(page, browser_id, sku, self.region, self.category)
+        self.safe_actions = self._create_safe_actions(page, browser_id, sku)
         
         # 初始化按钮文本捕获属性
         self.sell_button_text = None
         
+        # 步骤日志（upload_product 开始时打开）
+        self.journal = None
+        self._resume_pending = False
+        self._enriched_info = None
+        self._own_listing_opened = False
+        
+    def _create_safe_actions(self, page: Page, browser_id: str, sku: str) -> EnhancedSafeActions:
+        """创建增强安全操作实例（异步上传器改为创建异步版本）"""
+        return create_enhanced_safe_actions(page, browser_id, sku, self.region, self.category)
+    
+    def _read_text(self, selector: str):
+        """按选择器等待元素出现并读取 innerText，失败返回None"""
+        element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
+        if selector.startswith("//"):
+            element = self.page.wait_for_selector(f"xpath={selector}", timeout=element_timeout)
+        elif ":has-text(" in selector:
+            element = self.page.locator(selector)
+            element.wait_for(state="visible", timeout=element_timeout)
+        else:
+            element = self.page.wait_for_selector(selector, timeout=element_timeout)
+        return element.inner_text() if element else None
+    
     def _get_button_text(self, element_key: str, allow_user_input: bool = True) -> str:
         """
         获取按钮的innerText值
@@ -107,55 +148,29 @@ class BaseUploader:
             str: 按钮的innerText值，如果获取失败返回None
         """
         try:
-            # 检查并重新加载配置（支持热更新）
-            self.safe_actions.css_manager.check_and_reload()
-            
-            # 获取主选择器
-            primary_selector = self.safe_actions.css_manager.get_selector(
-                element_key, self.region, "primary", self.category
-            )
-            
+            primary_selector = self._button_text_selector(element_key)
             if not primary_selector:
-                logger.warning(f"⚠️ 找不到选择器配置: {element_key}")
                 return None
             
             # 尝试获取元素文本
-            element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
             try:
-                if primary_selector.startswith("//"):
-                    element = self.page.wait_for_selector(f"xpath={primary_selector}", timeout=element_timeout)
-                elif ":has-text(" in primary_selector:
-                    element = self.page.locator(primary_selector)
-                    element.wait_for(state="visible", timeout=element_timeout)
-                else:
-                    element = self.page.wait_for_selector(primary_selector, timeout=element_timeout)
-                
-                if element:
-                    text = element.inner_text()
+                text = self._read_text(primary_selector)
+                if text:
                     logger.debug(f"✅ 获取到按钮文本: '{text}'")
                     return text
-                    
             except Exception as e:
                 logger.debug(f"选择器获取文本失败: {e}")
             
             logger.warning(f"⚠️ 无法获取按钮文本: {element_key}")
             
-            # 如果允许用户输入，尝试让用户输入新的选择器
-            if allow_user_input:
-                logger.info(f"🔄 尝试让用户输入新的CSS选择器来获取按钮文本")
-                return self._get_button_text_with_user_input(element_key)
-            
-            return None
-            
         except Exception as e:
             logger.error(f"❌ 获取按钮文本异常: {e}")
-            
-            # 如果允许用户输入，尝试让用户输入新的选择器
-            if allow_user_input:
-                logger.info(f"🔄 尝试让用户输入新的CSS选择器来获取按钮文本")
-                return self._get_button_text_with_user_input(element_key)
-            
-            return None
+        
+        # 如果允许用户输入，尝试让用户输入新的选择器
+        if allow_user_input:
+            logger.info(f"🔄 尝试让用户输入新的CSS选择器来获取按钮文本")
+            return self._get_button_text_with_user_input(element_key)
+        return None
     
     def _get_button_text_with_user_input(self, element_key: str) -> str:
         """
@@ -169,38 +184,14 @@ class BaseUploader:
         """
         try:
             # 复用现有的用户输入逻辑
-            prompt = f"获取按钮文本 - {element_key}"
-            new_selector = self.safe_actions._get_user_input(prompt, element_key, must_exist=False, region=self.region)
-            
-            if new_selector == "SKIP":
-                logger.info("用户选择跳过获取按钮文本")
-                return None
-            
-            if not new_selector or new_selector == "SKIP":
+            new_selector = self.safe_actions._get_user_input(
+                f"获取按钮文本 - {element_key}", element_key, must_exist=False, region=self.region
+            )
+            if not self._use_user_selector(new_selector):
                 return None
             
-            # 使用用户输入的选择器尝试获取文本
-            logger.info(f"🔄 使用用户输入的选择器尝试获取按钮文本: {new_selector}")
-            
-            element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
             try:
-                # 判断选择器类型并获取元素
-                if new_selector.startswith("//"):
-                    element = self.page.wait_for_selector(f"xpath={new_selector}", timeout=element_timeout)
-                elif ":has-text(" in new_selector:
-                    element = self.page.locator(new_selector)
-                    element.wait_for(state="visible", timeout=element_timeout)
-                else:
-                    element = self.page.wait_for_selector(new_selector, timeout=element_timeout)
-                
-                if element:
-                    text = element.inner_text()
-                    logger.info(f"✅ 使用用户选择器成功获取按钮文本: '{text}'")
-                    return text
-                else:
-                    logger.warning("⚠️ 用户选择器未找到元素")
-                    return None
-                    
+                return self._user_selector_text(self._read_text(new_selector))
             except Exception as e:
                 logger.warning(f"⚠️ 用户选择器获取文本失败: {e}")
                 return None
@@ -208,7 +199,35 @@ class BaseUploader:
         except Exception as e:
             logger.error(f"❌ 用户输入获取按钮文本异常: {e}")
             return None
-        
+    
+    # ========= 同步/异步共用（不访问页面） =========
+    def _button_text_selector(self, element_key: str) -> Optional[str]:
+        """获取按钮的主选择器（先检查配置热更新），未配置时返回None"""
+        self.safe_actions.css_manager.check_and_reload()
+        primary_selector = self.safe_actions.css_manager.get_selector(
+            element_key, self.region, "primary", self.category
+        )
+        if not primary_selector:
+            logger.warning(f"⚠️ 找不到选择器配置: {element_key}")
+        return primary_selector
+    
+    @staticmethod
+    def _use_user_selector(new_selector: Optional[str]) -> bool:
+        """用户输入的选择器是否可用（未输入或选择跳过时不可用）"""
+        if not new_selector or new_selector == "SKIP":
+            logger.info("用户选择跳过获取按钮文本")
+            return False
+        logger.info(f"🔄 使用用户输入的选择器尝试获取按钮文本: {new_selector}")
+        return True
+    
+    @staticmethod
+    def _user_selector_text(text: Optional[str]) -> Optional[str]:
+        if text:
+            logger.info(f"✅ 使用用户选择器成功获取按钮文本: '{text}'")
+            return text
+        logger.warning("⚠️ 用户选择器未找到元素")
+        return None
+    
     def _get_domain_by_region(self) -> str:
         """根据地域获取对应的域名"""
         if self.region not in self.config.domains:
@@ -222,36 +241,139 @@ class BaseUploader:
     def _enrich_product_info(self, product_info: ProductInfo) -> ProductInfo:
         """丰富商品信息"""
         return enrich_product_info(product_info, self.config, self.region)
+    
+    # ========= 公共方法：步骤日志 =========
+    def _open_journal(self, product_info: ProductInfo, durable_steps: tuple = DURABLE_STEPS) -> ProductInfo:
+        """
+        打开当前商品的步骤日志，返回本次使用的商品信息
         
-    # ========= 公共方法：服务商品上传流程 =========
-    def _upload_service_product(self, enriched_info: ProductInfo, folder_path: str):
+        上次中断前已有落地步骤（如服务商品已发布）时，沿用上次的商品信息和界面语言，
+        后续步骤从该步骤之后继续
+        """
+        self.journal = get_step_journal(self.region, self.browser_id, self.sku, durable_steps)
+        resume_step = self.journal.resume_step
+        saved_info = self.journal.context.get("product_info")
+        
+        if resume_step is None or not saved_info:
+            self._resume_pending = False
+            self._enriched_info = self._enrich_product_info(product_info)
+        else:
+            logger.info(f"{self.log_prefix}♻️ 检测到上次中断的上传，从步骤 {resume_step} 之后继续（已完成: {self.journal.summary()}）")
+            self._resume_pending = True
+            self._enriched_info = ProductInfo(*saved_info)
+            self.sell_button_text = self.journal.context.get("sell_button_text")
+        return self._enriched_info
+    
+    def _step(self, name: str, func, *args, **kwargs):
         """
-        上传服务商品，公共函数
-        保持原有的点击操作顺序和CSS选择器不变
+        执行一个命名步骤：已提交的步骤直接跳过，成功后立即写入步骤日志
+        
+        Args:
+            name: 步骤名称（flow.yaml 中的步骤id，如 navigate / publish / activate）
+            func: 步骤函数
         """
-        # 打开主页
-        self._navigate_to_homepage()
+        if self.journal is None:
+            return func(*args, **kwargs)
         
-        # 开始上传流程
-        self._start_upload_flow(folder_path)
+        if self._step_committed(name):
+            return None
         
-        # 选择服务类目
-        self._select_service_category()
+        if self._take_resume_pending():
+            self._prepare_resume(name)
         
-        # 填写基本信息
-        self._fill_basic_info(enriched_info)
+        start = time.time()
+        result = func(*args, **kwargs)
+        self._commit_step(name, start)
+        return result
+    
+    def _step_committed(self, name: str) -> bool:
+        """步骤已在上次运行中提交（跳过）"""
+        if self.journal.is_committed(name):
+            logger.info(f"{self.log_prefix}⏭️ 跳过已完成的步骤: {name}")
+            return True
+        return False
+    
+    def _take_resume_pending(self) -> bool:
+        """第一个未提交的步骤执行前需要先恢复页面（只恢复一次）"""
+        pending, self._resume_pending = self._resume_pending, False
+        return pending
+    
+    def _commit_step(self, name: str, start: float) -> None:
+        self.journal.commit(name, time.time() - start, **self._journal_context())
+    
+    def _journal_context(self) -> Dict[str, Any]:
+        """
+        写入步骤日志的恢复上下文：商品信息、界面语言，以及当前页面地址中的刊登ID（有时）
 
-        if self.region == "HK":
-            self._closewhatsapp()
-            self._closemeetup()
-            self._open_delivery()
+        刊登ID在发布后进入商品页面时出现，恢复时据此在管理页面中找到本SKU的商品
+        """
+        context: Dict[str, Any] = {
+            "product_info": list(self._enriched_info) if self._enriched_info else None,
+            "sell_button_text": self.sell_button_text,
+        }
+        match = LISTING_ID_PATTERN.search(self.page.url or "")
+        if match:
+            context["listing_id"] = match.group(1)
+        return context
+    
+    def _own_listing_locators(self):
+        """
+        在管理页面中定位本SKU商品的候选方式：(说明, 定位器, 是否要求唯一)
 
-        if self.region == "SG":
-            # 选择地域相关设置
-            self._select_location_by_region()
+        优先使用步骤日志中的刊登ID，没有时按标题查找（同标题的商品不止一个时不可靠）
+        """
+        listing_id = self.journal.context.get("listing_id") if self.journal else None
+        if listing_id:
+            yield f"刊登ID {listing_id}", self.page.locator(f'a[href*="{listing_id}"]'), False
+        title = (self._enriched_info.title or "").strip() if self._enriched_info else ""
+        if title:
+            yield f"标题 {title}", self.page.get_by_text(title[:LISTING_TITLE_MATCH_LENGTH]), True
+    
+    def _own_listing_not_found(self) -> RuntimeError:
+        error = f"管理页面中未找到SKU {self.sku} 已发布的商品，放弃从中断处继续（请人工确认该商品状态）"
+        logger.error(f"{self.log_prefix}❌ {error}")
+        return RuntimeError(error)
+    
+    def _prepare_resume(self, step: str):
+        """
+        从中断处继续前把页面带到该步骤的起点：在管理页面中打开本SKU已发布的商品
 
-        # 等待页面稳定
-        self.page.wait_for_timeout(10000)
+        只点击与步骤日志中的刊登ID（或标题）匹配的商品，找不到时中止，不会误操作其他SKU的商品
+        """
+        logger.info(f"{self.log_prefix}♻️ 打开管理页面，继续步骤: {step}")
+        self._navigate_to_manage_page()
+        wait_for_dom_settled(self.page)
+        
+        element_timeout = self.config.navigation_timeouts.get("element_timeout", 5000)
+        for description, locator, unique in self._own_listing_locators():
+            try:
+                locator.first.wait_for(state="visible", timeout=element_timeout)
+            except Exception:
+                continue
+            if unique and locator.count() != 1:
+                logger.warning(f"{self.log_prefix}⚠️ 按{description}匹配到多个商品，无法确定本SKU的商品")
+                continue
+            logger.info(f"{self.log_prefix}🎯 打开本SKU的商品（{description}）")
+            locator.first.click()
+            wait_for_dom_settled(self.page)
+            self._own_listing_opened = True
+            return
+        raise self._own_listing_not_found()
+    
+    def _finish_journal(self):
+        """商品处理完成，输出各步骤耗时并删除步骤日志"""
+        if self.journal is None:
+            return
+        logger.info(f"{self.log_prefix}⏱️ 步骤耗时: {self.journal.summary()}")
+        self.journal.clear()
+        
+    # ========= 公共方法：服务商品上传流程 =========
+    def _publish_service_product(self):
+        """发布服务商品并等待发布完成"""
+        # 等待页面稳定（表单校验、图片处理等异步更新结束后再发布）
+        pre_publish_timeout = self.config.navigation_timeouts.get("pre_publish_timeout", 10000)
+        if not wait_for_dom_settled(self.page, quiet_ms=1000, timeout=pre_publish_timeout):
+            logger.warning(f"{self.log_prefix}页面在{pre_publish_timeout/1000:.0f}秒内仍在变化，继续发布")
 
         # 发布商品
         self._publish_product()
@@ -289,125 +411,88 @@ class BaseUploader:
             # 即使超时也继续执行，因为dialog已经消失，操作基本完成
             logger.info(f"{self.log_prefix}✅ 继续执行后续流程")
     
+    def _any_visible(self, selectors) -> bool:
+        """任一选择器对应的元素可见"""
+        return any(self.page.locator(selector).is_visible() for selector in selectors)
+    
+    def _toggle_if(self, name: str, condition: bool, element_key: str, operation: str) -> None:
+        """condition 为真时点击开关，弹窗/面交/送货等检测逻辑的公共部分"""
+        if condition:
+            logger.info(f"{self.log_prefix}检测到需要{operation}，准备执行")
+            self.safe_actions.safe_click_with_config(
+                element_key, self.region, must_exist=True, operation=operation
+            )
+        else:
+            logger.info(f"{self.log_prefix}{name}无需处理，跳过{operation}")
+    
     # HK逻辑
     def _closewhatsapp(self):
-        """关闭WhatsApp - 简化检测版本"""
+        """关闭WhatsApp"""
         logger.info(f"{self.log_prefix}开始检查WhatsApp弹窗")
-        
         try:
-            # 直接检测WhatsApp弹窗文字
-            whatsapp_detected = self.page.locator("text=添加WhatsApp號碼").is_visible()
-            
-            if whatsapp_detected:
-                logger.info(f"{self.log_prefix}检测到WhatsApp弹窗，准备关闭")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.whatsapp_close", self.region, must_exist=True,
-                    operation="关闭WhatsApp"
-                )
-            else:
-                logger.info(f"{self.log_prefix}未检测到WhatsApp弹窗，跳过关闭操作")
-                
+            detected = self._any_visible(WHATSAPP_PROMPT_SELECTORS)
+            self._toggle_if("WhatsApp弹窗", detected, "popups_and_settings.whatsapp_close", "关闭WhatsApp")
         except Exception as e:
             logger.error(f"{self.log_prefix}检测WhatsApp弹窗异常: {e}")
             logger.info(f"{self.log_prefix}跳过WhatsApp关闭操作")
     
     # HK逻辑
     def _closemeetup(self):
-        """关闭面交 - 简化检测版本"""
+        """关闭面交"""
         logger.info(f"{self.log_prefix}开始检查面交状态")
-        
         try:
-            # 直接检测面交状态文字
-            meetup_enabled = (self.page.locator("text=添加地點").is_visible() or 
-                            self.page.locator("text=Add location").is_visible())
-            
-            if meetup_enabled:
-                logger.info(f"{self.log_prefix}检测到面交已开启，准备关闭")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.meetup_toggle", self.region, must_exist=True,
-                    operation="关闭面交"
-                )
-            else:
-                logger.info(f"{self.log_prefix}面交未开启，跳过关闭操作")
-                
+            enabled = self._any_visible(MEETUP_ENABLED_SELECTORS)
+            self._toggle_if("面交", enabled, "popups_and_settings.meetup_toggle", "关闭面交")
         except Exception as e:
             logger.error(f"{self.log_prefix}检测面交状态异常: {e}")
-            logger.info(f"{self.log_prefix}跳见面交关闭操作")
+            logger.info(f"{self.log_prefix}跳过面交关闭操作")
 
     def _openmeetup(self, enriched_info=None):
         """开启面交"""
         logger.info(f"{self.log_prefix}开始检查面交状态")
-        
         try:
-            # 检测面交状态文字（支持中英文）
-            meetup_enabled = (self.page.locator("text=添加地點").is_visible() or 
-                             self.page.locator("text=Add location").is_visible())
+            if self._any_visible(MEETUP_ENABLED_SELECTORS):
+                logger.info(f"{self.log_prefix}面交已开启，跳过开启操作")
+                return
             
-            if not meetup_enabled:
-                logger.info(f"{self.log_prefix}检测到面交未开启，准备开启")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.meetup_toggle", self.region, must_exist=True,
-                    operation="开启面交"
+            logger.info(f"{self.log_prefix}检测到面交未开启，准备开启")
+            self.safe_actions.safe_click_with_config(
+                "popups_and_settings.meetup_toggle", self.region, must_exist=True,
+                operation="开启面交"
+            )
+            if enriched_info and enriched_info.meetup_location:
+                self.safe_actions.safe_input_with_config(
+                    "popups_and_settings.meetup_input", enriched_info.meetup_location, self.region, must_exist=True,
+                    operation="输入面交地点"
                 )
-                if enriched_info and hasattr(enriched_info, 'meetup_location'):
-                    self.safe_actions.safe_input_with_config(
-                        "popups_and_settings.meetup_input", enriched_info.meetup_location, self.region, must_exist=True,
-                        operation="输入面交地点"
-                    )
-                else:
-                    logger.warning(f"{self.log_prefix}未提供面交地点信息，跳过输入操作")
-
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.meetup_option", self.region, must_exist=True,
-                    operation="选择面交地点"
-                )   
             else:
-                logger.info(f"{self.log_prefix}面交已开启，跳过开启操作")
-                
+                logger.warning(f"{self.log_prefix}未提供面交地点信息，跳过输入操作")
+
+            self.safe_actions.safe_click_with_config(
+                "popups_and_settings.meetup_option", self.region, must_exist=True,
+                operation="选择面交地点"
+            )
         except Exception as e:
             logger.error(f"{self.log_prefix}检测面交状态异常: {e}")
-            logger.info(f"{self.log_prefix}跳见面交开启操作")
+            logger.info(f"{self.log_prefix}跳过面交开启操作")
 
     def _close_delivery(self):
         """关闭送货"""
         logger.info(f"{self.log_prefix}开始检查送货状态")
-        
         try:
-            # 检测送货状态文字（支持中英文）
-            delivery_enabled = (self.page.locator("text=仲有冇額外郵寄資料同埋更多選擇").is_visible() or 
-                               self.page.locator("text=Carousell Official Delivery").is_visible())
-            
-            if delivery_enabled:
-                logger.info(f"{self.log_prefix}检测到送货已开启，准备关闭")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.delivery_toggle", self.region, must_exist=True,
-                    operation="关闭送货"
-                )
-            else:
-                logger.info(f"{self.log_prefix}送货未开启，跳过关闭操作")
-                
+            enabled = self._any_visible(DELIVERY_ENABLED_SELECTORS)
+            self._toggle_if("送货", enabled, "popups_and_settings.delivery_toggle", "关闭送货")
         except Exception as e:
             logger.error(f"{self.log_prefix}检测送货状态异常: {e}")
             logger.info(f"{self.log_prefix}跳过送货关闭操作")
 
     # HK开启送货
     def _open_delivery(self):
-        """开启送货 - 简化检测版本"""
+        """开启送货（通过送货说明输入框判断是否已开启）"""
         logger.info(f"{self.log_prefix}开始检查送货状态")
-        
         try:
-            # 直接检测送货状态 - 通过placeholder属性检测
-            delivery_enabled = self.page.locator("textarea[placeholder='仲有冇額外郵寄資料同埋更多選擇']").is_visible()
-            
-            if not delivery_enabled:
-                logger.info(f"{self.log_prefix}检测到送货未开启，准备开启")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.delivery_toggle", self.region, must_exist=True,
-                    operation="开启送货"
-                )
-            else:
-                logger.info(f"{self.log_prefix}送货已开启，跳过开启操作")
-                
+            enabled = self._any_visible(DELIVERY_DETAILS_SELECTORS)
+            self._toggle_if("送货", not enabled, "popups_and_settings.delivery_toggle", "开启送货")
         except Exception as e:
             logger.error(f"{self.log_prefix}检测送货状态异常: {e}")
             logger.info(f"{self.log_prefix}跳过送货开启操作")
@@ -416,25 +501,20 @@ class BaseUploader:
     def _close_buyer_protection(self):
         """关闭收款保障"""
         logger.info(f"{self.log_prefix}开始检查收款保障状态")
-        
         try:
-            # 检测收款保障状态文字（支持中英文）
-            buyer_protection_enabled = (self.page.locator("text=所有透過「平台收款功能」成功交易的訂單將豁免所有費用").is_visible() or 
-                                       self.page.locator("text=We're waiving the platform fee for a limited time！").is_visible())
-            
-            if buyer_protection_enabled:
-                logger.info(f"{self.log_prefix}检测到收款保障已开启，准备关闭")
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.buyer_protection_toggle", self.region, must_exist=True,
-                    operation="关闭收款保障"
-                )
-                self.safe_actions.safe_click_with_config(
-                    "popups_and_settings.buyer_protection_confirm", self.region, must_exist=True,
-                    operation="确认关闭收款保障"
-                )
-            else:
+            if not self._any_visible(BUYER_PROTECTION_ENABLED_SELECTORS):
                 logger.info(f"{self.log_prefix}收款保障未开启，跳过关闭操作")
-                
+                return
+            
+            logger.info(f"{self.log_prefix}检测到收款保障已开启，准备关闭")
+            self.safe_actions.safe_click_with_config(
+                "popups_and_settings.buyer_protection_toggle", self.region, must_exist=True,
+                operation="关闭收款保障"
+            )
+            self.safe_actions.safe_click_with_config(
+                "popups_and_settings.buyer_protection_confirm", self.region, must_exist=True,
+                operation="确认关闭收款保障"
+            )
         except Exception as e:
             logger.error(f"{self.log_prefix}检测收款保障状态异常: {e}")
             logger.info(f"{self.log_prefix}跳过收款保障关闭操作")
@@ -466,12 +546,10 @@ class BaseUploader:
     def _start_upload_flow(self, folder_path: str):
         """开始上传流程"""
 
-        # 获取按钮文本并保存到self中，支持默认值
+        # 获取按钮文本并保存到self中（界面语言，用于选择流程定义中的搜索关键词）
         self.sell_button_text = self._get_button_text("basic_elements.sell_button")
         if not self.sell_button_text:
-            # 根据地区设置默认按钮文本
-            self.sell_button_text = "賣嘢" if self.region == "HK" else "Sell"
-            logger.warning(f"⚠️ 未能获取到Sell按钮文本，使用默认值: '{self.sell_button_text}'")
+            logger.warning("⚠️ 未能获取到Sell按钮文本，搜索关键词使用流程定义的默认值")
         else:
             logger.info(f"✅ 已获取Sell按钮文本: '{self.sell_button_text}'")
 
@@ -487,44 +565,38 @@ class BaseUploader:
         except Exception as e:
             logger.warning(f"{self.log_prefix}页面加载等待超时，继续执行: {e}")
         
-        # 点击上传图片
-        self.safe_actions.safe_click_with_config(
-            "basic_elements.upload_images_button", self.region, must_exist=True,
-            operation="点击上传图片按钮"
-        )
+        if not folder_path:
+            raise ValueError("folder_path参数不能为空")
         
         # 上传图片
-        if folder_path:
-            upload_folder_with_keyboard(folder_path, self.config.image_extensions)
-            human_delay(2, 3)
-        else:
-            raise ValueError("folder_path参数不能为空")
+        image_count = self._upload_images(folder_path)
         
         # 等待图片上传完成（从配置读取超时时间）
         image_upload_wait_timeout = self.config.navigation_timeouts.get("image_upload_wait_timeout", 10000)
-        wait_seconds = image_upload_wait_timeout / 1000
-        logger.info(f"{self.log_prefix}等待图片上传完成（{wait_seconds:.0f}秒）...")
-        self.page.wait_for_timeout(image_upload_wait_timeout)
+        self._wait_for_images_uploaded(image_count, image_upload_wait_timeout)
         
         # 新账号初次上品会出现（可选）
         if self.region == "SG":
             # 连续点击两次关闭按钮（某些环境下需要连续点击才能关闭）
             # 第一次点击：移动鼠标到配置的位置并点击
             try:
-                # 从配置中获取完整的配置信息（包含mouse_x和mouse_y）
-                full_config = self.safe_actions.css_manager.regional_loader.get_selector(
+                # 从选择器索引中获取附加字段（mouse_x和mouse_y）
+                selector_entry = self.safe_actions.css_manager.regional_loader.get_entry(
                     self.region, self.category, "basic_elements.new_account_popup_close"
                 )
                 
-                mouse_x = full_config.get("mouse_x") if full_config else None
-                mouse_y = full_config.get("mouse_y") if full_config else None
+                mouse_x = selector_entry.extras.get("mouse_x") if selector_entry else None
+                mouse_y = selector_entry.extras.get("mouse_y") if selector_entry else None
                 
                 if mouse_x is not None and mouse_y is not None:
                     logger.info(f"{self.log_prefix}第一次点击：移动鼠标到屏幕位置 ({mouse_x}, {mouse_y}) 并点击")
                     # 使用pyautogui点击，坐标是相对于整个电脑屏幕的（屏幕坐标）
-                    pyautogui.moveTo(int(mouse_x), int(mouse_y))
-                    time.sleep(0.2)  # 等待鼠标移动
-                    pyautogui.click(int(mouse_x), int(mouse_y))
+                    import pyautogui  # 用于屏幕坐标点击（处理系统对话框）
+                    with desktop_input_lock:
+                        self.page.bring_to_front()
+                        pyautogui.moveTo(int(mouse_x), int(mouse_y))
+                        time.sleep(0.2)  # 等待鼠标移动
+                        pyautogui.click(int(mouse_x), int(mouse_y))
                     logger.info(f"{self.log_prefix}第一次点击完成（屏幕坐标点击）")
                 else:
                     # 如果配置中没有鼠标位置，使用默认方法
@@ -552,17 +624,84 @@ class BaseUploader:
         # 处理AI文案相关操作（使用图片匹配）
         self._handle_ai_writing_operations()
 
-    def _select_service_category(self):
-        """选择服务类目"""
+    def _upload_images(self, folder_path: str):
+        """
+        点击上传图片按钮并选择文件夹中的全部图片
+        
+        默认直接向页面注入文件（upload.method: file_input）；
+        配置为 keyboard 时使用系统文件对话框 + pyautogui 的旧方式
+        """
+        def click_upload_button():
+            # 点击上传图片
+            self.safe_actions.safe_click_with_config(
+                "basic_elements.upload_images_button", self.region, must_exist=True,
+                operation="点击上传图片按钮"
+            )
+        
+        if self.config.upload_method == "keyboard":
+            # 打开文件对话框并通过键盘选择图片期间独占桌面键鼠，避免并发上传时互相干扰
+            with desktop_input_lock:
+                click_upload_button()
+                upload_folder_with_keyboard(folder_path, self.config.image_extensions)
+            return len(list_image_files(folder_path, self.config.image_extensions))
+        
+        image_count = upload_folder_with_file_input(
+            self.page, click_upload_button, folder_path, self.config.image_extensions
+        )
+        logger.info(f"{self.log_prefix}已注入 {image_count} 张图片")
+        return image_count
+    
+    def _wait_for_images_uploaded(self, image_count: int, timeout: int):
+        """
+        等待图片上传到服务器：服务器返回的图片（CDN地址）数量达到上传的图片数量，
+        且上传进度指示（配置了 image_upload_loading 时）消失
+
+        本地预览（blob:/data: 地址）出现时图片还未上传完成，不作为完成信号；
+        未配置缩略图选择器时等待页面DOM稳定。无论检测结果如何，至少等待 image_upload_min_wait 毫秒
+        """
+        start = time.time()
+        try:
+            thumbnail_selector = self._optional_selector("basic_elements.uploaded_image_thumbnail")
+
+            if not thumbnail_selector:
+                logger.info(f"{self.log_prefix}未配置缩略图选择器，等待页面稳定（最多{timeout/1000:.0f}秒）...")
+                wait_for_dom_settled(self.page, quiet_ms=1500, timeout=timeout)
+                return
+
+            loading_selector = self._optional_selector("basic_elements.image_upload_loading")
+            logger.info(f"{self.log_prefix}等待 {image_count} 张图片上传到服务器（最多{timeout/1000:.0f}秒）...")
+            if wait_for_element_count(self.page, thumbnail_selector, image_count, timeout=timeout,
+                                      absent_selector=loading_selector):
+                logger.info(f"{self.log_prefix}✅ 图片上传完成")
+            else:
+                logger.warning(f"{self.log_prefix}⚠️ 未在{timeout/1000:.0f}秒内检测到全部图片上传完成，继续执行")
+        finally:
+            remaining = self._image_upload_min_wait() - (time.time() - start) * 1000
+            if remaining > 0:
+                self.page.wait_for_timeout(remaining)
+
+    def _optional_selector(self, element_key: str) -> Optional[str]:
+        """获取可选元素的选择器，未配置时返回None（不记录找不到选择器的警告）"""
+        entry = self.safe_actions.css_manager.regional_loader.get_entry(self.region, self.category, element_key)
+        return entry.primary if entry else None
+
+    def _image_upload_min_wait(self) -> int:
+        """图片上传的最短等待时间（毫秒），完成信号不可靠时的兜底"""
+        return int(self.config.navigation_timeouts.get("image_upload_min_wait", 3000))
+    
+    def _select_service_category(self, search_keyword: str):
+        """
+        选择服务类目
+
+        Args:
+            search_keyword: 服务类目搜索关键词（流程定义 keywords.service，按界面语言选择）
+        """
         # 选择类目
         self.safe_actions.safe_click_with_config(
             "category_selection.service_category_selector", self.region, must_exist=True,
             operation="选择服务类目"
         )
         
-        # 根据地域选择搜索关键词
-        search_keyword = self._get_service_search_keyword()
-        
         # 输入搜索关键词
         self.safe_actions.safe_input_with_config(
             "category_selection.category_search_input", search_keyword, self.region, must_exist=True,
@@ -570,58 +709,26 @@ class BaseUploader:
         )
         
         # 等待出现搜索结果
-        self.page.wait_for_timeout(2000)
+        wait_for_dom_settled(self.page)
         
         # 点击服务
         self.safe_actions.safe_click_with_config(
             "category_selection.service_category_option", self.region, must_exist=True,
             operation="选择服务类目选项"
         )
-        
-    def _get_service_search_keyword(self) -> str:
-        """
-        根据按钮文本或地域获取服务类目搜索关键词
-        
-        Returns:
-            str: 搜索关键词
-        """
-        # 优先根据按钮文本判断语言
-        if self.sell_button_text == "賣嘢":
-            keyword = "其他"
-        elif self.sell_button_text == "Sell":
-            keyword = "others"
-        else:
-            # 备用方案：根据地区判断
-            keyword = "其他" if self.region == "HK" else "others"
-        
-        logger.info(f"使用服务搜索关键词: '{keyword}' (按钮文本: '{self.sell_button_text}', 地区: {self.region})")
-        return keyword
     
     def _fill_basic_info(self, enriched_info: ProductInfo):
-        """填写基本信息"""
-        # 输入产品标题
-        self.safe_actions.safe_input_with_config(
-            "product_info.title_input", enriched_info.title, self.region, must_exist=True,
-            operation="输入产品标题"
+        """填写基本信息（标题、价格、描述一次设置值，节奏档位要求时逐字输入）"""
+        self.safe_actions.safe_fill_with_config(
+            {
+                "product_info.title_input": enriched_info.title,
+                "product_info.price_input": enriched_info.price,
+                "product_info.description_input": enriched_info.description,
+            },
+            self.region, must_exist=True,
+            operation="填写基本信息"
         )
 
-        if self.region == "HK":
-            self.safe_actions.safe_click_with_config(
-                "sneakers_specific.condition_selector", self.region, must_exist=True,
-                operation="点击新旧程度选择"
-            )
-      
-        # 输入产品价格
-        self.safe_actions.safe_input_with_config(
-            "product_info.price_input", enriched_info.price, self.region, must_exist=True,
-            operation="输入产品价格"
-        )
-        
-        # 输入产品描述
-        self.safe_actions.safe_input_with_config(
-            "product_info.description_input", enriched_info.description, self.region, must_exist=True,
-            operation="输入产品描述")
-
     def _handle_ai_writing_operations(self):
         """处理AI文案相关操作 - 使用文字匹配点击"""
         logger.info(f"{self.log_prefix}开始处理AI文案相关操作")
@@ -649,7 +756,7 @@ class BaseUploader:
             "basic_elements.location_selector", self.region, must_exist=True,
             operation="点击选择Location"
         )
-        self.page.wait_for_timeout(2000)
+        wait_for_dom_settled(self.page)
         
         # 选择面交地点
         self.safe_actions.safe_click_with_config(
@@ -723,15 +830,10 @@ class BaseUploader:
         
     # ========= 公共方法：编辑模式 =========
     def _enter_edit_mode(self):
-        """进入编辑模式"""
+        """进入编辑模式（从中断处继续时商品页面已由 _prepare_resume 打开）"""
 
         # 点击成功跳服务的产品
-        self.safe_actions.safe_click_with_config(
-            "editing.inactive_image", self.region, must_exist=True,
-            operation="点击成功跳服务的产品"
-        )
-
-        self.page.wait_for_timeout(2000)
+        self._click_inactive_product()
         
         # 编辑
         self.safe_actions.safe_click_with_config(
@@ -784,13 +886,16 @@ class BaseUploader:
             self.page.wait_for_timeout(500)  # 至少等待0.5秒
 
     def _click_inactive_product(self):
-        """点击未激活的商品"""
+        """点击未激活的商品（从中断处继续时已打开本SKU的商品，不再点击）"""
+        if self._own_listing_opened:
+            self._own_listing_opened = False
+            return
         logger.info(f"{self.log_prefix}🎯 点击未激活的商品")
         self.safe_actions.safe_click_with_config(
             "editing.inactive_image", self.region, must_exist=True,
             operation="点击成功跳服务的产品"
         )
-        self.page.wait_for_timeout(2000)
+        wait_for_dom_settled(self.page)
 
     def _click_activate_button(self):
         """点击激活按钮并等待激活完成"""
@@ -862,7 +967,7 @@ class BaseUploader:
                 if attempt < max_retries - 1:
                     logger.info(f"刷新页面后重试...")
                     self.page.reload(wait_until="domcontentloaded")
-                    self.page.wait_for_timeout(2000)
+                    wait_for_dom_settled(self.page)
                 else:
                     logger.error(f"多次重试后仍失败，放弃点击{category_name}")
                     raise
@@ -912,22 +1017,12 @@ class BaseUploader:
                     logger.info(f"{self.log_prefix}激活按钮已消失，激活可能完成")
                     return True
                 
-                # 获取当前按钮文字
-                current_text = element.text_content().strip() if element else ""
-                
-                # 如果文字发生变化，记录日志
+                # 获取当前按钮文字，判断是否已变化
+                current_text = (element.text_content() or "").strip()
                 if current_text != last_text:
                     logger.info(f"{self.log_prefix}按钮文字变化: '{last_text}' -> '{current_text}'")
                     last_text = current_text
-                
-                # 如果提供了初始文字，检查是否已从初始文字改变
-                if initial_text and current_text != initial_text:
-                    logger.info(f"{self.log_prefix}激活完成，按钮文字已从初始文字改变: '{initial_text}' -> '{current_text}'")
-                    return True
-                
-                # 如果没有提供初始文字，使用默认逻辑（按钮文字不再是 "Mark as active"）
-                if not initial_text and current_text and current_text != "Mark as active":
-                    logger.info(f"{self.log_prefix}激活完成，按钮文字变为: '{current_text}'")
+                if self._activation_text_done(initial_text, current_text):
                     return True
                 
                 # 检查是否按钮变为不可用状态（表示激活完成）
@@ -935,29 +1030,36 @@ class BaseUploader:
                     logger.info(f"{self.log_prefix}按钮变为禁用状态，激活完成")
                     return True
                 
-                # 等待一段时间后再次检查
-                self.page.wait_for_timeout(1000)
+                # 等待页面下一次变化（最多1秒）后再次检查
+                wait_for_dom_change(self.page, timeout=1000)
                 
             except Exception as e:
                 logger.warning(f"{self.log_prefix}检查激活状态时出错: {e}")
                 self.page.wait_for_timeout(1000)
         
-        # 超时处理
-        try:
-            element = self.page.query_selector(selector)
-            if element:
-                current_text = element.text_content().strip() if element else ""
-                error_msg = f"等待激活完成超时: {selector}, 当前文字: '{current_text}', 超时时间: {timeout}ms"
-            else:
-                error_msg = f"等待激活完成超时: {selector}, 按钮已消失, 超时时间: {timeout}ms"
-        except Exception as e:
-            error_msg = f"等待激活完成超时: {selector}, 超时时间: {timeout}ms, 错误: {e}"
+        raise self._activation_timeout(selector, last_text, timeout)
+    
+    def _activation_text_done(self, initial_text: Optional[str], current_text: str) -> bool:
+        """
+        按钮文字是否表示激活完成：已从初始文字改变；没有初始文字时不再是 "Mark as active"
+        """
+        # 如果提供了初始文字，检查是否已从初始文字改变
+        if initial_text and current_text != initial_text:
+            logger.info(f"{self.log_prefix}激活完成，按钮文字已从初始文字改变: '{initial_text}' -> '{current_text}'")
+            return True
         
+        # 如果没有提供初始文字，使用默认逻辑（按钮文字不再是 "Mark as active"）
+        if not initial_text and current_text and current_text != "Mark as active":
+            logger.info(f"{self.log_prefix}激活完成，按钮文字变为: '{current_text}'")
+            return True
+        return False
+    
+    def _activation_timeout(self, selector: str, last_text: str, timeout: int) -> CriticalOperationFailed:
+        error_msg = f"等待激活完成超时: {selector}, 最后文字: '{last_text}', 超时时间: {timeout}ms"
         if self.browser_id and self.sku:
             error_msg = f"BrowserID: {self.browser_id}, SKU: {self.sku}, {error_msg}"
-        
         logger.error(error_msg)
-        raise CriticalOperationFailed(error_msg)
+        return CriticalOperationFailed(error_msg)
     
     def _wait_for_button_text_change(self, selector: str, initial_text: str = None, expected_texts: list = None, timeout: int = 60000):
         """
@@ -1000,8 +1102,8 @@ class BaseUploader:
                     logger.info(f"{self.log_prefix}按钮文字已达到期望文字: '{current_text}'")
                     return True
                 
-                # 等待一段时间后再次检查
-                self.page.wait_for_timeout(1000)
+                # 等待页面下一次变化（最多1秒）后再次检查
+                wait_for_dom_change(self.page, timeout=1000)
                 
             except Exception as e:
                 logger.warning(f"{self.log_prefix}检查按钮文字变化时出错: {e}")
@@ -0,0 +1,204 @@
+"""
+流程驱动的上传器 - 按 flow.yaml 声明的步骤图执行上传
+新增 地域/类目 组合只需提供 css_selectors.yaml 和 flow.yaml，无需编写上传器类
+"""
+import inspect
+import time
+from typing import Any, Dict, Optional
+from core.models import ProductInfo
+from core.logger import logger
+from browser.waits import wait_for_dom_settled
+from browser.async_waits import wait_for_dom_settled as wait_for_dom_settled_async
+from .base_uploader import BaseUploader
+from .async_base_uploader import AsyncBaseUploader
+from .step_graph import (
+    StepGraph, FlowStep, FlowAction, StepGraphError,
+    evaluate_condition, render_value, load_step_graph
+)
+
+MALE_GENDERS = ("male", "men", "mens")
+
+
+class FlowUploader(BaseUploader):
+    """
+    流程驱动的上传器
+
+    每个步骤经 _step 执行：已提交的步骤跳过、耗时写入步骤日志、中断后从最后一个 durable 步骤之后继续
+    """
+
+    def upload_product(self, product_info: ProductInfo, folder_path: str = None, category: str = None) -> bool:
+        """
+        按流程定义上传商品
+
+        Args:
+            product_info: 商品信息
+            folder_path: 图片文件夹路径
+            category: 商品类目（由创建上传器时的类目决定，保留参数以兼容调用方）
+
+        Returns:
+            bool: 上传是否成功
+        """
+        try:
+            graph = load_step_graph(self.region, self.category)
+            logger.info(f"使用上传流程: {graph.description or f'{self.region}-{self.category}'}")
+
+            enriched_info = self._open_journal(product_info, graph.durable_steps)
+            for step in graph.steps:
+                self._run_flow_step(graph, step, enriched_info, folder_path)
+            self._finish_journal()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"{self.region}-{self.category} 上传流程执行失败: {e}")
+            return False
+
+    def _run_flow_step(self, graph: StepGraph, step: FlowStep, enriched_info: ProductInfo, folder_path: str):
+        """执行一个步骤（条件不满足时跳过）"""
+        if not evaluate_condition(step.when, self._flow_context(graph, enriched_info, folder_path)):
+            logger.debug(f"{self.log_prefix}步骤 {step.id} 条件不满足（{step.when}），跳过")
+            return
+        self._step(step.id, self._run_flow_actions, graph, step, enriched_info, folder_path)
+
+    def _run_flow_actions(self, graph: StepGraph, step: FlowStep, enriched_info: ProductInfo, folder_path: str):
+        if step.description:
+            logger.info(f"{self.log_prefix}▶️ {step.description}")
+        start = time.time()
+        for action in step.actions:
+            # 每个动作前重新生成上下文：界面语言（关键词）在上传图片步骤中才确定
+            context = self._flow_context(graph, enriched_info, folder_path)
+            if not evaluate_condition(action.when, context):
+                continue
+            self._run_flow_action(step, action, context)
+        logger.debug(f"{self.log_prefix}步骤 {step.id} 完成，耗时 {time.time() - start:.2f}秒")
+
+    def _run_flow_action(self, step: FlowStep, action: FlowAction, context: Dict[str, Any]):
+        """执行单个动作"""
+        if action.type == "click":
+            self.safe_actions.safe_click_with_config(action.target, self.region, **self._flow_action_options(step, action))
+        elif action.type == "input":
+            text = str(render_value(action.value, context))
+            self.safe_actions.safe_input_with_config(action.target, text, self.region, **self._flow_action_options(step, action))
+        elif action.type == "fill":
+            fields = {key: render_value(value, context) for key, value in action.target.items()}
+            self.safe_actions.safe_fill_with_config(fields, self.region, typed=action.typed, **self._flow_action_options(step, action))
+        elif action.type == "settle":
+            wait_for_dom_settled(self.page)
+        elif action.type == "wait_load":
+            self._flow_wait_load(action)
+        elif action.type == "call":
+            self._flow_method(action.target)(*[render_value(arg, context) for arg in action.args])
+
+    def _flow_wait_load(self, action: FlowAction):
+        """等待页面加载状态，超时只记录警告（前面的操作已完成）"""
+        state = action.target if isinstance(action.target, str) else "networkidle"
+        try:
+            self.page.wait_for_load_state(state, timeout=self._flow_timeout(action.timeout))
+            logger.info("✅ 页面网络活动已结束")
+        except Exception as e:
+            logger.warning(f"⚠️ 等待页面网络活动结束超时: {e}")
+            logger.info("✅ 继续执行后续流程")
+
+    # ========= 同步/异步共用 =========
+    def _flow_context(self, graph: StepGraph, enriched_info: ProductInfo, folder_path: str) -> Dict[str, Any]:
+        """
+        动作参数模板和 when 条件可用的上下文：
+        商品字段（title、brand、size ...）、product、folder_path、region、male、keyword_<名称>
+        """
+        context: Dict[str, Any] = dict(enriched_info._asdict())
+        context.update(
+            product=enriched_info,
+            folder_path=folder_path,
+            region=self.region,
+            sell_button_text=self.sell_button_text,
+            male=(enriched_info.gender or "").lower() in MALE_GENDERS,
+        )
+        for name in graph.keywords:
+            context[f"keyword_{name}"] = graph.keyword(name, self.sell_button_text)
+        return context
+
+    def _flow_action_options(self, step: FlowStep, action: FlowAction) -> Dict[str, Any]:
+        """点击/输入/批量填写动作的参数，未设置的沿用步骤的 must_exist / timeout"""
+        options: Dict[str, Any] = {
+            "must_exist": step.must_exist if action.must_exist is None else action.must_exist,
+            "timeout": self._flow_timeout(action.timeout if action.timeout is not None else step.timeout),
+        }
+        if action.operation:
+            options["operation"] = action.operation
+        return options
+
+    def _flow_timeout(self, value: Any) -> Optional[int]:
+        """超时时间：毫秒数，或 {config: navigation_timeouts中的键, default: 默认毫秒数}"""
+        if isinstance(value, dict):
+            return int(self.config.navigation_timeouts.get(value.get("config"), value.get("default")))
+        return int(value) if value is not None else None
+
+    def _flow_method(self, name: str):
+        method = getattr(self, name, None)
+        if not callable(method):
+            raise StepGraphError(f"上传器没有方法: {name}")
+        return method
+
+
+class AsyncFlowUploader(AsyncBaseUploader, FlowUploader):
+    """流程驱动的上传器（异步版本），与 FlowUploader 执行同一份流程定义"""
+
+    async def upload_product(self, product_info: ProductInfo, folder_path: str = None, category: str = None) -> bool:
+        """按流程定义上传商品"""
+        try:
+            graph = load_step_graph(self.region, self.category)
+            logger.info(f"使用上传流程（异步）: {graph.description or f'{self.region}-{self.category}'}")
+
+            enriched_info = self._open_journal(product_info, graph.durable_steps)
+            for step in graph.steps:
+                await self._run_flow_step(graph, step, enriched_info, folder_path)
+            self._finish_journal()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"{self.region}-{self.category} 上传流程执行失败: {e}")
+            return False
+
+    async def _run_flow_step(self, graph: StepGraph, step: FlowStep, enriched_info: ProductInfo, folder_path: str):
+        if not evaluate_condition(step.when, self._flow_context(graph, enriched_info, folder_path)):
+            logger.debug(f"{self.log_prefix}步骤 {step.id} 条件不满足（{step.when}），跳过")
+            return
+        await self._step(step.id, self._run_flow_actions, graph, step, enriched_info, folder_path)
+
+    async def _run_flow_actions(self, graph: StepGraph, step: FlowStep, enriched_info: ProductInfo, folder_path: str):
+        if step.description:
+            logger.info(f"{self.log_prefix}▶️ {step.description}")
+        start = time.time()
+        for action in step.actions:
+            context = self._flow_context(graph, enriched_info, folder_path)
+            if not evaluate_condition(action.when, context):
+                continue
+            await self._run_flow_action(step, action, context)
+        logger.debug(f"{self.log_prefix}步骤 {step.id} 完成，耗时 {time.time() - start:.2f}秒")
+
+    async def _run_flow_action(self, step: FlowStep, action: FlowAction, context: Dict[str, Any]):
+        if action.type == "click":
+            await self.safe_actions.safe_click_with_config(action.target, self.region, **self._flow_action_options(step, action))
+        elif action.type == "input":
+            text = str(render_value(action.value, context))
+            await self.safe_actions.safe_input_with_config(action.target, text, self.region, **self._flow_action_options(step, action))
+        elif action.type == "fill":
+            fields = {key: render_value(value, context) for key, value in action.target.items()}
+            await self.safe_actions.safe_fill_with_config(fields, self.region, typed=action.typed, **self._flow_action_options(step, action))
+        elif action.type == "settle":
+            await wait_for_dom_settled_async(self.page)
+        elif action.type == "wait_load":
+            await self._flow_wait_load(action)
+        elif action.type == "call":
+            result = self._flow_method(action.target)(*[render_value(arg, context) for arg in action.args])
+            if inspect.isawaitable(result):
+                await result
+
+    async def _flow_wait_load(self, action: FlowAction):
+        state = action.target if isinstance(action.target, str) else "networkidle"
+        try:
+            await self.page.wait_for_load_state(state, timeout=self._flow_timeout(action.timeout))
+            logger.info("✅ 页面网络活动已结束")
+        except Exception as e:
+            logger.warning(f"⚠️ 等待页面网络活动结束超时: {e}")
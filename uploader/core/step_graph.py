@@ -0,0 +1,251 @@
+"""
+上传流程步骤图
+每个 地域/类目 的上传流程以 flow.yaml 声明（与 css_selectors.yaml 同目录），
+步骤带有依赖、超时和 must_exist 语义，由 FlowUploader 统一执行
+
+flow.yaml 字段：
+    metadata      region / category / description
+    keywords      按界面语言（Sell按钮文本）选择的搜索关键词，无法识别时使用 default
+    steps         步骤列表，每个步骤：
+        id          步骤名称（写入步骤日志）
+        after       依赖的步骤，未声明依赖关系的步骤按书写顺序执行
+        durable     结果保存在服务器上的步骤，程序中断后重新运行时从最后一个 durable 步骤之后继续
+        must_exist  步骤内点击/输入动作的默认值（元素不存在时中止上传），默认 true
+        timeout     步骤内点击/输入动作的默认超时时间（毫秒）
+        when        执行条件，如 male / not male
+        call/args   只调用一个上传器方法的步骤
+        actions     动作列表：click / input（value）/ fill（元素键名 -> 值，一次设置；typed 列出需逐字输入的字段）/
+                    settle / wait_load / call（args）
+
+模板变量：商品字段（{brand}、{size} ...）、{product}、{folder_path}、{keyword_<名称>}
+"""
+
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import yaml
+from core.logger import logger
+
+# 步骤动作类型：每个动作是只含其中一个键的字典（附加 operation / value / when 等参数）
+ACTION_TYPES = ("click", "input", "fill", "settle", "wait_load", "call")
+
+
+class StepGraphError(ValueError):
+    """流程定义无效（未知依赖、循环依赖、未知动作等）"""
+
+
+@dataclass
+class FlowAction:
+    """步骤中的单个动作"""
+    type: str
+    target: Any = None                 # click/input: 元素键名; fill: 元素键名 -> 值模板; call: 上传器方法名; wait_load: 加载状态
+    value: Optional[str] = None        # input: 输入值模板，如 "{brand}"
+    args: List[Any] = field(default_factory=list)  # call: 参数模板
+    typed: List[str] = field(default_factory=list)  # fill: 需要逐字输入的元素键名
+    operation: Optional[str] = None
+    must_exist: Optional[bool] = None  # None 表示沿用步骤的设置
+    timeout: Optional[int] = None      # None 表示沿用步骤的设置（毫秒）
+    when: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Any, step_id: str) -> "FlowAction":
+        if isinstance(data, str):
+            data = {data: True}
+        types = [key for key in ACTION_TYPES if key in data]
+        if len(types) != 1:
+            raise StepGraphError(f"步骤 {step_id} 的动作必须且只能包含 {ACTION_TYPES} 之一: {data}")
+        action_type = types[0]
+        if action_type == "fill" and not isinstance(data[action_type], dict):
+            raise StepGraphError(f"步骤 {step_id} 的 fill 动作必须是 元素键名 -> 值 的映射: {data}")
+        return cls(
+            type=action_type,
+            target=data[action_type],
+            value=data.get("value"),
+            args=list(data.get("args", []) or []),
+            typed=list(data.get("typed", []) or []),
+            operation=data.get("operation"),
+            must_exist=data.get("must_exist"),
+            timeout=data.get("timeout"),
+            when=data.get("when"),
+        )
+
+
+@dataclass
+class FlowStep:
+    """
+    流程中的一个步骤（步骤日志的提交单位）
+
+    durable 表示步骤结果保存在服务器上（如发布），程序中断后重新运行时从最后一个 durable 步骤之后继续
+    """
+    id: str
+    actions: List[FlowAction]
+    after: List[str] = field(default_factory=list)
+    description: Optional[str] = None
+    durable: bool = False
+    must_exist: bool = True
+    timeout: Optional[int] = None
+    when: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FlowStep":
+        step_id = data.get("id")
+        if not step_id:
+            raise StepGraphError(f"步骤缺少id: {data}")
+
+        if "call" in data:
+            # 只调用一个上传器方法的步骤可直接写 call / args
+            actions = [FlowAction.from_dict({"call": data["call"], "args": data.get("args", [])}, step_id)]
+        else:
+            actions = [FlowAction.from_dict(action, step_id) for action in data.get("actions", []) or []]
+        if not actions:
+            raise StepGraphError(f"步骤 {step_id} 没有任何动作")
+
+        return cls(
+            id=step_id,
+            actions=actions,
+            after=list(data.get("after", []) or []),
+            description=data.get("description"),
+            durable=bool(data.get("durable", False)),
+            must_exist=bool(data.get("must_exist", True)),
+            timeout=data.get("timeout"),
+            when=data.get("when"),
+        )
+
+
+@dataclass
+class StepGraph:
+    """一个 地域/类目 的完整上传流程"""
+    region: str
+    category: str
+    steps: List[FlowStep]
+    keywords: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    description: Optional[str] = None
+
+    @property
+    def durable_steps(self) -> tuple:
+        return tuple(step.id for step in self.steps if step.durable)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StepGraph":
+        metadata = data.get("metadata", {}) or {}
+        steps = [FlowStep.from_dict(step) for step in data.get("steps", []) or []]
+        if not steps:
+            raise StepGraphError("流程定义中没有步骤")
+        return cls(
+            region=str(metadata.get("region", "")).upper(),
+            category=str(metadata.get("category", "")).lower(),
+            steps=cls._order(steps),
+            keywords=data.get("keywords", {}) or {},
+            description=metadata.get("description"),
+        )
+
+    @staticmethod
+    def _order(steps: List[FlowStep]) -> List[FlowStep]:
+        """
+        按依赖关系排序（拓扑排序），没有依赖约束的步骤保持声明顺序
+
+        Raises:
+            StepGraphError: 重复的步骤id、未知依赖或循环依赖
+        """
+        by_id: Dict[str, FlowStep] = {}
+        for step in steps:
+            if step.id in by_id:
+                raise StepGraphError(f"重复的步骤id: {step.id}")
+            by_id[step.id] = step
+        for step in steps:
+            unknown = [dep for dep in step.after if dep not in by_id]
+            if unknown:
+                raise StepGraphError(f"步骤 {step.id} 依赖未知步骤: {unknown}")
+
+        ordered: List[FlowStep] = []
+        done = set()
+        remaining = list(steps)
+        while remaining:
+            ready = next((step for step in remaining if all(dep in done for dep in step.after)), None)
+            if ready is None:
+                raise StepGraphError(f"步骤存在循环依赖: {[step.id for step in remaining]}")
+            ordered.append(ready)
+            done.add(ready.id)
+            remaining.remove(ready)
+        return ordered
+
+    def keyword(self, name: str, sell_button_text: Optional[str]) -> str:
+        """按界面语言（Sell按钮文本）取搜索关键词，无法识别时使用 default"""
+        options = self.keywords.get(name, {}) or {}
+        return str(options.get(sell_button_text, options.get("default", "")))
+
+
+def evaluate_condition(condition: Optional[str], context: Dict[str, Any]) -> bool:
+    """
+    计算 when 条件：上下文中的布尔值名称，可加 not 前缀，如 "male" / "not male"
+
+    未设置条件时返回True
+    """
+    if not condition:
+        return True
+    condition = condition.strip()
+    if condition.startswith("not "):
+        return not evaluate_condition(condition[4:], context)
+    return bool(context.get(condition))
+
+
+def render_value(template: Any, context: Dict[str, Any]) -> Any:
+    """
+    渲染参数模板：整段为 "{name}" 时直接返回上下文中的原始值（可为对象或None），否则按字符串格式化
+    """
+    if not isinstance(template, str):
+        return template
+    stripped = template.strip()
+    if stripped.startswith("{") and stripped.endswith("}") and stripped.count("{") == 1:
+        return context.get(stripped[1:-1])
+    return template.format_map(context)
+
+
+# ========= 流程文件加载 =========
+def _flow_file_path(region: str, category: str) -> Optional[Path]:
+    """获取流程文件路径，打包后优先使用可执行文件同目录下的外部配置（与CSS选择器配置相同）"""
+    relative = Path("uploader") / "regions" / region.lower() / category.lower() / "flow.yaml"
+    if getattr(sys, 'frozen', False):
+        candidates = [Path(sys.executable).parent / relative, Path(sys._MEIPASS) / relative]
+    else:
+        candidates = [relative]
+    for path in candidates:
+        if path.exists():
+            return path
+    return None
+
+
+_graph_cache: Dict[Path, tuple] = {}
+_graph_cache_lock = threading.Lock()
+
+def has_step_graph(region: str, category: str) -> bool:
+    """指定 地域/类目 是否有流程定义"""
+    return _flow_file_path(region, category) is not None
+
+
+def load_step_graph(region: str, category: str) -> StepGraph:
+    """
+    加载指定 地域/类目 的流程定义（文件未修改时复用已解析的结果）
+
+    Raises:
+        StepGraphError: 流程文件不存在或定义无效
+    """
+    path = _flow_file_path(region, category)
+    if path is None:
+        raise StepGraphError(f"未找到上传流程定义: {region.lower()}/{category.lower()}/flow.yaml")
+
+    mtime = path.stat().st_mtime
+    with _graph_cache_lock:
+        cached = _graph_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        graph = StepGraph.from_dict(yaml.safe_load(f) or {})
+    logger.info(f"已加载上传流程: {path}（{len(graph.steps)} 个步骤）")
+
+    with _graph_cache_lock:
+        _graph_cache[path] = (mtime, graph)
+    return graph
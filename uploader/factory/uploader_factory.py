@@ -31,9 +31,11 @@ class UploaderFactory:
             
             logger.info(f"正在创建上传器: {region}-{category}")
             
-            # 导入模块
-            module = __import__(module_name, fromlist=[class_name])
-            uploader_class = getattr(module, class_name)
+            # 导入模块（没有上传器类但有流程定义时使用流程驱动的上传器）
+            uploader_class = UploaderFactory._find_uploader_class(region, category, module_name, class_name)
+            if uploader_class is None:
+                from uploader.core.flow_uploader import FlowUploader
+                uploader_class = FlowUploader
             
             # 创建实例，传递 category 参数
             uploader = uploader_class(page, config, region, browser_id, sku, category)
@@ -51,6 +53,50 @@ class UploaderFactory:
             logger.error(f"❌ 创建上传器失败: {region}-{category}, 错误: {e}")
             raise
     
+    @staticmethod
+    def create_async_uploader(region: str, category: str, page, config,
+                              browser_id: str = None, sku: str = None):
+        """
+        创建异步上传器实例（page 为 playwright.async_api 的页面对象）
+        
+        异步上传器与同步上传器位于同一模块，类名以 Async 开头，如 AsyncHKSneakersUploader
+        """
+        module_name = f"uploader.regions.{region.lower()}.{category}.{category}_uploader"
+        class_name = f"Async{region.upper()}{category.capitalize()}Uploader"
+        
+        logger.info(f"正在创建异步上传器: {region}-{category}")
+        try:
+            uploader_class = UploaderFactory._find_uploader_class(region, category, module_name, class_name)
+            if uploader_class is None:
+                from uploader.core.flow_uploader import AsyncFlowUploader
+                uploader_class = AsyncFlowUploader
+        except ImportError as e:
+            logger.error(f"❌ 导入上传器失败: {region}-{category}, 错误: {e}")
+            raise ValueError(f"不支持的地域-类目组合: {region}-{category}")
+        except AttributeError as e:
+            logger.error(f"❌ 找不到异步上传器类: {class_name}, 错误: {e}")
+            raise ValueError(f"找不到对应的异步上传器类: {class_name}")
+        
+        return uploader_class(page, config, region, browser_id, sku, category)
+    
+    @staticmethod
+    def _find_uploader_class(region: str, category: str, module_name: str, class_name: str):
+        """
+        查找地域/类目上传器类
+
+        模块或类不存在、但该地域/类目有流程定义（flow.yaml）时返回None，由调用方使用流程驱动的上传器；
+        两者都没有时抛出原始的 ImportError / AttributeError
+        """
+        from uploader.core.step_graph import has_step_graph
+        try:
+            module = __import__(module_name, fromlist=[class_name])
+            return getattr(module, class_name)
+        except (ImportError, AttributeError):
+            if has_step_graph(region, category):
+                logger.info(f"未找到上传器类 {class_name}，使用流程定义: {region.lower()}/{category}/flow.yaml")
+                return None
+            raise
+    
     @staticmethod
     def get_supported_combinations() -> list:
         """
@@ -4,7 +4,14 @@
 """
 
 from .multi_account_uploader import MultiAccountUploader
+from .async_runner import AsyncUploadRunner
+from .process_pool import ProcessPoolRunner
+from .distributed import DistributedCoordinator, DistributedWorker
 
 __all__ = [
     'MultiAccountUploader',
+    'AsyncUploadRunner',
+    'ProcessPoolRunner',
+    'DistributedCoordinator',
+    'DistributedWorker',
 ]
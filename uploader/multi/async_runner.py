@@ -0,0 +1,246 @@
+"""
+异步上传执行器 - 单线程事件循环中同时驱动多个浏览器
+每个BrowserID一个协程，组内按Excel顺序执行，同时运行的浏览器数量由 max_workers 限制
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from browser.async_browser_interface import AsyncBrowserInterface
+from browser.browser import get_browser_interface_instance
+from core.logger import logger
+from core.models import ProductRecord
+from ..actions.enhanced_safe_actions import is_unattended_mode
+from ..factory.uploader_factory import UploaderFactory
+from ..utils.ip_validator import IPValidator, IP_MISMATCH_ERROR
+from ..utils.ip_verdict_cache import get_ip_verdict_cache, proxy_fingerprint_for
+
+
+class AsyncSession:
+    """已启动并通过IP地域校验的浏览器会话（异步版本）"""
+
+    def __init__(self, browser_id: str, profile_id: str, browser: Any, page: Any):
+        self.browser_id = browser_id
+        self.profile_id = profile_id
+        self.browser = browser
+        self.page = page
+        self.listings = 0  # 已在该会话中处理的商品数
+
+    def is_alive(self) -> bool:
+        """浏览器连接和页面是否仍然可用"""
+        try:
+            return self.browser.is_connected() and not self.page.is_closed()
+        except Exception:
+            return False
+
+
+class AsyncUploadRunner:
+    """
+    异步上传执行器
+
+    商品信息生成、成功记录和结果日志沿用 MultiAccountUploader 的实现，
+    只把浏览器启动、IP校验和页面操作换成协程
+    """
+
+    def __init__(self, owner, browser_windows: Dict[int, Dict[str, str]]):
+        """
+        Args:
+            owner: 发起本次上传的 MultiAccountUploader
+            browser_windows: 浏览器窗口映射表
+        """
+        self.owner = owner
+        self.browser_windows = browser_windows
+        self.interface: Optional[AsyncBrowserInterface] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def run(self, products_data: List[ProductRecord]) -> List[Dict[str, Any]]:
+        """在新的事件循环中执行全部商品的上传，结果按Excel原始顺序返回"""
+        return asyncio.run(self._run(products_data))
+
+    async def _run(self, products_data: List[ProductRecord]) -> List[Dict[str, Any]]:
+        total = len(products_data)
+        groups = self.owner._group_products_by_browser_id(products_data)
+        worker_count = min(self.owner.max_workers, len(groups))
+
+        logger.info(f"开始异步执行 {total} 个商品的上传: {len(groups)} 个BrowserID, 最多 {worker_count} 个浏览器同时运行")
+        if not is_unattended_mode():
+            logger.warning("⚠️ 异步模式下建议使用无人值守模式，多个浏览器请求输入CSS选择器时需依次处理")
+
+        self._semaphore = asyncio.Semaphore(worker_count)
+        self.interface = await AsyncBrowserInterface(get_browser_interface_instance()).start()
+        try:
+            group_results = await asyncio.gather(
+                *(self._upload_browser_group(group, total) for group in groups.values()),
+                return_exceptions=True
+            )
+        finally:
+            await self.interface.stop()
+
+        indexed_results = []
+        for (browser_id, group), group_result in zip(groups.items(), group_results):
+            if isinstance(group_result, BaseException):
+                # 单个协程异常不影响其他BrowserID，该组商品记为失败
+                logger.error(f"BrowserID {browser_id} 的上传协程异常退出: {group_result}")
+                indexed_results.extend(
+                    (index, {
+                        'browser_id': browser_id,
+                        'sku': product_data.sku,
+                        'success': False,
+                        'error': f"上传协程异常: {group_result}"
+                    })
+                    for index, product_data in group
+                )
+            else:
+                indexed_results.extend(group_result)
+
+        # 按Excel原始顺序排列结果
+        indexed_results.sort(key=lambda item: item[0])
+        results = [result for _, result in indexed_results]
+
+        logger.info(f"异步上传完成，共处理 {len(results)} 个商品")
+        return results
+
+    async def _upload_browser_group(self, group: List[Tuple[int, ProductRecord]],
+                                    total: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        按顺序处理同一BrowserID下的全部商品，返回 (Excel序号, 结果) 列表
+
+        会话复用模式下整组共用一个浏览器会话，否则每个商品单独启动和关闭浏览器；
+        IP地域校验失败后不再启动该浏览器，组内剩余商品沿用同一错误记为失败
+        """
+        owner = self.owner
+        async with self._semaphore:
+            results = []
+            session = None
+            sku = None
+            rejected_error = None
+            try:
+                for index, product_data in group:
+                    browser_id = product_data.browser_id
+                    sku = product_data.sku
+                    logger.info(f"[{index}/{total}] 处理商品: {sku} (BrowserID: {browser_id})")
+
+                    # 浏览器被手动关闭或连接断开时重新启动
+                    if session is not None and not session.is_alive():
+                        logger.warning(f"⚠️ 浏览器 {browser_id} 会话已断开，重新启动")
+                        await self._close_session(session, sku)
+                        session = None
+
+                    if session is None:
+                        if rejected_error:
+                            failure = owner._ip_rejection(product_data, rejected_error)
+                        else:
+                            session, failure = await self._open_session(browser_id, sku)
+                            if failure and owner._is_ip_mismatch(failure):
+                                rejected_error = failure['error']
+                        if failure:
+                            results.append((index, failure))
+                            continue
+                    else:
+                        logger.info(f"♻️ 复用浏览器 {browser_id} 的会话（已处理 {session.listings} 个商品），跳过启动和IP校验")
+
+                    result, session_safe = await self._run_product_upload(session, product_data)
+                    session.listings += 1
+                    results.append((index, result))
+
+                    if not result['success']:
+                        # 上传失败可能由IP切换引起，下次打开该浏览器时强制重新校验
+                        get_ip_verdict_cache().invalidate(session.profile_id)
+
+                    if not owner.session_affinity or not session_safe:
+                        if owner.session_affinity:
+                            logger.warning(f"⚠️ 商品 {sku} 未成功完成，页面状态不可靠，关闭浏览器 {browser_id} 会话")
+                        await self._close_session(session, sku)
+                        session = None
+            finally:
+                # 组内商品全部处理完毕（或协程异常退出）时关闭会话
+                if session is not None:
+                    await self._close_session(session, sku)
+
+            return results
+
+    async def _run_product_upload(self, session: AsyncSession,
+                                  product_data: ProductRecord) -> Tuple[Dict[str, Any], bool]:
+        """在已就绪的浏览器页面上上传单个商品，返回 (上传结果, 会话是否可继续复用)"""
+        owner = self.owner
+        profile, product_info, folder_path = owner._prepare_product_upload(product_data)
+        try:
+            uploader = UploaderFactory.create_async_uploader(
+                owner.region, owner.category, session.page, owner.config,
+                product_data.browser_id, product_data.sku
+            )
+            success = await uploader.upload_product(product_info, folder_path, owner.category)
+            return owner._finish_product_upload(product_data, success, profile)
+        except Exception as e:
+            return owner._fail_product_upload(product_data, e)
+
+    async def _open_session(self, browser_id: str,
+                            sku: str) -> Tuple[Optional[AsyncSession], Optional[Dict[str, Any]]]:
+        """
+        启动浏览器并校验IP地域
+
+        Returns:
+            Tuple[Optional[AsyncSession], Optional[Dict[str, Any]]]: (会话, 失败结果)，两者只有一个不为None
+        """
+        region = self.owner.region
+        profile_id = None
+        browser = None
+        try:
+            profile_id = await self.interface.get_profile_id_by_browser_id(browser_id, self.browser_windows)
+            logger.info(f"启动浏览器 {browser_id} (profile_id: {profile_id})")
+            browser, page = await self.interface.start_browser(profile_id)
+
+            # 校验IP地域（缓存有效期内且代理未变化时沿用上次结果）
+            logger.info(f"正在校验浏览器 {browser_id} 的IP地域...")
+            is_region_match, actual_region, actual_ip = await IPValidator.cached_validate_async(
+                page, region, profile_id, proxy_fingerprint_for(browser_id, self.browser_windows)
+            )
+
+            if not is_region_match:
+                logger.error(f"❌ IP地域校验失败: 期望={region}, 实际={actual_region}, IP={actual_ip}")
+                logger.error(f"🚫 跳过浏览器 {browser_id} 的所有商品，关闭浏览器...")
+                await self._close_browser_quietly(profile_id, browser)
+                return None, {
+                    'browser_id': browser_id,
+                    'sku': sku,
+                    'success': False,
+                    'error': f'{IP_MISMATCH_ERROR}: 期望={region}, 实际={actual_region}, IP={actual_ip}'
+                }
+
+            logger.info(f"✅ IP地域校验通过: {actual_region}, IP={actual_ip}")
+            return AsyncSession(browser_id, profile_id, browser, page), None
+
+        except Exception as e:
+            logger.error(f"启动浏览器 {browser_id} 失败: {e}")
+            if profile_id:
+                await self._close_browser_quietly(profile_id, browser)
+            return None, {
+                'browser_id': browser_id,
+                'sku': sku,
+                'success': False,
+                'error': str(e)
+            }
+
+    async def _close_session(self, session: AsyncSession, sku: str) -> None:
+        """通过API关闭浏览器窗口并断开CDP连接"""
+        try:
+            close_success = await self.interface.close_browser(session.profile_id)
+            if close_success:
+                logger.info(f"✅ 商品 {sku} 处理完成，已通过API关闭浏览器 {session.browser_id} (profile_id: {session.profile_id})")
+            else:
+                logger.warning(f"⚠️ 商品 {sku} 处理完成，但API关闭浏览器失败 {session.browser_id} (profile_id: {session.profile_id})")
+
+            try:
+                await session.browser.close()
+            except Exception as e:
+                logger.debug(f"断开CDP连接时出错: {e}")
+
+        except Exception as e:
+            logger.error(f"关闭浏览器 {session.browser_id} 时出错: {e}")
+
+    async def _close_browser_quietly(self, profile_id: str, browser=None) -> None:
+        """关闭浏览器窗口和CDP连接，出错时只记录日志"""
+        try:
+            await self.interface.close_browser(profile_id)
+            if browser is not None:
+                await browser.close()
+        except Exception as close_error:
+            logger.warning(f"关闭浏览器时出错: {close_error}")
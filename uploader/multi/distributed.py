@@ -0,0 +1,293 @@
+"""
+分布式上传 - 协调进程发布任务，多台主机上的工作进程从共享队列领取BrowserID分组
+队列为放在共享存储上的 SQLite 文件（data.work_queue.WorkQueue），单机多进程同样可用
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from browser.browser import initialize_browser_interface, get_browser_windows_unified
+from core.config import load_config
+from core.logger import logger
+from core.models import ProductRecord, UploadConfig
+from data.work_queue import WorkQueue, ITEM_DONE, ITEM_UNKNOWN
+from ..actions.enhanced_safe_actions import set_unattended_mode
+
+# ========= 从配置文件加载参数 =========
+def _load_distributed_config():
+    """从配置文件加载分布式上传参数"""
+    defaults = {
+        "queue_file": ".cache/work_queue.db",
+        "lease_seconds": 300,
+        "heartbeat_interval": 60,
+        "poll_interval": 5,
+        "unclaimed_polls": 12,
+        "idle_timeout": 3600,
+        "max_attempts": 3,
+        "retry_backoff": 60,
+    }
+    try:
+        config = load_config()
+        execution_config = config.get("execution", {}) or {}
+        defaults.update(execution_config.get("distributed", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载execution.distributed配置失败，使用默认值: {e}")
+    return defaults
+
+_distributed_config = _load_distributed_config()
+QUEUE_FILE = _distributed_config["queue_file"]
+LEASE_SECONDS = float(_distributed_config["lease_seconds"])
+HEARTBEAT_INTERVAL = float(_distributed_config["heartbeat_interval"])
+POLL_INTERVAL = float(_distributed_config["poll_interval"])
+UNCLAIMED_POLLS = int(_distributed_config["unclaimed_polls"])
+IDLE_TIMEOUT = float(_distributed_config["idle_timeout"])
+MAX_ATTEMPTS = max(1, int(_distributed_config["max_attempts"]))
+RETRY_BACKOFF = float(_distributed_config["retry_backoff"])
+# 超过此时长没有领取或续约记录的工作进程视为离线
+WORKER_ALIVE_SECONDS = 3 * max(HEARTBEAT_INTERVAL, POLL_INTERVAL)
+
+
+class DistributedCoordinator:
+    """
+    分布式上传协调器
+
+    把待上传商品按BrowserID分组发布到共享队列，等待工作进程全部处理完毕后按Excel顺序汇总结果。
+    协调器本身不启动浏览器，期间定期回收过期租约（工作进程领取任务时也会回收）。
+    在线工作进程都没有某个BrowserID时，该任务连续 unclaimed_polls 次查询后记为失败；
+    超过 idle_timeout 秒没有任何进展（状态变化或续约）时中止本次上传。
+    """
+
+    def __init__(self, owner, queue_file: str = None):
+        """
+        Args:
+            owner: 发起本次上传的 MultiAccountUploader
+            queue_file: 共享队列文件路径，默认读取配置 execution.distributed.queue_file
+        """
+        self.owner = owner
+        self.queue = WorkQueue(queue_file or QUEUE_FILE, max_attempts=MAX_ATTEMPTS, retry_backoff=RETRY_BACKOFF)
+
+    def run(self, products_data: List[ProductRecord]) -> List[Dict[str, Any]]:
+        """发布任务并等待完成，结果按Excel原始顺序返回"""
+        owner = self.owner
+        groups = owner._group_products_by_browser_id(products_data)
+        run_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        self.queue.create_run(run_id, owner.excel_path, owner.region, owner.category, groups, len(products_data))
+        logger.info(f"🛰️ 等待工作进程处理 (队列: {self.queue.db_file}, run_id: {run_id})")
+
+        last_progress = None
+        orphan_polls: Dict[str, int] = {}
+        while not self.queue.is_run_finished(run_id):
+            self.queue.requeue_expired()
+            progress = self.queue.run_progress(run_id)
+            if progress != last_progress:
+                logger.info(f"📡 任务进度: {progress}")
+                last_progress = progress
+
+            self._fail_unclaimable(run_id, orphan_polls)
+            if IDLE_TIMEOUT > 0 and time.time() - self.queue.last_activity(run_id) > IDLE_TIMEOUT:
+                error = f"协调进程等待超时：{IDLE_TIMEOUT:.0f}秒内没有任何进展"
+                logger.error(f"⏰ {error}，中止本次上传")
+                self.queue.abort_run(run_id, error)
+                break
+            time.sleep(POLL_INTERVAL)
+
+        return self._collect_results(run_id)
+
+    def _fail_unclaimable(self, run_id: str, orphan_polls: Dict[str, int]) -> None:
+        """在线工作进程都没有其BrowserID的任务，连续 UNCLAIMED_POLLS 次后记为失败"""
+        orphaned = self.queue.orphaned_jobs(run_id, time.time() - WORKER_ALIVE_SECONDS)
+        orphaned_ids = {job_id for job_id, _ in orphaned}
+        for job_id in list(orphan_polls):
+            if job_id not in orphaned_ids:
+                del orphan_polls[job_id]
+
+        for job_id, browser_id in orphaned:
+            orphan_polls[job_id] = orphan_polls.get(job_id, 0) + 1
+            if orphan_polls[job_id] < UNCLAIMED_POLLS:
+                continue
+            error = f"没有工作进程拥有BrowserID {browser_id}"
+            if self.queue.fail_job(job_id, error):
+                logger.error(f"❌ {error}，该浏览器的商品记为失败")
+            del orphan_polls[job_id]
+
+    def _collect_results(self, run_id: str) -> List[Dict[str, Any]]:
+        """
+        按Excel顺序汇总各商品结果
+
+        其他主机上传成功的商品只写入了该主机的记录库，这里写入协调进程的记录库，重新运行时不会再次发布；
+        结果未知的商品以成功记录为准，不会重新上传
+        """
+        owner = self.owner
+        results = []
+        for _, browser_id, product_data, status, error in self.queue.run_items(run_id):
+            success = status == ITEM_DONE
+            if success:
+                owner.record_manager.record_success(owner.excel_path, owner.region, browser_id, product_data.sku)
+            elif status == ITEM_UNKNOWN and owner.record_manager.is_product_successful(
+                owner.excel_path, owner.region, browser_id, product_data.sku
+            ):
+                success, error = True, None
+            results.append({
+                'browser_id': browser_id,
+                'sku': product_data.sku,
+                'success': success,
+                'error': None if success else (error or '上传失败')
+            })
+
+        logger.info(f"分布式上传完成，共处理 {len(results)} 个商品")
+        return results
+
+
+class LeaseTracker:
+    """
+    单个任务的租约跟踪：后台线程定期续约，每个商品上传前确认租约并检查队列中的处理记录
+
+    传给 MultiAccountUploader._upload_browser_group 的 tracker
+    """
+
+    def __init__(self, queue: WorkQueue, job: Dict[str, Any], worker_id: str, uploader):
+        self.queue = queue
+        self.job_id = job["job_id"]
+        self.worker_id = worker_id
+        self.uploader = uploader
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+
+    def __enter__(self) -> "LeaseTracker":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id, LEASE_SECONDS):
+                    logger.warning(f"⚠️ 任务 {self.job_id} 的租约已被回收，当前商品完成后停止")
+                    self.lost.set()
+                    return
+            except Exception as e:
+                # 共享存储短暂不可用时继续重试，租约有效期内不影响上传
+                logger.warning(f"任务 {self.job_id} 续约失败: {e}")
+
+    def _result(self, product_data: ProductRecord, success: bool, error: Optional[str]) -> Dict[str, Any]:
+        return {
+            'browser_id': product_data.browser_id,
+            'sku': product_data.sku,
+            'success': success,
+            'error': error
+        }
+
+    def begin(self, index: int, product_data: ProductRecord) -> Optional[Dict[str, Any]]:
+        """上传前检查：返回None表示可以上传，否则返回该商品的结果且不上传"""
+        uploader = self.uploader
+        if self.lost.is_set():
+            return self._result(product_data, False, "租约已失效，交由其他工作进程处理")
+
+        # 按队列中的处理记录去重（本机成功记录看不到其他主机上传的商品），回看范围与成功记录一致
+        since = time.time() - uploader.record_manager.lookback_days * 86400
+        handled = self.queue.handled_status(self.job_id, index, product_data.sku, since)
+        if handled == ITEM_DONE:
+            logger.info(f"⏭️ 商品 {product_data.sku} 已由工作进程上传成功，跳过")
+            self.queue.skip_item(self.job_id, index, True)
+            return self._result(product_data, True, None)
+        if handled is not None:
+            error = "该商品已由其他工作进程开始上传（结果未知），为避免重复发布不再上传"
+            logger.warning(f"⚠️ 商品 {product_data.sku}: {error}")
+            self.queue.skip_item(self.job_id, index, False, error)
+            return self._result(product_data, False, error)
+
+        if not self.queue.begin_item(self.job_id, index, self.worker_id):
+            self.lost.set()
+            return self._result(product_data, False, "租约已失效，交由其他工作进程处理")
+        return None
+
+    def finish(self, index: int, product_data: ProductRecord, result: Dict[str, Any]) -> None:
+        self.queue.finish_item(self.job_id, index, self.worker_id, result['success'], result.get('error'))
+
+
+class DistributedWorker:
+    """
+    分布式上传工作进程
+
+    循环从共享队列领取任务（只领取本机指纹浏览器中存在的BrowserID），
+    用 MultiAccountUploader 的分组上传流程处理；成功记录写入本机记录库并写回队列，由协调进程汇总到其记录库
+    """
+
+    def __init__(self, config: UploadConfig, queue_file: str = None, worker_id: str = None):
+        self.config = config
+        self.queue = WorkQueue(queue_file or QUEUE_FILE, max_attempts=MAX_ATTEMPTS, retry_backoff=RETRY_BACKOFF)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._uploaders: Dict[tuple, Any] = {}
+        self._browser_windows = None
+
+    def _setup(self) -> None:
+        """初始化浏览器接口并获取本机浏览器窗口映射"""
+        initialize_browser_interface({
+            "type": self.config.browser_type,
+            "api_port": self.config.api_port,
+            "api_key": self.config.api_key
+        })
+        # 工作进程没有可交互的终端
+        set_unattended_mode(True)
+        self._browser_windows = get_browser_windows_unified()
+
+    def _uploader_for(self, job: Dict[str, Any]):
+        """同一表格/地域/类目的任务共用一个上传器"""
+        from .multi_account_uploader import MultiAccountUploader
+
+        key = (job["excel_path"], job["region"], job["category"])
+        if key not in self._uploaders:
+            self._uploaders[key] = MultiAccountUploader(self.config, *key, reads_sheet=False)
+        return self._uploaders[key]
+
+    def run(self, exit_when_idle: bool = False) -> int:
+        """
+        循环领取并处理任务
+
+        Args:
+            exit_when_idle: 队列中没有未完成的任务时退出（否则一直等待新任务）
+
+        Returns:
+            int: 处理的任务数量
+        """
+        self._setup()
+        browser_ids = [str(seq) for seq in self._browser_windows] if self._browser_windows is not None else None
+        logger.info(f"🛰️ 工作进程 {self.worker_id} 已启动 (队列: {self.queue.db_file})")
+
+        handled = 0
+        while True:
+            job = self.queue.claim(self.worker_id, LEASE_SECONDS, browser_ids)
+            if job is None:
+                if exit_when_idle and not self.queue.has_open_jobs():
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            handled += 1
+            self._run_job(job)
+
+        logger.info(f"工作进程 {self.worker_id} 退出，共处理 {handled} 个任务")
+        return handled
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        logger.info(f"📥 领取任务: {job['job_id']} (第 {job['attempts']} 次, {len(job['group'])} 个商品)")
+        error = None
+        try:
+            uploader = self._uploader_for(job)
+            with LeaseTracker(self.queue, job, self.worker_id, uploader) as tracker:
+                uploader._upload_browser_group(job["group"], job["total"], self._browser_windows or {}, tracker)
+        except Exception as e:
+            error = f"工作进程 {self.worker_id} 处理任务异常: {e}"
+            logger.error(f"任务 {job['job_id']} 处理异常: {e}")
+        finally:
+            if self.queue.complete(job["job_id"], self.worker_id, error):
+                logger.info(f"📤 任务完成: {job['job_id']}")
+            else:
+                logger.warning(f"⚠️ 任务 {job['job_id']} 的租约已被回收，剩余商品由其他工作进程处理")
@@ -1,32 +1,76 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 from datetime import datetime
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from playwright.sync_api import Page  # pyright: ignore[reportMissingImports]
-from core.models import ProductInfo, UploadConfig
+from core.models import ProductInfo, ProductRecord, UploadConfig
 from ..core.carousell_uploader import CarousellUploader
 from ..core.base_uploader import CriticalOperationFailed
-from ..actions.enhanced_safe_actions import SkipCurrentProduct
+from ..actions.enhanced_safe_actions import SkipCurrentProduct, is_unattended_mode
 from browser.browser import (
     start_browser_unified, 
+    connect_browser_unified,
     get_profile_id_by_browser_id_unified, 
     get_browser_windows_unified, 
-    close_browser_unified
+    close_browser_unified,
+    log_browser_api_latency
 )
+from browser import pacing
 from data.excel_parser import ExcelProductParser
 from core.logger import logger
 from data.record_manager import SuccessRecordManager
-from ..utils.ip_validator import IPValidator
+from ..utils.ip_validator import IPValidator, IP_MISMATCH_ERROR
+from ..utils.ip_verdict_cache import get_ip_verdict_cache, proxy_fingerprint_for
+from .profile_warmer import ProfileWarmer
+from .async_runner import AsyncUploadRunner
+from .process_pool import ProcessPoolRunner, default_process_count
+from .distributed import DistributedCoordinator
+
+@dataclass
+class BrowserSession:
+    """已启动并通过IP地域校验的浏览器会话"""
+    browser_id: str
+    profile_id: str
+    playwright: Any
+    browser: Any
+    page: Page
+    listings: int = 0  # 已在该会话中处理的商品数
+    
+    def is_alive(self) -> bool:
+        """浏览器连接和页面是否仍然可用"""
+        try:
+            return self.browser.is_connected() and not self.page.is_closed()
+        except Exception:
+            return False
 
 class MultiAccountUploader:
-    """多账号串行上传器"""
+    """多账号上传器 - 支持按Excel顺序串行执行、多浏览器并发执行、异步执行、多进程执行和分布式执行"""
     
-    def __init__(self, config: UploadConfig, excel_path: str, region: str, category: str = "sneakers"):
+    def __init__(self, config: UploadConfig, excel_path: str, region: str, category: str = "sneakers",
+                 reads_sheet: bool = True):
+        """
+        Args:
+            reads_sheet: 是否由本实例读取表格；工作进程（多进程/分布式）只接收协调进程派发的商品，
+                表格路径在工作进程所在主机上可以不存在
+        """
         self.config = config
         self.excel_path = excel_path
         self.region = region
         self.category = category
-        self.parser = ExcelProductParser(excel_path)
+        self.parser = ExcelProductParser(excel_path, must_exist=reads_sheet)
         self.record_manager = SuccessRecordManager()
+        
+        # 执行模式配置
+        execution = getattr(config, "execution", None) or {}
+        self.mode = execution.get("mode", "sequential")
+        self.max_workers = max(1, int(execution.get("max_workers", 4)))
+        self.processes = default_process_count(execution.get("processes"))
+        self.session_affinity = bool(execution.get("session_affinity", False))
+        self.warmup = bool(execution.get("warmup", False))
+        self.streaming = bool(execution.get("streaming", False))
+        self.stream_chunk_size = max(1, int(execution.get("stream_chunk_size", 1000)))
+        self._warmer = None
     
     def run_upload_cycle(self) -> Dict[str, Any]:
         """
@@ -38,6 +82,11 @@ class MultiAccountUploader:
         try:
             logger.info(f"开始执行多账号上传，地域: {self.region}")
             
+            if self.streaming:
+                if self.mode == "sequential" and not self.session_affinity:
+                    return self._run_streaming_cycle()
+                logger.warning("⚠️ 流式读取只支持串行且未启用会话复用的模式，改为一次性解析Excel")
+            
             # 1. 解析 Excel 文件
             products_data = self.parser.parse_products(self.region)
             if not products_data:
@@ -55,7 +104,7 @@ class MultiAccountUploader:
             
             # 2. 获取已成功的商品SKU，跳过已完成的商品
             successful_products = self._get_successful_products(products_data)
-            logger.info(f"已成功的商品SKU: {sorted(successful_products)}")
+            logger.info(f"已成功的商品SKU: {sorted(sku for _, sku in successful_products)}")
             
             # 3. 过滤掉已成功的商品，只保留需要处理的商品
             filtered_products_data = self._filter_products_by_sku(products_data, successful_products)
@@ -74,14 +123,26 @@ class MultiAccountUploader:
                 }
             
             # 4. 获取需要的BrowserID列表
-            needed_browser_ids = set(product['browser_id'] for product in filtered_products_data)
+            needed_browser_ids = set(product.browser_id for product in filtered_products_data)
             logger.info(f"需要处理的BrowserID: {sorted(needed_browser_ids)}")
             
+            # 分布式模式：发布到共享队列，由各主机的工作进程领取（窗口映射由工作进程在本机获取）
+            if self.mode == "distributed":
+                results = DistributedCoordinator(self).run(filtered_products_data)
+                return self._generate_summary(results)
+            
             # 5. 只获取需要的浏览器窗口数据
             browser_windows = self._fetch_needed_browser_windows(needed_browser_ids)
             
-            # 6. 严格按照Excel顺序执行商品上传
-            results = self._upload_products_sequentially(filtered_products_data, browser_windows)
+            # 6. 执行商品上传（串行模式严格按照Excel顺序，并发/异步/多进程模式按BrowserID分组并行）
+            if self.mode == "process":
+                results = ProcessPoolRunner(self, browser_windows, self.processes).run(filtered_products_data)
+            elif self.mode == "async":
+                results = AsyncUploadRunner(self, browser_windows).run(filtered_products_data)
+            elif self.mode == "concurrent" and self.max_workers > 1:
+                results = self._upload_products_concurrently(filtered_products_data, browser_windows)
+            else:
+                results = self._upload_products_sequentially(filtered_products_data, browser_windows)
             
             # 7. 统计结果
             return self._generate_summary(results)
@@ -99,32 +160,95 @@ class MultiAccountUploader:
                 "account_details": []
             }
     
-    def _get_successful_products(self, products_data: List[Dict[str, Any]]) -> set:
-        """获取所有已成功的商品SKU"""
-        successful_skus = set()
+    def _run_streaming_cycle(self) -> Dict[str, Any]:
+        """
+        流式执行：边读取Excel边上传，第一个商品无需等待整张表解析完成
         
-        for product in products_data:
-            browser_id = product['browser_id']
-            sku = product['sku']
-            
-            # 检查该商品是否已成功
-            if self.record_manager.is_product_successful(self.excel_path, self.region, browser_id, sku):
-                successful_skus.add(sku)
+        已成功记录一次性加载为 (BrowserID, SKU) 集合，浏览器窗口映射只获取一次；
+        每次只向前多读一个商品，用于预热下一个浏览器
+        """
+        logger.info(f"流式读取Excel，边读取边上传（每块 {self.stream_chunk_size} 行）")
+        successful_products = self.record_manager.get_successful_pairs(self.excel_path, self.region)
+        browser_windows = get_browser_windows_unified() or {}
+        
+        skipped = []
+        
+        def pending_products():
+            for product in self.parser.iter_products(self.region, self.stream_chunk_size):
+                if (str(product.browser_id), str(product.sku)) in successful_products:
+                    skipped.append(product.sku)
+                    logger.info(f"跳过已成功的商品: {product.sku}")
+                    continue
+                yield product
+        
+        if self.warmup:
+            logger.info("🔥 已启用浏览器预热")
+            self._warmer = ProfileWarmer(self.region, browser_windows)
+        
+        results = []
+        rejected: Dict[str, str] = {}
+        try:
+            products = pending_products()
+            current = next(products, None)
+            index = 0
+            while current is not None:
+                upcoming = next(products, None)
+                if self._warmer and upcoming is not None and upcoming.browser_id != current.browser_id:
+                    self._warmer.prefetch(upcoming.browser_id)
+                
+                index += 1
+                results.append(self._upload_unless_rejected(index, None, current, browser_windows, rejected))
+                current = upcoming
+        finally:
+            if self._warmer:
+                self._warmer.shutdown()
+                self._warmer = None
+        
+        logger.info(f"流式上传完成，共处理 {len(results)} 个商品，跳过已成功 {len(skipped)} 个")
+        
+        if not results:
+            if skipped:
+                logger.info("所有商品都已成功上传，无需继续处理")
+                return {
+                    "success": True, 
+                    "message": "所有商品都已成功上传",
+                    "total_accounts": 0,
+                    "total_products": len(skipped),
+                    "success_count": len(skipped),
+                    "failed_count": 0,
+                    "success_rate": 100.0,
+                    "account_details": []
+                }
+            logger.warning("没有找到可上传的商品")
+            return {
+                "success": False, 
+                "message": "没有找到可上传的商品",
+                "total_accounts": 0,
+                "total_products": 0,
+                "success_count": 0,
+                "failed_count": 0,
+                "success_rate": 0.0,
+                "account_details": []
+            }
         
-        return successful_skus
+        return self._generate_summary(results)
+    
+    def _get_successful_products(self, products_data: List[ProductRecord]) -> set:
+        """获取所有已成功的商品 (BrowserID, SKU)，一次查询完成"""
+        return self.record_manager.find_successful_products(self.excel_path, self.region, products_data)
     
     def _get_current_time(self) -> str:
         """获取当前时间字符串"""
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    def _filter_products_by_sku(self, products_data: List[Dict[str, Any]], successful_skus: set) -> List[Dict[str, Any]]:
-        """过滤掉已成功的商品SKU，保持Excel顺序"""
+    def _filter_products_by_sku(self, products_data: List[ProductRecord], successful_products: set) -> List[ProductRecord]:
+        """过滤掉已成功的商品 (BrowserID, SKU)，保持Excel顺序"""
         filtered_products = []
         skipped_count = 0
         
         for product in products_data:
-            sku = product['sku']
-            if sku in successful_skus:
+            sku = product.sku
+            if (str(product.browser_id), str(sku)) in successful_products:
                 skipped_count += 1
                 logger.info(f"跳过已成功的商品: {sku}")
                 continue
@@ -160,25 +284,206 @@ class MultiAccountUploader:
         logger.info(f"成功获取 {len(needed_browser_windows)} 个BrowserID的窗口数据")
         return needed_browser_windows
     
-    def _upload_products_sequentially(self, products_data: List[Dict[str, Any]], browser_windows: Dict[int, Dict[str, str]]) -> List[Dict[str, Any]]:
-        """严格按照Excel顺序执行商品上传"""
+    def _upload_products_sequentially(self, products_data: List[ProductRecord], browser_windows: Dict[int, Dict[str, str]]) -> List[Dict[str, Any]]:
+        """严格按照Excel顺序执行商品上传（会话复用模式下按BrowserID分组，组内保持Excel顺序）"""
         results = []
-        current_browser_id = None
-        current_uploader = None
+        total = len(products_data)
+        
+        # 预热模式：当前商品上传期间，后台提前打开下一个浏览器并完成IP校验
+        if self.warmup:
+            logger.info("🔥 已启用浏览器预热")
+            self._warmer = ProfileWarmer(self.region, browser_windows)
+        
+        try:
+            if self.session_affinity:
+                groups = self._group_products_by_browser_id(products_data)
+                logger.info(f"开始按BrowserID分组执行 {total} 个商品的上传（会话复用）: {len(groups)} 个BrowserID")
+                
+                group_list = list(groups.values())
+                indexed_results = []
+                for k, group in enumerate(group_list):
+                    if self._warmer and k + 1 < len(group_list):
+                        self._warmer.prefetch(group_list[k + 1][0][1].browser_id)
+                    indexed_results.extend(self._upload_browser_group(group, total, browser_windows))
+                
+                # 按Excel原始顺序排列结果
+                indexed_results.sort(key=lambda item: item[0])
+                results = [result for _, result in indexed_results]
+            else:
+                logger.info(f"开始按Excel顺序执行 {total} 个商品的上传")
+                
+                rejected: Dict[str, str] = {}
+                for i, product_data in enumerate(products_data, 1):
+                    # 下一行使用同一个BrowserID时，当前浏览器会先关闭再启动，无法预热
+                    if self._warmer and i < total and products_data[i].browser_id != product_data.browser_id:
+                        self._warmer.prefetch(products_data[i].browser_id)
+                    results.append(self._upload_unless_rejected(i, total, product_data, browser_windows, rejected))
+                
+                # 注意：每个产品处理完后都已经关闭浏览器，无需额外关闭
+        finally:
+            if self._warmer:
+                self._warmer.shutdown()
+                self._warmer = None
+        
+        logger.info(f"顺序上传完成，共处理 {len(results)} 个商品")
+        return results
+    
+    def _upload_products_concurrently(self, products_data: List[ProductRecord], browser_windows: Dict[int, Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        多浏览器并发上传
+        
+        按BrowserID对商品分组，每个工作线程同一时间只负责一个BrowserID，
+        组内仍按Excel顺序执行，保证同一账号不会同时上传两个商品。
+        结果按Excel原始顺序返回，统计结果与串行模式一致。
+        """
+        total = len(products_data)
+        groups = self._group_products_by_browser_id(products_data)
+        worker_count = min(self.max_workers, len(groups))
+        
+        logger.info(f"开始并发执行 {total} 个商品的上传: {len(groups)} 个BrowserID, {worker_count} 个工作线程")
+        if not is_unattended_mode():
+            logger.warning("⚠️ 并发模式下建议使用无人值守模式，多个浏览器同时请求输入CSS选择器时提示会交错显示")
+        
+        indexed_results = []
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="upload-worker") as executor:
+            futures = {
+                executor.submit(self._upload_browser_group, group, total, browser_windows): browser_id
+                for browser_id, group in groups.items()
+            }
+            for future in as_completed(futures):
+                browser_id = futures[future]
+                try:
+                    indexed_results.extend(future.result())
+                except Exception as e:
+                    # 单个工作线程异常不影响其他BrowserID，该组未返回结果的商品记为失败
+                    logger.error(f"BrowserID {browser_id} 的工作线程异常退出: {e}")
+                    for index, product_data in groups[browser_id]:
+                        indexed_results.append((index, {
+                            'browser_id': browser_id,
+                            'sku': product_data.sku,
+                            'success': False,
+                            'error': f"工作线程异常: {e}"
+                        }))
+        
+        # 按Excel原始顺序排列结果
+        indexed_results.sort(key=lambda item: item[0])
+        results = [result for _, result in indexed_results]
+        
+        logger.info(f"并发上传完成，共处理 {len(results)} 个商品")
+        return results
+    
+    def _group_products_by_browser_id(self, products_data: List[ProductRecord]) -> Dict[str, List[Tuple[int, ProductRecord]]]:
+        """按BrowserID分组，组的顺序为BrowserID在Excel中首次出现的顺序，组内保持Excel顺序"""
+        groups: Dict[str, List[Tuple[int, ProductRecord]]] = {}
+        for index, product_data in enumerate(products_data, 1):
+            groups.setdefault(product_data.browser_id, []).append((index, product_data))
+        return groups
+    
+    def _upload_browser_group(self, group: List[Tuple[int, ProductRecord]], total: int,
+                              browser_windows: Dict[int, Dict[str, str]],
+                              tracker=None) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        按顺序处理同一BrowserID下的全部商品，返回 (Excel序号, 结果) 列表
+        
+        会话复用模式下整组共用一个浏览器会话，只在组结束或会话不再可靠时关闭。
+        tracker（分布式模式）在每个商品上传前调用 begin(index, product_data)，返回结果时不再上传该商品；
+        上传后调用 finish(index, product_data, result)。
+        IP地域校验失败后不再启动该浏览器，组内剩余商品沿用同一错误记为失败
+        """
+        rejected: Dict[str, str] = {}
+        if not self.session_affinity:
+            results = []
+            for index, product_data in group:
+                result = tracker.begin(index, product_data) if tracker else None
+                if result is None:
+                    result = self._upload_unless_rejected(index, total, product_data, browser_windows, rejected)
+                    if tracker:
+                        tracker.finish(index, product_data, result)
+                results.append((index, result))
+            return results
+        
+        results = []
+        session = None
+        sku = None
+        try:
+            for index, product_data in group:
+                browser_id = product_data.browser_id
+                sku = product_data.sku
+                logger.info(f"[{index}/{total}] 处理商品: {sku} (BrowserID: {browser_id})")
+                
+                skipped = tracker.begin(index, product_data) if tracker else None
+                if skipped is not None:
+                    results.append((index, skipped))
+                    continue
+                
+                # 浏览器被手动关闭或连接断开时重新启动
+                if session is not None and not session.is_alive():
+                    logger.warning(f"⚠️ 浏览器 {browser_id} 会话已断开，重新启动")
+                    self._close_session(session, sku)
+                    session = None
+                
+                if session is None:
+                    if browser_id in rejected:
+                        failure = self._ip_rejection(product_data, rejected[browser_id])
+                    else:
+                        session, failure = self._open_session(browser_id, sku, browser_windows)
+                        if failure and self._is_ip_mismatch(failure):
+                            rejected[browser_id] = failure['error']
+                    if failure:
+                        if tracker:
+                            tracker.finish(index, product_data, failure)
+                        results.append((index, failure))
+                        continue
+                else:
+                    logger.info(f"♻️ 复用浏览器 {browser_id} 的会话（已处理 {session.listings} 个商品），跳过启动和IP校验")
+                
+                uploader = CarousellUploader(session.page, self.config, self.region, browser_id, sku)
+                result, session_safe = self._run_product_upload(uploader, product_data)
+                session.listings += 1
+                if tracker:
+                    tracker.finish(index, product_data, result)
+                results.append((index, result))
+                
+                if not session_safe:
+                    # 上传失败可能由IP切换引起，下次打开该浏览器时强制重新校验
+                    get_ip_verdict_cache().invalidate(session.profile_id)
+                    logger.warning(f"⚠️ 商品 {sku} 未成功完成，页面状态不可靠，关闭浏览器 {browser_id} 会话")
+                    self._close_session(session, sku)
+                    session = None
+        finally:
+            # 组内商品全部处理完毕（或线程异常退出）时关闭会话
+            if session is not None:
+                self._close_session(session, sku)
+        
+        return results
+    
+    def _open_session(self, browser_id: str, sku: str,
+                      browser_windows: Dict[int, Dict[str, str]]) -> Tuple[Optional[BrowserSession], Optional[Dict[str, Any]]]:
+        """
+        启动浏览器并校验IP地域
+        
+        Returns:
+            Tuple[Optional[BrowserSession], Optional[Dict[str, Any]]]: (会话, 失败结果)，两者只有一个不为None
+        """
         current_browser = None
         current_playwright = None
         current_profile_id = None
         
-        logger.info(f"开始按Excel顺序执行 {len(products_data)} 个商品的上传")
+        warm = self._warmer.take(browser_id) if self._warmer else None
+        if warm is not None and warm.error:
+            logger.warning(f"⚠️ 浏览器 {browser_id} 预热失败，改为直接启动: {warm.error}")
+            warm = None
         
-        for i, product_data in enumerate(products_data, 1):
-            browser_id = product_data['browser_id']
-            sku = product_data['sku']
-            
-            logger.info(f"[{i}/{len(products_data)}] 处理商品: {sku} (BrowserID: {browser_id})")
-            
-            # 启动浏览器（每个产品都需要启动新的浏览器）
-            try:
+        try:
+            if warm is not None:
+                # 使用预热好的浏览器：窗口已打开且已完成IP校验，只需在当前线程重新连接
+                current_profile_id = warm.profile_id
+                is_region_match, actual_region, actual_ip = warm.ip_verdict
+                logger.info(f"🔥 使用已预热的浏览器 {browser_id} (profile_id: {current_profile_id})，沿用预热时的IP校验结果")
+                
+                if is_region_match:
+                    current_playwright, current_browser, page = connect_browser_unified(warm.ws_endpoint)
+            else:
                 profile_id = get_profile_id_by_browser_id_unified(
                     browser_id,
                     browser_windows
@@ -189,266 +494,297 @@ class MultiAccountUploader:
                     profile_id
                 )
                 
-                current_browser_id = browser_id
                 current_profile_id = profile_id
                 
-                # 校验IP地域
+                # 校验IP地域（缓存有效期内且代理未变化时沿用上次结果）
                 logger.info(f"正在校验浏览器 {browser_id} 的IP地域...")
-                is_region_match, actual_region, actual_ip = IPValidator.quick_validate(page, self.region)
-                
-                if not is_region_match:
-                    logger.error(f"❌ IP地域校验失败: 期望={self.region}, 实际={actual_region}, IP={actual_ip}")
-                    logger.error(f"🚫 跳过浏览器 {browser_id} 的所有商品，关闭浏览器...")
-                    
-                    # 记录失败结果
-                    results.append({
-                        'browser_id': browser_id,
-                        'sku': sku,
-                        'success': False,
-                        'error': f'IP地域不匹配: 期望={self.region}, 实际={actual_region}, IP={actual_ip}'
-                    })
-                    
-                    # 关闭浏览器
-                    try:
-                        close_browser_unified(current_profile_id)
-                        current_playwright.stop()
-                    except Exception as close_error:
-                        logger.warning(f"关闭浏览器时出错: {close_error}")
-                    finally:
-                        current_browser = None
-                        current_playwright = None
-                        current_browser_id = None
-                        current_profile_id = None
-                    
-                    continue
-                
-                logger.info(f"✅ IP地域校验通过: {actual_region}, IP={actual_ip}")
+                is_region_match, actual_region, actual_ip = IPValidator.cached_validate(
+                    page, self.region, profile_id, proxy_fingerprint_for(browser_id, browser_windows)
+                )
+            
+            if not is_region_match:
+                logger.error(f"❌ IP地域校验失败: 期望={self.region}, 实际={actual_region}, IP={actual_ip}")
+                logger.error(f"🚫 跳过浏览器 {browser_id} 的所有商品，关闭浏览器...")
                 
-                # 创建uploader
-                current_uploader = CarousellUploader(page, self.config, self.region, browser_id, sku)
+                # 关闭浏览器
+                self._close_browser_quietly(browser_id, current_profile_id, current_playwright)
                 
-            except Exception as e:
-                logger.error(f"启动浏览器 {browser_id} 失败: {e}")
                 # 记录失败结果
-                results.append({
+                return None, {
                     'browser_id': browser_id,
                     'sku': sku,
                     'success': False,
-                    'error': str(e)
-                })
-                
-                # 如果浏览器已启动，尝试关闭
-                if current_browser and current_profile_id:
-                    try:
-                        close_browser_unified(current_profile_id)
-                        current_playwright.stop()
-                    except Exception as close_error:
-                        logger.warning(f"关闭浏览器时出错: {close_error}")
-                    finally:
-                        current_browser = None
-                        current_playwright = None
-                        current_browser_id = None
-                        current_profile_id = None
-                
-                continue
+                    'error': f'{IP_MISMATCH_ERROR}: 期望={self.region}, 实际={actual_region}, IP={actual_ip}'
+                }
+            
+            logger.info(f"✅ IP地域校验通过: {actual_region}, IP={actual_ip}")
+            
+            return BrowserSession(browser_id, current_profile_id, current_playwright, current_browser, page), None
             
-            # 执行商品上传
+        except Exception as e:
+            logger.error(f"启动浏览器 {browser_id} 失败: {e}")
+            
+            # 如果浏览器已启动，尝试关闭
+            if current_profile_id:
+                self._close_browser_quietly(browser_id, current_profile_id, current_playwright)
+            
+            # 记录失败结果
+            return None, {
+                'browser_id': browser_id,
+                'sku': sku,
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _close_session(self, session: BrowserSession, sku: str) -> None:
+        """通过API关闭浏览器窗口并断开Playwright连接"""
+        try:
+            # 使用API接口关闭浏览器
+            close_success = close_browser_unified(
+                session.profile_id
+            )
+            
+            if close_success:
+                logger.info(f"✅ 商品 {sku} 处理完成，已通过API关闭浏览器 {session.browser_id} (profile_id: {session.profile_id})")
+            else:
+                logger.warning(f"⚠️ 商品 {sku} 处理完成，但API关闭浏览器失败 {session.browser_id} (profile_id: {session.profile_id})")
+            
+            # 尝试关闭Playwright连接
             try:
-                logger.info(f"上传商品: {sku} - {product_data.get('product_name_cn', '')}")
-                
-                # 创建 ProductInfo 对象
-                product_info = self.parser.create_product_info(product_data)
-                
-                # 执行上传
-                folder_path = product_data['folder'] if product_data['folder'] else None
-                success = current_uploader.upload_product(product_info, folder_path, self.category)
-                
-                if success:
-                    logger.info(f"✅ 商品 {sku} 上传成功")
-                    
-                    # 立即记录成功
-                    self.record_manager.record_success(
-                        self.excel_path,
-                        self.region,
-                        browser_id,
-                        sku
-                    )
-                    
-                    # 输出美化的截断日志
-                    logger.info("🎊" + "=" * 58 + "🎊")
-                    logger.info("🎉 商品处理完成 - 详细信息 🎉")
-                    logger.info("📍 所在地域: " + f"{self.region}")
-                    logger.info("🌐 浏览器ID: " + f"{browser_id}")
-                    logger.info("📦 商品SKU: " + f"{sku}")
-                    logger.info("✅ 处理状态: 成功")
-                    logger.info("⏰ 完成时间: " + f"{self._get_current_time()}")
-                    logger.info("🎊" + "=" * 58 + "🎊")
-                    
-                    results.append({
-                        'browser_id': browser_id,
-                        'sku': sku,
-                        'success': True,
-                        'error': None
-                    })
-                else:
-
-                    # 输出美化的截断日志（失败情况）
-                    logger.error("💥" + "=" * 50 + "💥")
-                    logger.error("❌ 商品处理失败 - 详细信息 ❌")
-                    logger.error("📍 所在地域: " + f"{self.region}")
-                    logger.error("🌐 浏览器ID: " + f"{browser_id}")
-                    logger.error("📦 商品SKU: " + f"{sku}")
-                    logger.error("❌ 处理状态: 失败")
-                    logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
-                    logger.error("💥" + "=" * 50 + "💥")
-                    
-                    results.append({
-                        'browser_id': browser_id,
-                        'sku': sku,
-                        'success': False,
-                        'error': '上传失败'
-                    })
-                
-            except CriticalOperationFailed as e:
-                logger.error(f"🚨 关键操作失败，立即停止当前商品流程: {sku} - {e}")
-                
-                # 输出美化的截断日志（关键操作失败）
-                logger.error("🚨" + "=" * 50 + "🚨")
-                logger.error("🚨 关键操作失败 - 详细信息 🚨")
-                logger.error("📍 所在地域: " + f"{self.region}")
-                logger.error("🌐 浏览器ID: " + f"{browser_id}")
-                logger.error("📦 商品SKU: " + f"{sku}")
-                logger.error("🚨 处理状态: 关键操作失败")
-                logger.error("❌ 失败原因: " + f"{e}")
-                logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
-                logger.error("🚨" + "=" * 50 + "🚨")
-                
-                results.append({
-                    'browser_id': browser_id,
-                    'sku': sku,
-                    'success': False,
-                    'error': f"关键操作失败: {e}"
-                })
-                # 关键操作失败，需要立即关闭浏览器并继续下一个商品
-                
-            except SkipCurrentProduct as e:
-                logger.warning(f"⏭️ 用户选择跳过当前商品，继续下一个商品: {sku} - {e}")
-                
-                # 输出美化的截断日志（跳过当前商品）
-                logger.warning("⏭️" + "=" * 50 + "⏭️")
-                logger.warning("⏭️ 跳过当前商品 - 详细信息 ⏭️")
-                logger.warning("📍 所在地域: " + f"{self.region}")
-                logger.warning("🌐 浏览器ID: " + f"{browser_id}")
-                logger.warning("📦 商品SKU: " + f"{sku}")
-                logger.warning("⏭️ 处理状态: 用户跳过")
-                logger.warning("📝 跳过原因: " + f"{e}")
-                logger.warning("⏰ 跳过时间: " + f"{self._get_current_time()}")
-                logger.warning("⏭️" + "=" * 50 + "⏭️")
-                
-                results.append({
-                    'browser_id': browser_id,
-                    'sku': sku,
-                    'success': False,
-                    'error': f"用户跳过: {e}"
-                })
-                # 跳过当前商品，需要立即关闭浏览器并继续下一个商品
-                logger.info(f"⏭️ 用户跳过商品 {sku}，正在关闭浏览器 {browser_id}...")
-                
-                # 关闭浏览器窗口
-                if current_browser and current_profile_id:
-                    try:
-                        close_success = close_browser_unified(current_profile_id)
-                        if close_success:
-                            logger.info(f"✅ 已关闭浏览器 {browser_id} (profile_id: {current_profile_id})")
-                        else:
-                            logger.warning(f"⚠️ 关闭浏览器失败 {browser_id} (profile_id: {current_profile_id})")
-                        
-                        # 关闭Playwright连接
-                        try:
-                            current_playwright.stop()
-                        except Exception as pw_error:
-                            logger.debug(f"关闭Playwright连接时出错: {pw_error}")
-                        
-                        # 重置浏览器相关变量
-                        current_browser = None
-                        current_playwright = None
-                        current_uploader = None
-                        current_browser_id = None
-                        current_profile_id = None
-                        
-                    except Exception as close_error:
-                        logger.error(f"关闭浏览器 {browser_id} 时出错: {close_error}")
-                        # 即使关闭失败也要重置变量
-                        current_browser = None
-                        current_playwright = None
-                        current_uploader = None
-                        current_browser_id = None
-                        current_profile_id = None
-                
-                # 继续处理下一个商品
-                continue
-                
+                session.playwright.stop()
             except Exception as e:
-                logger.error(f"上传商品 {sku} 时出错: {e}")
+                logger.debug(f"关闭Playwright连接时出错: {e}")
                 
-                # 输出美化的截断日志（普通异常）
-                logger.error("💥" + "=" * 50 + "💥")
-                logger.error("💥 异常处理失败 - 详细信息 💥")
-                logger.error("📍 所在地域: " + f"{self.region}")
-                logger.error("🌐 浏览器ID: " + f"{browser_id}")
-                logger.error("📦 商品SKU: " + f"{sku}")
-                logger.error("💥 处理状态: 异常失败")
-                logger.error("❌ 异常原因: " + f"{e}")
-                logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
-                logger.error("💥" + "=" * 50 + "💥")
-                
-                results.append({
-                    'browser_id': browser_id,
-                    'sku': sku,
-                    'success': False,
-                    'error': str(e)
-                })
+        except Exception as e:
+            logger.error(f"关闭浏览器 {session.browser_id} 时出错: {e}")
+    
+    def _close_browser_quietly(self, browser_id: str, profile_id: str, playwright=None) -> None:
+        """关闭浏览器窗口和Playwright连接，出错时只记录日志"""
+        try:
+            close_browser_unified(profile_id)
+            if playwright:
+                playwright.stop()
+        except Exception as close_error:
+            logger.warning(f"关闭浏览器时出错: {close_error}")
+    
+    def _upload_unless_rejected(self, index: int, total: Optional[int], product_data: ProductRecord,
+                                browser_windows: Dict[int, Dict[str, str]], rejected: Dict[str, str]) -> Dict[str, Any]:
+        """
+        上传单个商品；该浏览器本次已IP地域校验失败时不再启动，直接沿用同一错误记为失败
+
+        Args:
+            rejected: 本次已IP地域校验失败的 BrowserID -> 错误信息（校验失败时写入）
+        """
+        browser_id = product_data.browser_id
+        if browser_id in rejected:
+            return self._ip_rejection(product_data, rejected[browser_id])
+        
+        result = self._upload_single_product(index, total, product_data, browser_windows)
+        if self._is_ip_mismatch(result):
+            rejected[browser_id] = result['error']
+        return result
+    
+    def _ip_rejection(self, product_data: ProductRecord, error: str) -> Dict[str, Any]:
+        """同一浏览器IP地域校验已失败的商品结果"""
+        logger.error(f"🚫 浏览器 {product_data.browser_id} 的IP地域校验已失败，跳过商品: {product_data.sku}")
+        return {
+            'browser_id': product_data.browser_id,
+            'sku': product_data.sku,
+            'success': False,
+            'error': error
+        }
+    
+    @staticmethod
+    def _is_ip_mismatch(result: Dict[str, Any]) -> bool:
+        """结果是否为IP地域校验失败"""
+        return not result['success'] and str(result.get('error') or '').startswith(IP_MISMATCH_ERROR)
+    
+    def _upload_single_product(self, index: int, total: Optional[int], product_data: ProductRecord,
+                               browser_windows: Dict[int, Dict[str, str]]) -> Dict[str, Any]:
+        """
+        处理单个商品：启动浏览器 -> 校验IP地域 -> 上传 -> 关闭浏览器
+        
+        Args:
+            index: 商品在Excel中的序号（从1开始）
+            total: 本次需要处理的商品总数（流式读取时未知，为None）
+            product_data: 商品数据
+            browser_windows: 浏览器窗口映射表
             
-            # 每个产品上架后立即关闭浏览器窗口
-            if current_browser and current_profile_id:
-                try:
-                    # 使用API接口关闭浏览器
-                    close_success = close_browser_unified(
-                        current_profile_id
-                    )
-                    
-                    if close_success:
-                        logger.info(f"✅ 商品 {sku} 处理完成，已通过API关闭浏览器 {browser_id} (profile_id: {current_profile_id})")
-                    else:
-                        logger.warning(f"⚠️ 商品 {sku} 处理完成，但API关闭浏览器失败 {browser_id} (profile_id: {current_profile_id})")
-                    
-                    # 尝试关闭Playwright连接
-                    try:
-                        current_playwright.stop()
-                    except Exception as e:
-                        logger.debug(f"关闭Playwright连接时出错: {e}")
-                    
-                    # 重置浏览器相关变量
-                    current_browser = None
-                    current_playwright = None
-                    current_uploader = None
-                    current_browser_id = None
-                    current_profile_id = None
-                    
-                except Exception as e:
-                    logger.error(f"关闭浏览器 {browser_id} 时出错: {e}")
-                    # 即使关闭失败也要重置变量
-                    current_browser = None
-                    current_playwright = None
-                    current_uploader = None
-                    current_browser_id = None
-                    current_profile_id = None
+        Returns:
+            Dict[str, Any]: 单个商品的上传结果
+        """
+        browser_id = product_data.browser_id
+        sku = product_data.sku
         
-        # 注意：每个产品处理完后都已经关闭浏览器，无需额外关闭
+        logger.info(f"[{index}/{total if total is not None else '?'}] 处理商品: {sku} (BrowserID: {browser_id})")
         
-        logger.info(f"顺序上传完成，共处理 {len(results)} 个商品")
-        return results
+        # 启动浏览器（每个产品都需要启动新的浏览器）
+        session, failure = self._open_session(browser_id, sku, browser_windows)
+        if failure:
+            return failure
+        
+        # 执行商品上传
+        uploader = CarousellUploader(session.page, self.config, self.region, browser_id, sku)
+        result, _ = self._run_product_upload(uploader, product_data)
+        if not result['success']:
+            # 上传失败可能由IP切换引起，下次打开该浏览器时强制重新校验
+            get_ip_verdict_cache().invalidate(session.profile_id)
+        
+        # 每个产品上架后立即关闭浏览器窗口
+        self._close_session(session, sku)
+        
+        return result
+    
+    def _run_product_upload(self, uploader: CarousellUploader, product_data: ProductRecord) -> Tuple[Dict[str, Any], bool]:
+        """
+        在已就绪的浏览器页面上上传单个商品并记录结果
+        
+        Returns:
+            Tuple[Dict[str, Any], bool]: (上传结果, 会话是否可继续复用)
+        """
+        profile, product_info, folder_path = self._prepare_product_upload(product_data)
+        try:
+            success = uploader.upload_product(product_info, folder_path, self.category)
+            return self._finish_product_upload(product_data, success, profile)
+        except Exception as e:
+            return self._fail_product_upload(product_data, e)
     
+    def _prepare_product_upload(self, product_data: ProductRecord):
+        """
+        上传前的准备：按账号选择节奏档位并开始统计本商品的刻意延迟，生成商品信息
+        
+        Returns:
+            Tuple[PacingProfile, ProductInfo, Optional[str]]: (节奏档位, 商品信息, 图片文件夹)
+        """
+        profile = pacing.begin_listing(product_data.browser_id)
+        logger.info(f"上传商品: {product_data.sku} - {product_data.product_name_cn} (节奏档位: {profile.name})")
+        
+        # 创建 ProductInfo 对象
+        product_info = self.parser.create_product_info(product_data)
+        folder_path = product_data.folder if product_data.folder else None
+        return profile, product_info, folder_path
+    
+    def _finish_product_upload(self, product_data: ProductRecord, success: bool, profile) -> Tuple[Dict[str, Any], bool]:
+        """根据上传结果记录成功并输出日志，返回 (上传结果, 会话是否可继续复用)"""
+        browser_id = product_data.browser_id
+        sku = product_data.sku
+        
+        logger.info(f"⏳ 商品 {sku} 刻意延迟合计: {pacing.listing_delay_total():.1f}秒 (节奏档位: {profile.name})")
+
+        if success:
+            logger.info(f"✅ 商品 {sku} 上传成功")
+
+            # 立即记录成功
+            self.record_manager.record_success(
+                self.excel_path,
+                self.region,
+                browser_id,
+                sku
+            )
+
+            # 输出美化的截断日志
+            logger.info("🎊" + "=" * 58 + "🎊")
+            logger.info("🎉 商品处理完成 - 详细信息 🎉")
+            logger.info("📍 所在地域: " + f"{self.region}")
+            logger.info("🌐 浏览器ID: " + f"{browser_id}")
+            logger.info("📦 商品SKU: " + f"{sku}")
+            logger.info("✅ 处理状态: 成功")
+            logger.info("⏰ 完成时间: " + f"{self._get_current_time()}")
+            logger.info("🎊" + "=" * 58 + "🎊")
+
+            return {
+                'browser_id': browser_id,
+                'sku': sku,
+                'success': True,
+                'error': None
+            }, True
+
+        # 输出美化的截断日志（失败情况）
+        logger.error("💥" + "=" * 50 + "💥")
+        logger.error("❌ 商品处理失败 - 详细信息 ❌")
+        logger.error("📍 所在地域: " + f"{self.region}")
+        logger.error("🌐 浏览器ID: " + f"{browser_id}")
+        logger.error("📦 商品SKU: " + f"{sku}")
+        logger.error("❌ 处理状态: 失败")
+        logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
+        logger.error("💥" + "=" * 50 + "💥")
+
+        return {
+            'browser_id': browser_id,
+            'sku': sku,
+            'success': False,
+            'error': '上传失败'
+        }, False
+
+    def _fail_product_upload(self, product_data: ProductRecord, e: Exception) -> Tuple[Dict[str, Any], bool]:
+        """上传过程中抛出异常时输出日志，返回 (上传结果, 会话是否可继续复用)"""
+        browser_id = product_data.browser_id
+        sku = product_data.sku
+        
+        if isinstance(e, CriticalOperationFailed):
+            logger.error(f"🚨 关键操作失败，立即停止当前商品流程: {sku} - {e}")
+            
+            # 输出美化的截断日志（关键操作失败）
+            logger.error("🚨" + "=" * 50 + "🚨")
+            logger.error("🚨 关键操作失败 - 详细信息 🚨")
+            logger.error("📍 所在地域: " + f"{self.region}")
+            logger.error("🌐 浏览器ID: " + f"{browser_id}")
+            logger.error("📦 商品SKU: " + f"{sku}")
+            logger.error("🚨 处理状态: 关键操作失败")
+            logger.error("❌ 失败原因: " + f"{e}")
+            logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
+            logger.error("🚨" + "=" * 50 + "🚨")
+            
+            # 关键操作失败，需要立即关闭浏览器并继续下一个商品
+            return {
+                'browser_id': browser_id,
+                'sku': sku,
+                'success': False,
+                'error': f"关键操作失败: {e}"
+            }, False
+            
+        if isinstance(e, SkipCurrentProduct):
+            logger.warning(f"⏭️ 用户选择跳过当前商品，继续下一个商品: {sku} - {e}")
+            
+            # 输出美化的截断日志（跳过当前商品）
+            logger.warning("⏭️" + "=" * 50 + "⏭️")
+            logger.warning("⏭️ 跳过当前商品 - 详细信息 ⏭️")
+            logger.warning("📍 所在地域: " + f"{self.region}")
+            logger.warning("🌐 浏览器ID: " + f"{browser_id}")
+            logger.warning("📦 商品SKU: " + f"{sku}")
+            logger.warning("⏭️ 处理状态: 用户跳过")
+            logger.warning("📝 跳过原因: " + f"{e}")
+            logger.warning("⏰ 跳过时间: " + f"{self._get_current_time()}")
+            logger.warning("⏭️" + "=" * 50 + "⏭️")
+            
+            # 跳过当前商品，需要立即关闭浏览器并继续下一个商品
+            logger.info(f"⏭️ 用户跳过商品 {sku}，正在关闭浏览器 {browser_id}...")
+            return {
+                'browser_id': browser_id,
+                'sku': sku,
+                'success': False,
+                'error': f"用户跳过: {e}"
+            }, True
+            
+        logger.error(f"上传商品 {sku} 时出错: {e}")
+
+        # 输出美化的截断日志（普通异常）
+        logger.error("💥" + "=" * 50 + "💥")
+        logger.error("💥 异常处理失败 - 详细信息 💥")
+        logger.error("📍 所在地域: " + f"{self.region}")
+        logger.error("🌐 浏览器ID: " + f"{browser_id}")
+        logger.error("📦 商品SKU: " + f"{sku}")
+        logger.error("💥 处理状态: 异常失败")
+        logger.error("❌ 异常原因: " + f"{e}")
+        logger.error("⏰ 失败时间: " + f"{self._get_current_time()}")
+        logger.error("💥" + "=" * 50 + "💥")
+
+        return {
+            'browser_id': browser_id,
+            'sku': sku,
+            'success': False,
+            'error': str(e)
+        }, False
     
     def _generate_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """生成上传结果统计"""
@@ -491,4 +827,5 @@ class MultiAccountUploader:
             'account_details': account_details
         }
         
+        log_browser_api_latency()
         return summary
@@ -0,0 +1,173 @@
+"""
+多进程上传执行器 - 协调进程解析表格并按BrowserID分组派发任务，工作进程各自上传
+每个工作进程独立初始化浏览器接口、运行模式和 Playwright，互不共享全局状态
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from browser.browser import initialize_browser_interface, get_browser_interface_config
+from core.logger import logger
+from core.models import ProductRecord, UploadConfig
+from ..actions.enhanced_safe_actions import set_unattended_mode, is_unattended_mode
+
+# 工作进程内的上传器（由 _init_worker 创建，进程内所有任务共用）
+_worker_uploader = None
+# 工作进程开始处理某个BrowserID分组时写入其BrowserID（进程池崩溃后协调进程据此区分已开始和未开始的分组）
+_started_queue = None
+
+
+def _init_worker(browser_config: Dict[str, Any], unattended: bool, config: UploadConfig,
+                 excel_path: str, region: str, category: str, input_lock, started_queue) -> None:
+    """工作进程初始化：重新初始化浏览器接口和运行模式，使用跨进程的桌面输入锁，并创建进程内的上传器"""
+    global _worker_uploader, _started_queue
+    from browser.actions import desktop_input_lock
+    from .multi_account_uploader import MultiAccountUploader
+
+    # 屏幕坐标点击和系统文件对话框依赖全局焦点，所有工作进程共用同一把锁
+    desktop_input_lock.use(input_lock)
+    _started_queue = started_queue
+    initialize_browser_interface(browser_config)
+    set_unattended_mode(unattended)
+    _worker_uploader = MultiAccountUploader(config, excel_path, region, category, reads_sheet=False)
+    logger.info(f"🧩 上传工作进程已就绪 (PID: {os.getpid()})")
+
+
+def _run_group(browser_id: str, group: List[Tuple[int, ProductRecord]], total: int,
+               browser_windows: Dict[int, Dict[str, str]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """在工作进程中处理一个BrowserID的全部商品，返回 (Excel序号, 结果) 列表"""
+    _started_queue.put(browser_id)
+    return _worker_uploader._upload_browser_group(group, total, browser_windows)
+
+
+class ProcessPoolRunner:
+    """
+    多进程上传执行器
+
+    - 协调进程只解析表格一次，按BrowserID分组后放入进程池的任务队列，空闲的工作进程依次领取
+    - 工作进程使用 spawn 方式启动，各自初始化浏览器接口，组内上传流程与并发模式相同
+    - 桌面输入（屏幕坐标点击、键盘上传图片）使用协调进程创建的跨进程锁，各工作进程依次执行
+    - 工作进程崩溃会使整个进程池失效：只有已开始的分组记为失败，未开始的分组提交到新的进程池继续上传
+    - 成功记录由工作进程上传成功后立即写入（SQLite WAL 支持多进程写入），结果返回协调进程统一汇总
+    """
+
+    def __init__(self, owner, browser_windows: Dict[int, Dict[str, str]], processes: int):
+        """
+        Args:
+            owner: 发起本次上传的 MultiAccountUploader
+            browser_windows: 浏览器窗口映射表
+            processes: 工作进程数量上限
+        """
+        self.owner = owner
+        self.browser_windows = browser_windows
+        self.processes = max(1, processes)
+
+    def run(self, products_data: List[ProductRecord]) -> List[Dict[str, Any]]:
+        """执行全部商品的上传，结果按Excel原始顺序返回"""
+        owner = self.owner
+        total = len(products_data)
+        groups = owner._group_products_by_browser_id(products_data)
+        worker_count = min(self.processes, len(groups))
+
+        logger.info(f"开始多进程执行 {total} 个商品的上传: {len(groups)} 个BrowserID, {worker_count} 个工作进程")
+
+        # 工作进程没有可交互的终端，有人值守时的选择器输入无法进行
+        unattended = is_unattended_mode()
+        if not unattended:
+            logger.warning("⚠️ 多进程模式下工作进程无法读取终端输入，选择器失效时按无人值守模式处理")
+
+        indexed_results = []
+        mp_context = multiprocessing.get_context("spawn")
+        input_lock = mp_context.RLock()
+        pending = dict(groups)
+        while pending:
+            started_queue = mp_context.SimpleQueue()
+            broken = self._run_pending(pending, total, worker_count, mp_context, input_lock, started_queue, indexed_results)
+            if not broken:
+                break
+
+            started = set()
+            while not started_queue.empty():
+                started.add(started_queue.get())
+            crashed = [browser_id for browser_id in pending if browser_id in started]
+            if not crashed:
+                # 没有分组开始就失效（如工作进程初始化失败），重试也不会成功
+                crashed = list(pending)
+            for browser_id in crashed:
+                logger.error(f"BrowserID {browser_id} 的工作进程已崩溃")
+                indexed_results.extend(self._group_failures(browser_id, pending.pop(browser_id), "工作进程已崩溃"))
+            if pending:
+                logger.warning(f"🔁 进程池已失效，{len(pending)} 个未开始的BrowserID分组提交到新的进程池")
+
+        # 按Excel原始顺序排列结果
+        indexed_results.sort(key=lambda item: item[0])
+        results = [result for _, result in indexed_results]
+
+        logger.info(f"多进程上传完成，共处理 {len(results)} 个商品")
+        return results
+
+    def _run_pending(self, pending: Dict[str, List[Tuple[int, ProductRecord]]], total: int, worker_count: int,
+                     mp_context, input_lock, started_queue, indexed_results: List) -> bool:
+        """
+        用一个新的进程池处理待处理分组，完成（成功或异常）的分组从 pending 中移除
+
+        Returns:
+            bool: 进程池是否因工作进程崩溃而失效（失效时受影响的分组仍留在 pending 中）
+        """
+        owner = self.owner
+        broken = False
+        executor = ProcessPoolExecutor(
+            max_workers=min(worker_count, len(pending)),
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(get_browser_interface_config(), True, owner.config,
+                      owner.excel_path, owner.region, owner.category, input_lock, started_queue)
+        )
+        try:
+            futures = {
+                executor.submit(_run_group, browser_id, group, total, self.browser_windows): browser_id
+                for browser_id, group in pending.items()
+            }
+            for future in as_completed(futures):
+                browser_id = futures[future]
+                try:
+                    indexed_results.extend(future.result())
+                except BrokenProcessPool:
+                    broken = True
+                    continue
+                except Exception as e:
+                    # 单个分组异常不影响其他分组，该组商品记为失败
+                    reason = f"工作进程异常: {e}"
+                    logger.error(f"BrowserID {browser_id} 的{reason}")
+                    indexed_results.extend(self._group_failures(browser_id, pending[browser_id], reason))
+                del pending[browser_id]
+        finally:
+            executor.shutdown(wait=True)
+        return broken
+
+    def _group_failures(self, browser_id: str, group: List[Tuple[int, ProductRecord]],
+                        reason: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        工作进程未返回结果时，该组商品记为失败
+
+        进程崩溃前已上传成功的商品已写入成功记录，按记录库结果计为成功，避免统计偏差
+        """
+        owner = self.owner
+        recorded = owner.record_manager.get_successful_products(owner.excel_path, owner.region, browser_id)
+        return [
+            (index, {
+                'browser_id': browser_id,
+                'sku': product_data.sku,
+                'success': product_data.sku in recorded,
+                'error': None if product_data.sku in recorded else reason
+            })
+            for index, product_data in group
+        ]
+
+
+def default_process_count(configured: Optional[int] = None) -> int:
+    """工作进程数量：未配置或配置为0时使用CPU核心数"""
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
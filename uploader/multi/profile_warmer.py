@@ -0,0 +1,114 @@
+"""
+浏览器预热器 - 在当前商品上传期间，后台提前打开下一个浏览器并完成IP地域校验
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from browser.browser import (
+    open_profile_unified,
+    connect_browser_unified,
+    close_browser_unified,
+    get_profile_id_by_browser_id_unified
+)
+from browser.actions import desktop_input_lock
+from core.logger import logger
+from ..utils.ip_validator import IPValidator
+from ..utils.ip_verdict_cache import proxy_fingerprint_for
+
+
+@dataclass
+class WarmProfile:
+    """预热结果：浏览器窗口已打开，但Playwright连接需要在使用线程中重新建立"""
+    browser_id: str
+    profile_id: Optional[str] = None
+    ws_endpoint: Optional[str] = None
+    ip_verdict: Optional[Tuple[bool, str, str]] = None  # (地域是否匹配, 实际地域, 实际IP)
+    error: Optional[str] = None
+
+
+class ProfileWarmer:
+    """
+    浏览器预热器
+
+    使用单个后台线程依次预热浏览器：打开窗口 -> 独立的Playwright连接 -> IP地域校验 -> 断开连接。
+    窗口保持打开，主线程取用时只需重新连接CDP并沿用IP校验结果。
+    """
+
+    def __init__(self, region: str, browser_windows: Optional[Dict[int, Dict[str, str]]] = None):
+        self.region = region
+        self.browser_windows = browser_windows
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-warmer")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, browser_id: str) -> None:
+        """提交预热任务，同一BrowserID未被取用前不会重复预热"""
+        with self._lock:
+            if browser_id in self._pending:
+                return
+            logger.info(f"🔥 后台预热浏览器 {browser_id}")
+            self._pending[browser_id] = self._executor.submit(self._warm, browser_id)
+
+    def take(self, browser_id: str) -> Optional[WarmProfile]:
+        """
+        取用预热结果，预热未完成时等待其完成
+
+        Returns:
+            Optional[WarmProfile]: 未预热过该BrowserID时返回None
+        """
+        with self._lock:
+            future = self._pending.pop(browser_id, None)
+        if future is None:
+            return None
+        return future.result()
+
+    def shutdown(self) -> None:
+        """等待后台任务结束，并关闭所有未被取用的预热浏览器"""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        for future in pending:
+            warm = future.result()
+            if warm.ws_endpoint:
+                logger.info(f"关闭未使用的预热浏览器 {warm.browser_id} (profile_id: {warm.profile_id})")
+                close_browser_unified(warm.profile_id)
+
+        self._executor.shutdown(wait=True)
+
+    def _warm(self, browser_id: str) -> WarmProfile:
+        """后台线程执行的预热流程，异常只记录在结果中，不向外抛出"""
+        warm = WarmProfile(browser_id)
+        try:
+            warm.profile_id = get_profile_id_by_browser_id_unified(browser_id, self.browser_windows)
+
+            # 新窗口弹出会抢占键盘焦点，不能与文件对话框操作同时进行
+            with desktop_input_lock:
+                warm.ws_endpoint = open_profile_unified(warm.profile_id)
+
+            # Playwright同步对象绑定创建线程，这里使用独立连接完成IP校验后断开
+            playwright, browser, page = connect_browser_unified(warm.ws_endpoint)
+            try:
+                warm.ip_verdict = IPValidator.cached_validate(
+                    page, self.region, warm.profile_id, proxy_fingerprint_for(browser_id, self.browser_windows)
+                )
+            finally:
+                try:
+                    page.close()
+                except Exception as e:
+                    logger.debug(f"关闭预热校验页面时出错: {e}")
+                playwright.stop()
+
+            is_region_match, actual_region, actual_ip = warm.ip_verdict
+            logger.info(f"🔥 浏览器 {browser_id} 预热完成: 地域匹配={is_region_match}, 实际={actual_region}, IP={actual_ip}")
+
+        except Exception as e:
+            logger.warning(f"⚠️ 预热浏览器 {browser_id} 失败: {e}")
+            warm.error = str(e)
+            # 窗口已打开但预热未完成时关闭窗口，由主线程重新冷启动
+            if warm.ws_endpoint:
+                close_browser_unified(warm.profile_id)
+                warm.ws_endpoint = None
+
+        return warm
@@ -5,8 +5,14 @@
 
 from .utils import enrich_product_info
 from .ip_validator import IPValidator
+from .ip_verdict_cache import IPVerdictCache, get_ip_verdict_cache
+from .step_journal import StepJournal, get_step_journal
 
 __all__ = [
     'enrich_product_info',
     'IPValidator',
+    'IPVerdictCache',
+    'get_ip_verdict_cache',
+    'StepJournal',
+    'get_step_journal',
 ]
@@ -3,11 +3,43 @@ IP地域校验工具
 用于验证指纹浏览器的IP地域是否与期望的地域一致
 """
 
-from typing import Dict, Optional
+from collections import Counter
+from typing import Dict, List, Optional
 from playwright.sync_api import Page  # pyright: ignore[reportMissingImports]
 from core.logger import logger
+from .ip_verdict_cache import get_ip_verdict_cache, IP_CHECK_MODE, IP_CHECK_STRATEGY
 import time
 
+# IP地域校验失败结果的错误信息前缀（同一浏览器校验失败后，组内后续商品沿用该错误）
+IP_MISMATCH_ERROR = "IP地域不匹配"
+
+# 在页面内同时请求所有IP查询服务
+# waitAll=false 时返回最先成功的一个结果，true 时等待全部完成（各自超时）后返回所有成功结果；
+# 返回内容中没有该服务国家字段（country_key）的响应（如限流提示）不算成功
+_FETCH_ALL_JS = """
+async ([services, waitAll]) => {
+    const fetchOne = async (service) => {
+        const controller = new AbortController();
+        const timer = setTimeout(() => controller.abort(), service.timeout);
+        try {
+            const response = await fetch(service.url, {signal: controller.signal, cache: 'no-store', credentials: 'omit'});
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            const data = await response.json();
+            if (!data || !data[service.country_key]) throw new Error('missing ' + service.country_key);
+            return {name: service.name, data: data};
+        } finally {
+            clearTimeout(timer);
+        }
+    };
+    const tasks = services.map(fetchOne);
+    if (!waitAll) {
+        try { return [await Promise.any(tasks)]; } catch (e) { return []; }
+    }
+    const settled = await Promise.allSettled(tasks);
+    return settled.filter(r => r.status === 'fulfilled').map(r => r.value);
+}
+"""
+
 
 class IPValidator:
     """IP地域校验器"""
@@ -58,48 +90,160 @@ class IPValidator:
         self.page = page
         self.expected_region = expected_region.upper()
     
-    def validate_ip_region(self) -> tuple[bool, Optional[str], Optional[str]]:
+    def validate_ip_region(self, mode: str = None) -> tuple[bool, Optional[str], Optional[str]]:
         """
         校验当前浏览器的IP地域是否与期望一致
         
+        Args:
+            mode: fetch（页面内并发请求所有服务，不离开当前页面）/ navigate（依次打开各服务页面），
+                  默认读取配置 ip_check.mode；fetch 失败时自动退回 navigate
+        
         Returns:
             tuple: (是否匹配, 实际地域代码, 实际IP地址)
         """
         logger.info(f"开始校验IP地域，期望地域: {self.expected_region}")
         
+        if self._use_fetch(mode):
+            verdict = self._validate_via_fetch()
+            if verdict is not None:
+                return verdict
+            logger.warning("页面内并发查询IP失败，改为依次打开IP查询页面")
+        
         # 尝试多个IP查询服务
         for service in self.IP_SERVICES:
-            try:
-                logger.info(f"尝试使用 {service['name']} 查询IP...")
-                ip_info = self._fetch_ip_info(service)
-                
-                if ip_info:
-                    actual_country = ip_info.get(service['country_key'], '').upper()
-                    actual_ip = ip_info.get('ip', 'Unknown')
-                    
-                    logger.info(f"获取到IP信息 - IP: {actual_ip}, 地域: {actual_country}")
-                    
-                    # 判断地域是否匹配
-                    is_match = self._is_region_match(actual_country)
-                    
-                    if is_match:
-                        logger.info(f"✅ IP地域校验通过: {actual_country} 匹配 {self.expected_region}")
-                    else:
-                        logger.warning(f"❌ IP地域校验失败: {actual_country} 不匹配 {self.expected_region}")
-                    
-                    return is_match, actual_country, actual_ip
-                    
-            except Exception as e:
-                logger.warning(f"使用 {service['name']} 查询IP失败: {e}")
-                continue
-        
-        # 所有服务都失败
+            logger.info(f"尝试使用 {service['name']} 查询IP...")
+            ip_info = self._fetch_ip_info(service)
+            if ip_info:
+                return self._verdict_from_ip_info(service, ip_info)
+        
+        return self._all_services_failed()
+    
+    async def validate_ip_region_async(self, mode: str = None) -> tuple[bool, Optional[str], Optional[str]]:
+        """
+        validate_ip_region 的异步版本（self.page 为 playwright.async_api 的页面对象）
+        
+        Returns:
+            tuple: (是否匹配, 实际地域代码, 实际IP地址)
+        """
+        logger.info(f"开始校验IP地域，期望地域: {self.expected_region}")
+        
+        if self._use_fetch(mode):
+            verdict = await self._validate_via_fetch_async()
+            if verdict is not None:
+                return verdict
+            logger.warning("页面内并发查询IP失败，改为依次打开IP查询页面")
+        
+        for service in self.IP_SERVICES:
+            logger.info(f"尝试使用 {service['name']} 查询IP...")
+            ip_info = await self._fetch_ip_info_async(service)
+            if ip_info:
+                return self._verdict_from_ip_info(service, ip_info)
+        
+        return self._all_services_failed()
+    
+    @staticmethod
+    def _use_fetch(mode: Optional[str]) -> bool:
+        return (mode or IP_CHECK_MODE) == "fetch"
+    
+    @staticmethod
+    def _wait_all(strategy: Optional[str]) -> bool:
+        """majority 策略需要等待全部服务返回"""
+        return (strategy or IP_CHECK_STRATEGY) == "majority"
+    
+    @staticmethod
+    def _all_services_failed() -> tuple[bool, Optional[str], Optional[str]]:
         logger.error("所有IP查询服务都失败，无法校验IP地域")
         return False, None, None
     
+    def _verdict(self, actual_country: str, actual_ip: str) -> tuple[bool, Optional[str], Optional[str]]:
+        """判断实际地域是否与期望地域匹配并记录结果"""
+        is_match = self._is_region_match(actual_country)
+        if is_match:
+            logger.info(f"✅ IP地域校验通过: {actual_country} 匹配 {self.expected_region}")
+        else:
+            logger.warning(f"❌ IP地域校验失败: {actual_country} 不匹配 {self.expected_region}")
+        return is_match, actual_country, actual_ip
+    
+    def _verdict_from_ip_info(self, service: Dict, ip_info: Dict) -> tuple[bool, Optional[str], Optional[str]]:
+        """根据单个服务返回的IP信息判断地域是否匹配"""
+        actual_country = ip_info.get(service['country_key'], '').upper()
+        actual_ip = ip_info.get('ip', 'Unknown')
+        
+        logger.info(f"获取到IP信息 - IP: {actual_ip}, 地域: {actual_country}")
+        return self._verdict(actual_country, actual_ip)
+    
+    def _validate_via_fetch(self, strategy: str = None) -> Optional[tuple[bool, Optional[str], Optional[str]]]:
+        """
+        在页面内用 fetch 同时请求所有IP查询服务，直接解析JSON
+        
+        Args:
+            strategy: first（采用最先返回的结果）/ majority（等待全部返回后按地域多数表决），
+                      默认读取配置 ip_check.strategy
+        
+        Returns:
+            Optional[tuple]: (是否匹配, 实际地域代码, 实际IP地址)，所有服务都失败时返回None
+        """
+        wait_all = self._wait_all(strategy)
+        
+        try:
+            responses = self.page.evaluate(_FETCH_ALL_JS, [self._fetch_services(), wait_all])
+        except Exception as e:
+            logger.warning(f"页面内查询IP失败: {e}")
+            return None
+        
+        return self._verdict_from_responses(responses or [], wait_all)
+    
+    async def _validate_via_fetch_async(self, strategy: str = None) -> Optional[tuple[bool, Optional[str], Optional[str]]]:
+        """_validate_via_fetch 的异步版本"""
+        wait_all = self._wait_all(strategy)
+        
+        try:
+            responses = await self.page.evaluate(_FETCH_ALL_JS, [self._fetch_services(), wait_all])
+        except Exception as e:
+            logger.warning(f"页面内查询IP失败: {e}")
+            return None
+        
+        return self._verdict_from_responses(responses or [], wait_all)
+    
+    def _fetch_services(self) -> List[Dict]:
+        """页面内查询使用的服务列表"""
+        return [
+            {'name': s['name'], 'url': s['url'], 'timeout': s['timeout'], 'country_key': s['country_key']}
+            for s in self.IP_SERVICES
+        ]
+    
+    def _verdict_from_responses(self, responses: List[Dict], wait_all: bool) -> Optional[tuple[bool, Optional[str], Optional[str]]]:
+        """根据页面内查询的返回值判断地域（wait_all 时多数表决），没有可用结果时返回None"""
+        answers = self._parse_fetch_responses(responses)
+        if not answers:
+            return None
+        
+        if wait_all:
+            # 多数表决：出现次数最多的地域，IP取该地域的第一个结果
+            country = Counter(c for _, c, _ in answers).most_common(1)[0][0]
+            name, actual_country, actual_ip = next(a for a in answers if a[1] == country)
+            logger.info(f"IP查询结果: {[(n, c, ip) for n, c, ip in answers]}，多数表决地域: {country}")
+        else:
+            name, actual_country, actual_ip = answers[0]
+        
+        logger.info(f"获取到IP信息（{name}） - IP: {actual_ip}, 地域: {actual_country}")
+        return self._verdict(actual_country, actual_ip)
+    
+    def _parse_fetch_responses(self, responses: List[Dict]) -> List[tuple]:
+        """把页面内查询的返回值解析为 (服务名, 地域代码, IP) 列表，忽略缺少地域的结果"""
+        country_keys = {s['name']: s['country_key'] for s in self.IP_SERVICES}
+        answers = []
+        for response in responses:
+            data = response.get('data') or {}
+            country = str(data.get(country_keys.get(response.get('name'), ''), '') or '').upper()
+            if country:
+                # ip-api.com 的IP字段为 query
+                answers.append((response.get('name'), country, data.get('ip') or data.get('query') or 'Unknown'))
+        return answers
+    
     def _fetch_ip_info(self, service: Dict) -> Optional[Dict]:
         """
-        从指定服务获取IP信息
+        打开指定服务的页面获取IP信息
         
         Args:
             service: IP查询服务配置
@@ -108,20 +252,36 @@ class IPValidator:
             Dict: IP信息字典，失败返回None
         """
         try:
-            # 访问IP查询API
-            response = self.page.goto(
-                service['url'],
-                timeout=service['timeout'],
-                wait_until='networkidle'
-            )
-            
-            if not response or not response.ok:
-                logger.warning(f"{service['name']} 返回错误状态: {response.status if response else 'None'}")
+            response = self.page.goto(service['url'], timeout=service['timeout'], wait_until='networkidle')
+            if not self._response_ok(service, response):
                 return None
-            
-            # 获取页面文本内容
-            content = self.page.content()
-            
+            return self._parse_ip_page(self.page.content())
+        except Exception as e:
+            logger.warning(f"从 {service['name']} 获取IP信息失败: {e}")
+            return None
+    
+    async def _fetch_ip_info_async(self, service: Dict) -> Optional[Dict]:
+        """_fetch_ip_info 的异步版本"""
+        try:
+            response = await self.page.goto(service['url'], timeout=service['timeout'], wait_until='networkidle')
+            if not self._response_ok(service, response):
+                return None
+            return self._parse_ip_page(await self.page.content())
+        except Exception as e:
+            logger.warning(f"从 {service['name']} 获取IP信息失败: {e}")
+            return None
+    
+    @staticmethod
+    def _response_ok(service: Dict, response) -> bool:
+        if not response or not response.ok:
+            logger.warning(f"{service['name']} 返回错误状态: {response.status if response else 'None'}")
+            return False
+        return True
+    
+    @staticmethod
+    def _parse_ip_page(content: str) -> Optional[Dict]:
+        """从IP查询页面的HTML中提取JSON数据"""
+        try:
             # 提取JSON数据
             import re
             json_match = re.search(r'<pre[^>]*>(.*?)</pre>', content, re.DOTALL)
@@ -142,7 +302,7 @@ class IPValidator:
             return ip_info
             
         except Exception as e:
-            logger.warning(f"从 {service['name']} 获取IP信息失败: {e}")
+            logger.warning(f"解析IP信息失败: {e}")
             return None
     
     def _is_region_match(self, actual_country: str) -> bool:
@@ -182,4 +342,44 @@ class IPValidator:
         """
         validator = IPValidator(page, expected_region)
         return validator.validate_ip_region()
+    
+    @staticmethod
+    def cached_validate(page: Page, expected_region: str, profile_id: str,
+                        fingerprint: Optional[str] = None, force: bool = False) -> tuple[bool, Optional[str], Optional[str]]:
+        """
+        带缓存的IP地域校验：同一浏览器在缓存有效期内且代理未变化时跳过IP查询
+        
+        Args:
+            page: Playwright页面对象
+            expected_region: 期望的地域代码
+            profile_id: 浏览器配置文件ID（缓存键）
+            fingerprint: 代理指纹，变化时视为IP已切换
+            force: 是否忽略缓存强制校验
+            
+        Returns:
+            tuple: (是否匹配, 实际地域代码, 实际IP地址)
+        """
+        cache = get_ip_verdict_cache()
+        if not force:
+            verdict = cache.get(expected_region, profile_id, fingerprint)
+            if verdict is not None:
+                return verdict
+        
+        verdict = IPValidator.quick_validate(page, expected_region)
+        cache.put(expected_region, profile_id, verdict, fingerprint)
+        return verdict
+    
+    @staticmethod
+    async def cached_validate_async(page, expected_region: str, profile_id: str,
+                                    fingerprint: Optional[str] = None, force: bool = False) -> tuple[bool, Optional[str], Optional[str]]:
+        """cached_validate 的异步版本（page 为 playwright.async_api 的页面对象）"""
+        cache = get_ip_verdict_cache()
+        if not force:
+            verdict = cache.get(expected_region, profile_id, fingerprint)
+            if verdict is not None:
+                return verdict
+        
+        verdict = await IPValidator(page, expected_region).validate_ip_region_async()
+        cache.put(expected_region, profile_id, verdict, fingerprint)
+        return verdict
 
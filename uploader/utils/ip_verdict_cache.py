@@ -0,0 +1,149 @@
+"""
+IP地域校验结果缓存
+按 地域 + profile_id 缓存校验通过的结果，在有效期内且代理指纹未变化时跳过IP查询
+"""
+
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from core.logger import logger
+from core.config import load_config
+from core.file_store import JsonFileStore
+
+# ========= 从配置文件加载参数 =========
+def _load_ip_check_config():
+    """从配置文件加载IP校验参数"""
+    defaults = {
+        "mode": "fetch",
+        "strategy": "first",
+        "cache_ttl": 1800,
+        "cache_file": ".cache/ip_verdicts.json",
+    }
+    try:
+        config = load_config()
+        defaults.update(config.get("ip_check", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载ip_check配置失败，使用默认值: {e}")
+    return defaults
+
+_ip_check_config = _load_ip_check_config()
+IP_CACHE_TTL = float(_ip_check_config["cache_ttl"] or 0)
+IP_CACHE_FILE = _ip_check_config["cache_file"]
+IP_CHECK_MODE = _ip_check_config["mode"]
+IP_CHECK_STRATEGY = _ip_check_config["strategy"]
+
+Verdict = Tuple[bool, Optional[str], Optional[str]]  # (地域是否匹配, 实际地域, 实际IP)
+
+
+class IPVerdictCache:
+    """
+    IP地域校验结果缓存（持久化到本地JSON文件，多进程共用）
+
+    - 只缓存校验通过的结果，校验失败的浏览器下次总会重新校验
+    - 代理指纹（代理类型/地址/端口/账号）变化时视为IP已切换，缓存失效
+    - 商品上传失败时调用 invalidate，下次打开该浏览器强制重新校验
+    - 每次读取文件的最新内容，修改在跨进程锁内合并写回，其他进程的 invalidate 不会被覆盖
+    """
+
+    def __init__(self, cache_file: str = IP_CACHE_FILE, ttl: float = IP_CACHE_TTL):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self._store = JsonFileStore(self.cache_file, "IP校验缓存")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _key(self, region: str, profile_id: str) -> str:
+        return f"{region.upper()}:{profile_id}"
+
+    def get(self, region: str, profile_id: str, fingerprint: Optional[str] = None) -> Optional[Verdict]:
+        """
+        获取有效的校验结果
+
+        Returns:
+            Optional[Verdict]: 有效期内且代理指纹一致时返回缓存结果，否则返回None
+        """
+        if not self.enabled or not profile_id:
+            return None
+
+        entry = self._store.read().get(self._key(region, profile_id))
+        if not entry:
+            return None
+
+        age = time.time() - entry["checked_at"]
+        if age > self.ttl:
+            return None
+        if fingerprint and entry.get("fingerprint") and entry["fingerprint"] != fingerprint:
+            logger.info(f"profile_id {profile_id} 的代理配置已变化，重新校验IP")
+            return None
+
+        logger.info(f"♻️ 沿用 {int(age)} 秒前的IP校验结果: profile_id={profile_id}, 地域={entry['country']}, IP={entry['ip']}")
+        return True, entry["country"], entry["ip"]
+
+    def put(self, region: str, profile_id: str, verdict: Verdict, fingerprint: Optional[str] = None) -> None:
+        """记录校验结果（只保存校验通过的结果）"""
+        if not self.enabled or not profile_id:
+            return
+
+        is_match, country, ip = verdict
+        try:
+            with self._store.modify() as entries:
+                if is_match:
+                    entries[self._key(region, profile_id)] = {
+                        "country": country,
+                        "ip": ip,
+                        "fingerprint": fingerprint,
+                        "checked_at": time.time(),
+                    }
+                else:
+                    entries.pop(self._key(region, profile_id), None)
+                self._prune(entries)
+        except Exception as e:
+            logger.warning(f"保存IP校验缓存失败: {e}")
+
+    def invalidate(self, profile_id: str) -> None:
+        """使指定浏览器在所有地域下的缓存失效（如上传失败、IP可能已切换）"""
+        if not self.enabled or not profile_id:
+            return
+
+        suffix = f":{profile_id}"
+        try:
+            with self._store.modify() as entries:
+                keys = [key for key in entries if key.endswith(suffix)]
+                for key in keys:
+                    del entries[key]
+        except Exception as e:
+            logger.warning(f"清除IP校验缓存失败: {e}")
+            return
+        if keys:
+            logger.info(f"已清除 profile_id {profile_id} 的IP校验缓存，下次启动时重新校验")
+
+    def _prune(self, entries: Dict[str, Dict]) -> None:
+        """删除过期条目，避免缓存文件无限增长"""
+        now = time.time()
+        expired = [key for key, entry in entries.items() if now - entry["checked_at"] > self.ttl]
+        for key in expired:
+            del entries[key]
+
+
+def proxy_fingerprint_for(browser_id: str, browser_windows: Optional[Dict[int, Dict[str, str]]]) -> Optional[str]:
+    """从浏览器窗口映射表中取出该BrowserID的代理指纹（IxBrowser等无映射时为None）"""
+    try:
+        return (browser_windows or {}).get(int(browser_id), {}).get("proxy")
+    except (TypeError, ValueError):
+        return None
+
+
+# 全局缓存实例
+_ip_verdict_cache = None
+_ip_verdict_cache_lock = threading.Lock()
+
+def get_ip_verdict_cache() -> IPVerdictCache:
+    """获取全局IP校验缓存实例"""
+    global _ip_verdict_cache
+    with _ip_verdict_cache_lock:
+        if _ip_verdict_cache is None:
+            _ip_verdict_cache = IPVerdictCache()
+    return _ip_verdict_cache
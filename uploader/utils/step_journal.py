@@ -0,0 +1,210 @@
+"""
+上传步骤日志
+按 地域 + BrowserID + SKU 持久化已完成的上传步骤，程序中断后重新运行时从最后一个已落地的步骤继续，
+避免已发布的商品被重复发布
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from core.logger import logger
+from core.config import load_config
+from data.record_manager import connect_record_db
+
+# ========= 从配置文件加载参数 =========
+def _load_step_journal_config():
+    """从配置文件加载步骤日志参数"""
+    defaults = {
+        "enabled": True,
+        "file": ".cache/step_journal.json",
+        "ttl": 86400,
+    }
+    try:
+        config = load_config()
+        defaults.update(config.get("step_journal", {}) or {})
+    except Exception as e:
+        logger.warning(f"加载step_journal配置失败，使用默认值: {e}")
+    return defaults
+
+_step_journal_config = _load_step_journal_config()
+STEP_JOURNAL_ENABLED = bool(_step_journal_config["enabled"])
+STEP_JOURNAL_FILE = _step_journal_config["file"]
+STEP_JOURNAL_TTL = float(_step_journal_config["ttl"] or 0)
+
+# 结果保存在服务器上的步骤（已发布服务商品 / 已发布编辑 / 已激活），重新运行时只从这些步骤之后继续；
+# 其他步骤只改变当前页面状态，浏览器关闭后即失效
+DURABLE_STEPS = ("publish", "edit_publish", "activate")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_journal (
+    key        TEXT PRIMARY KEY,
+    entry      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_step_journal_updated_at ON step_journal (updated_at);
+"""
+
+
+class StepJournalStore:
+    """
+    步骤日志存储（SQLite，与成功记录共用记录库 records.db_file）
+
+    每个商品一行：已提交的步骤列表、各步骤耗时和恢复所需的上下文（如商品信息、界面语言）。
+    每次写入只替换本商品的一行，跨进程由SQLite文件锁保证，不会互相覆盖其他进程的记录
+    """
+
+    def __init__(self, db_file: str = None, ttl: float = STEP_JOURNAL_TTL,
+                 legacy_file: str = STEP_JOURNAL_FILE):
+        """
+        Args:
+            db_file: SQLite记录库路径，默认读取配置 records.db_file
+            ttl: 记录有效期（秒），0表示不过期
+            legacy_file: 旧版JSON步骤日志文件，存在时导入后重命名为 .migrated
+        """
+        self.ttl = ttl
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        # 并发上传时多个工作线程共用一个连接，语句执行需串行化
+        self._lock = threading.RLock()
+        self._conn = connect_record_db(db_file)
+        self._conn.executescript(_SCHEMA)
+        self._migrate_legacy_json()
+        with self._lock:
+            self._prune()
+
+    def _migrate_legacy_json(self) -> None:
+        """把旧版JSON步骤日志导入记录库（已有的同名记录以记录库为准）"""
+        if not self.legacy_file or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f) or {}
+        except Exception as e:
+            logger.warning(f"读取旧版步骤日志失败，跳过导入: {self.legacy_file}, 错误: {e}")
+            entries = {}
+
+        rows = [
+            (key, json.dumps(entry, ensure_ascii=False), float(entry.get("updated_at", 0)))
+            for key, entry in entries.items() if isinstance(entry, dict)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO step_journal (key, entry, updated_at) VALUES (?, ?, ?)", rows
+            )
+        try:
+            self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+            logger.info(f"已导入旧版步骤日志: {self.legacy_file}（{len(rows)}条）")
+        except OSError as e:
+            logger.warning(f"重命名旧版步骤日志失败: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """返回有效期内的记录（中断的商品可能由其他进程记录）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entry, updated_at FROM step_journal WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        if self.ttl > 0 and time.time() - row[1] > self.ttl:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError as e:
+            logger.warning(f"步骤日志记录损坏，忽略: {key}, 错误: {e}")
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        entry["updated_at"] = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO step_journal (key, entry, updated_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(entry, ensure_ascii=False), entry["updated_at"])
+                )
+                self._prune()
+        except sqlite3.Error as e:
+            logger.warning(f"保存步骤日志失败: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM step_journal WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"删除步骤日志失败: {e}")
+
+    def _prune(self) -> None:
+        """删除过期记录，避免日志表无限增长（调用方持有 _lock）"""
+        if self.ttl <= 0:
+            return
+        self._conn.execute("DELETE FROM step_journal WHERE updated_at < ?", (time.time() - self.ttl,))
+
+
+class StepJournal:
+    """
+    单个商品的步骤日志
+
+    - commit 在步骤成功后立即写入记录库
+    - 打开日志时丢弃最后一个落地步骤之后的记录（页面状态已随浏览器关闭失效），
+      resume_step 即为需要从其之后继续的落地步骤
+    """
+
+    def __init__(self, store: StepJournalStore, region: str, browser_id: str, sku: str,
+                 durable_steps: tuple = DURABLE_STEPS):
+        self.store = store
+        self.key = f"{region.upper()}:{browser_id}:{sku}"
+        self.sku = sku
+        entry = store.get(self.key) if STEP_JOURNAL_ENABLED else None
+        self.steps: List[str] = []
+        self.timings: Dict[str, float] = {}
+        self.context: Dict[str, Any] = {}
+        if entry:
+            steps = entry.get("steps", [])
+            durable = [index for index, step in enumerate(steps) if step in durable_steps]
+            if durable:
+                self.steps = steps[:durable[-1] + 1]
+                self.timings = {step: entry.get("timings", {}).get(step) for step in self.steps}
+                self.context = entry.get("context", {})
+
+    @property
+    def resume_step(self) -> Optional[str]:
+        """上次中断前最后一个已落地的步骤，没有时返回None（从头开始）"""
+        return self.steps[-1] if self.steps else None
+
+    def is_committed(self, step: str) -> bool:
+        return step in self.steps
+
+    def commit(self, step: str, elapsed: float, **context) -> None:
+        """记录步骤完成（并更新恢复上下文）"""
+        if step not in self.steps:
+            self.steps.append(step)
+        self.timings[step] = round(elapsed, 2)
+        self.context.update(context)
+        if STEP_JOURNAL_ENABLED:
+            self.store.put(self.key, {"steps": self.steps, "timings": self.timings, "context": self.context})
+
+    def clear(self) -> None:
+        """商品处理完成后删除日志（之后以成功记录为准）"""
+        self.steps = []
+        self.context = {}
+        if STEP_JOURNAL_ENABLED:
+            self.store.delete(self.key)
+
+    def summary(self) -> str:
+        return ", ".join(f"{step}={self.timings.get(step)}s" for step in self.steps)
+
+
+# 全局存储实例
+_step_journal_store = None
+_step_journal_store_lock = threading.Lock()
+
+def get_step_journal(region: str, browser_id: str, sku: str,
+                     durable_steps: tuple = DURABLE_STEPS) -> StepJournal:
+    """打开指定商品的步骤日志（durable_steps 为上传流程中结果保存在服务器上的步骤）"""
+    global _step_journal_store
+    with _step_journal_store_lock:
+        if _step_journal_store is None:
+            _step_journal_store = StepJournalStore()
+    return StepJournal(_step_journal_store, region, browser_id, sku, durable_steps)
@@ -54,22 +54,12 @@ def enrich_product_info(product_info: ProductInfo, config: UploadConfig, region:
     size = get_random_size(config, product_info.gender)
     meetup_location = get_random_meetup_location(config, region)
     
-    # 创建新的 ProductInfo 对象（由于 dataclass 不可变，我们需要创建新实例）
-    enriched_info = ProductInfo(
-        title=product_info.title,
-        price=product_info.price,
-        category=product_info.category,
-        brand=product_info.brand,
-        condition=product_info.condition,
-        gender=product_info.gender,
-        location=product_info.location,
-        multi_quantity=product_info.multi_quantity
+    # ProductInfo 不可变，复制并填充随机字段
+    enriched_info = product_info.with_overrides(
+        description=description,
+        size=size,
+        meetup_location=meetup_location
     )
     
-    # 添加动态属性
-    enriched_info.description = description
-    enriched_info.size = size
-    enriched_info.meetup_location = meetup_location
-    
     logger.info(f"商品信息已丰富: 描述={description}, 尺码={size}, 面交地点={meetup_location} (地域: {region})")
     return enriched_info